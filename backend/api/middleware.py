@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import logging
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.core import telemetry
+from backend.core.config import settings
+from backend.core.logs import bind_request_id, unbind_request_id
+
+
+logger = logging.getLogger("backend.requests")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_MAX_REQUEST_ID_LENGTH = 128
+
+
+def _incoming_request_id(scope: Scope) -> str:
+    # Reuse the caller's id (a proxy or another service) when it is sane, so logs join up.
+    for name, value in scope["headers"]:
+        if name == b"x-request-id":
+            if 0 < len(value) <= _MAX_REQUEST_ID_LENGTH and value.isascii() and value.decode().isprintable():
+                return value.decode()
+            break
+    return uuid.uuid4().hex
+
+
+class RequestIdMiddleware:
+    """Tag every log record of a request with ``request_id`` and echo it as ``X-Request-ID``."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope)
+        token = bind_request_id(request_id)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            unbind_request_id(token)
+
+
+def _route(scope: Scope) -> str:
+    # The path template, not the raw path, so ids do not become metric labels.
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    # FastAPI 0.143 puts the route as declared on its router in the scope, without
+    # the include prefix. Rendering it with the matched params gives the tail of the
+    # path; what precedes it is exactly that prefix.
+    path = scope["path"]
+    try:
+        rendered = route.path_format.format(**scope.get("path_params", {}))
+    except (AttributeError, KeyError, ValueError, IndexError):
+        return template
+    if rendered != path and path.endswith(rendered):
+        return path[: len(path) - len(rendered)] + template
+    return template
+
+
+class RequestTimingMiddleware:
+    """Per-request DB, serialization and handler timing.
+
+    Adds a ``Server-Timing`` header, logs one ``request_completed`` line and
+    feeds ``telemetry.request_metrics``. A plain ASGI middleware, so streamed and
+    SSE responses pass through untouched; their header reflects the time to the
+    first byte, their metrics the whole stream.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        threshold = settings.n_plus_one_threshold
+        stats = telemetry.RequestStats(track_shapes=threshold > 0)
+        token = telemetry.bind(stats)
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.server_timing_header:
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing(stats.elapsed()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            total = stats.elapsed()
+            telemetry.unbind(token)
+            self._finish(scope, status, stats, total, threshold)
+
+    @staticmethod
+    def _finish(scope: Scope, status: int, stats: telemetry.RequestStats, total: float, threshold: int) -> None:
+        method, route = scope["method"], _route(scope)
+        telemetry.request_metrics.observe(method, route, status, stats, total)
+        if settings.request_log_enabled:
+            logger.info(
+                "request_completed",
+                extra={
+                    "method": method,
+                    "route": route,
+                    "status": status,
+                    "duration_ms": round(total * 1000.0, 2),
+                    "db_ops": stats.db_ops,
+                    "db_ms": round(stats.db_seconds * 1000.0, 2),
+                    "serialize_ms": round(stats.serialize_seconds * 1000.0, 2),
+                },
+            )
+        for shape, count in stats.repeated_shapes(threshold):
+            logger.warning(
+                "n_plus_one_suspected",
+                extra={"method": method, "route": route, "query_shape": shape, "count": count, "threshold": threshold},
+            )
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from backend.api.streaming import dumps
+from backend.core.telemetry import record_serialize
+
+
+class MongoJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, with ObjectId support.
+
+    Used as the application's default response class. Endpoints with a
+    ``response_model`` reach it with already-serialized content; handlers that return
+    a response directly may pass raw Mongo documents.
+    """
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        body = dumps(content)
+        record_serialize(time.perf_counter() - started)
+        return body
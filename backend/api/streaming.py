@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+import orjson
+from bson import ObjectId
+
+from backend.core.telemetry import record_serialize
+
+
+def _default(value: Any) -> Any:
+    # orjson handles datetime/date/UUID/enums natively; only BSON types land here.
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+async def json_array_stream(key: str, batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """Render ``{"<key>": [...]}`` one batch at a time so the full list is never buffered."""
+    yield b'{"' + key.encode("utf-8") + b'":['
+    first = True
+    async for batch in batches:
+        if not batch:
+            continue
+        started = time.perf_counter()
+        chunk = b",".join(dumps(row) for row in batch)
+        record_serialize(time.perf_counter() - started)
+        yield chunk if first else b"," + chunk
+        first = False
+    yield b"]}"
+
+
+async def ndjson_stream(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """Render one JSON document per line, one batch at a time."""
+    async for batch in batches:
+        if batch:
+            started = time.perf_counter()
+            chunk = b"".join(dumps(row) + b"\n" for row in batch)
+            record_serialize(time.perf_counter() - started)
+            yield chunk
@@ -1,210 +1,340 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import asyncio
+from datetime import datetime
 from math import ceil
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, Query
-
-from backend.db.database import get_database
-from backend.repositories.base import BaseRepository
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorClientSession
+
+from backend.api.streaming import json_array_stream, ndjson_stream
+from backend.core.config import settings
+from backend.db.database import get_analytics_database, get_database, pool_metrics, run_in_transaction
+from backend.repositories.base import BaseRepository, utcnow
+from backend.repositories.pagination import decode_cursor, encode_cursor, keyset_filter
 from backend.models.campaign import CampaignType, CampaignStatus
-from backend.models.patient import PatientType, ChannelType
+from backend.models.patient import PatientType, ChannelType, email_filter, normalize_email
 from backend.models.appointment import AppointmentStatus, CreatedFrom
+from backend.models.records import AppointmentRecord, CampaignRecord
+from backend.schemas.common import MessageResponse
 from backend.schemas.admin import (
+    AdminAppointmentResponse,
+    CampaignDetailsResponse,
+    CampaignListResponse,
+    DashboardStatsResponse,
+    DbPoolStats,
+    InteractionPage,
+    PatientImportResponse,
+    RecoveryCampaignCreated,
     RecoveryCampaignCreate,
     CampaignRespondRequest,
     AdminAppointmentCreate,
     CompleteAppointmentRequest,
 )
+from backend.services.availability import availability_engine
+from backend.services.events import emit_campaign_created, emit_campaign_status, emit_interaction
+from backend.services.kpi import (
+    get_dashboard_stats,
+    record_appointment_booked,
+    record_campaign_created,
+    record_campaign_transition,
+)
+from backend.services.patient_import import ImportFormat, detect_format, import_patients, iter_text_lines
+from backend.services.patient_snapshots import SNAPSHOT_SOURCE_FIELDS, patient_snapshot
+from backend.services.reservations import OutsideSchedule, SlotConflict, release_slots, reserve_slots
+from backend.services.routing import thread_routes
 from backend.services.security import get_current_user
 
 
 router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(get_current_user)])
 
-
-@router.get("/dashboard-stats")
-async def dashboard_stats() -> Dict[str, Any]:
-    db = await get_database()
+CAMPAIGN_LIST_SORT = [("updated_at", -1), ("_id", -1)]
+CAMPAIGN_DETAIL_FIELDS = {"patient_id": 1, "patient.name": 1, "status": 1, "engagement_summary": 1}
+# Enough of a campaign's pre-image to record a KPI transition and emit its event.
+CAMPAIGN_TRANSITION_FIELDS = {"campaign_type": 1, "status": 1}
+INTERACTION_SORT = [("timestamp", 1), ("_id", 1)]
+INTERACTION_SORT_DESC = [("timestamp", -1), ("_id", -1)]
+INTERACTION_FIELDS = {"direction": 1, "content": 1, "timestamp": 1}
+APPOINTMENT_STATE_FIELDS = {"patient_id": 1, "campaign_id": 1, "appointment_date": 1, "status": 1}
+
+
+async def _patient_names(repo: BaseRepository, rows: List[Tuple[Any, Optional[str]]]) -> Dict[Any, str]:
+    """Display names for ``(patient_id, snapshot name)`` rows, by patient id.
+
+    Names come from the patient snapshot stored on the row; only rows written
+    before it existed and not yet backfilled cost a single ``$in`` query.
+    """
+    names = {pid: name for pid, name in rows if name is not None}
+    ids = list({pid for pid, name in rows if name is None and pid is not None})
+    if not ids:
+        return names
+    docs = await repo.find_many("patients", {"_id": {"$in": ids}}, projection={"name": 1})
+    names.update((d["_id"], d.get("name", "Unknown")) for d in docs)
+    return names
+
+
+@router.get("/dashboard-stats", response_model=DashboardStatsResponse)
+async def dashboard_stats(recompute: bool = False) -> Dict[str, Any]:
+    # A rebuilt snapshot is written back, so it is computed from the primary.
+    db = await (get_database() if recompute else get_analytics_database())
     repo = BaseRepository(db)
+    # O(1) read of the incrementally maintained counter document; ?recompute=true
+    # rebuilds it from the source collections.
+    return await get_dashboard_stats(repo, recompute=recompute)
 
-    # KPIs
-    now = datetime.now(timezone.utc)
-    start_month = datetime(now.year, now.month, 1, tzinfo=timezone.utc)
-    next_month = datetime(now.year + (now.month // 12), ((now.month % 12) + 1), 1, tzinfo=timezone.utc)
-
-    booked_month = 0
-    for appt in await repo.find_many("appointments", {}):
-        ts = appt.get("appointment_date")
-        if isinstance(ts, str):
-            try:
-                ts = datetime.fromisoformat(ts)
-            except Exception:
-                ts = None
-        if ts and start_month <= ts.replace(tzinfo=timezone.utc) < next_month:
-            if appt.get("status") == "booked":
-                booked_month += 1
-
-    handoffs = await repo.count_many("campaigns", {"status": CampaignStatus.HANDOFF_REQUIRED.value})
-    active_recovery = await repo.count_many(
-        "campaigns",
-        {
-            "campaign_type": CampaignType.RECOVERY.value,
-            "status": {"$in": [CampaignStatus.ATTEMPTING_RECOVERY.value, CampaignStatus.RE_ENGAGED.value]},
-        },
-    )
 
-    total_recovery = await repo.count_many("campaigns", {"campaign_type": CampaignType.RECOVERY.value})
-    recovered = await repo.count_many("campaigns", {"status": CampaignStatus.RECOVERED.value})
-    recovery_rate = (recovered / total_recovery * 100.0) if total_recovery else 0.0
+@router.get("/db-pool", response_model=DbPoolStats)
+async def db_pool_stats() -> Dict[str, Any]:
+    return pool_metrics.stats()
 
-    total_recall = await repo.count_many("campaigns", {"campaign_type": CampaignType.RECALL.value})
-    recall_recovered = await repo.count_many(
-        "campaigns",
-        {
-            "campaign_type": CampaignType.RECALL.value,
-            "status": CampaignStatus.RECOVERED.value,
-        },
-    )
-    recall_rate = (recall_recovered / total_recall * 100.0) if total_recall else 0.0
 
-    return {
-        "kpis": {
-            "appointments_booked_month": booked_month,
-            "handoffs_requiring_action": handoffs,
-            "active_recovery_campaigns": active_recovery,
-        },
-        "conversion_rates": {
-            "recovery_rate_percent": round(recovery_rate, 1),
-            "recall_rate_percent": round(recall_rate, 1),
-        },
-    }
-
-
-@router.get("/campaigns")
+@router.get("/campaigns", response_model=CampaignListResponse)
 async def list_campaigns(
     status: str | None = None,
     page: int = Query(1, ge=1),
     limit: int = Query(25, ge=1, le=100),
+    cursor: str | None = None,
 ) -> Dict[str, Any]:
-    db = await get_database()
+    db = await get_analytics_database()
     repo = BaseRepository(db)
     query: Dict[str, Any] = {}
     if status:
         query["status"] = status
 
-    items: List[Dict[str, Any]] = await repo.find_many("campaigns", query, sort=[("updated_at", -1)])
-    total = len(items)
-    start = (page - 1) * limit
-    end = start + limit
-    page_items = items[start:end]
+    # Keyset pagination on (updated_at, _id); ?cursor= takes precedence over ?page=.
+    page_query = query
+    skip = (page - 1) * limit
+    if cursor:
+        try:
+            after = keyset_filter(CAMPAIGN_LIST_SORT, decode_cursor(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        page_query = {"$and": [query, after]} if query else after
+        skip = 0
+
+    count = repo.count_many("campaigns", query) if query else repo.estimated_count("campaigns")
+    total, items = await asyncio.gather(
+        count,
+        repo.find_many(
+            "campaigns",
+            page_query,
+            sort=CAMPAIGN_LIST_SORT,
+            skip=skip,
+            limit=limit + 1,
+            projection=CampaignRecord.FIELDS,
+        ),
+    )
+    has_more = len(items) > limit
+    page_items = [CampaignRecord.from_mongo(doc) for doc in items[:limit]]
+    names = await _patient_names(repo, [(c.patient_id, c.patient_name) for c in page_items])
 
     results: List[Dict[str, Any]] = []
     for c in page_items:
-        patient = await repo.find_one("patients", {"_id": c.get("patient_id")})
         results.append(
             {
-                "campaign_id": str(c.get("_id")),
-                "patient_name": (patient or {}).get("name", "Unknown"),
-                "campaign_type": c.get("campaign_type"),
-                "status": c.get("status"),
-                "last_updated": c.get("updated_at"),
+                "campaign_id": str(c.id),
+                "patient_name": names.get(c.patient_id, "Unknown"),
+                "campaign_type": c.campaign_type,
+                "status": c.status,
+                "last_updated": c.updated_at,
             }
         )
 
+    next_cursor = None
+    if has_more and page_items:
+        last = page_items[-1]
+        next_cursor = encode_cursor([last.updated_at, last.id])
+
     return {
         "pagination": {
             "total_items": total,
             "total_pages": ceil(total / limit) if limit else 1,
             "current_page": page,
+            "next_cursor": next_cursor,
         },
         "campaigns": results,
     }
 
 
-@router.get("/campaigns/{campaign_id}")
-async def campaign_details(campaign_id: str) -> Dict[str, Any]:
-    db = await get_database()
-    repo = BaseRepository(db)
+async def _interaction_page(
+    repo: BaseRepository,
+    campaign_id: ObjectId,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    latest: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of a campaign's conversation, oldest first, plus the cursor for the next page.
+
+    Pages walk forward from the start of the conversation, or with ``latest`` backwards
+    from its end (each page is still returned oldest first). The cursor remembers the
+    direction, so follow-up requests only need ``cursor``.
+    """
+    after: Dict[str, Any] = {}
+    if cursor:
+        try:
+            *position, direction = decode_cursor(cursor)
+            latest = direction < 0
+            after = keyset_filter(INTERACTION_SORT_DESC if latest else INTERACTION_SORT, position)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    sort = INTERACTION_SORT_DESC if latest else INTERACTION_SORT
+    query: Dict[str, Any] = {"campaign_id": campaign_id}
+    if after:
+        query = {"$and": [query, after]}
+
+    rows = await repo.find_many(
+        "interactions", query, sort=sort, limit=limit + 1, projection=INTERACTION_FIELDS
+    )
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor([last.get("timestamp"), last["_id"], -1 if latest else 1])
+    if latest:
+        page.reverse()
+    return [_interaction_row(m) for m in page], next_cursor
+
+
+def _interaction_row(m: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "interaction_id": str(m.get("_id")),
+        "direction": m.get("direction"),
+        "content": m.get("content"),
+        "timestamp": m.get("timestamp"),
+    }
+
+
+def _campaign_oid(campaign_id: str) -> ObjectId:
     try:
-        oid = ObjectId(campaign_id)
+        return ObjectId(campaign_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid campaign_id")
 
-    campaign = await repo.find_one("campaigns", {"_id": oid})
+
+@router.get("/campaigns/{campaign_id}", response_model=CampaignDetailsResponse)
+async def campaign_details(
+    campaign_id: str,
+    history_limit: int = Query(50, ge=1, le=500),
+) -> Dict[str, Any]:
+    db = await get_database()
+    repo = BaseRepository(db)
+    oid = _campaign_oid(campaign_id)
+
+    # The most recent messages; older ones via GET /admin/interactions/{id}?cursor=history_cursor.
+    campaign, (history, history_cursor) = await asyncio.gather(
+        repo.find_one("campaigns", {"_id": oid}, projection=CAMPAIGN_DETAIL_FIELDS),
+        _interaction_page(repo, oid, limit=history_limit, latest=True),
+    )
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    messages = await repo.find_many("interactions", {"campaign_id": oid})
-    history = [
-        {
-            "direction": m.get("direction"),
-            "content": m.get("content"),
-            "timestamp": m.get("timestamp"),
-        }
-        for m in messages
-    ]
-
-    patient = await repo.find_one("patients", {"_id": campaign.get("patient_id")})
+    names = await _patient_names(repo, [(campaign.get("patient_id"), (campaign.get("patient") or {}).get("name"))])
     details = {
         "campaign_id": str(campaign.get("_id")),
-        "patient_name": (patient or {}).get("name", "Unknown"),
+        "patient_name": names.get(campaign.get("patient_id"), "Unknown"),
         "status": campaign.get("status"),
         "engagement_summary": campaign.get("engagement_summary"),
     }
-    return {"campaign_details": details, "conversation_history": history}
+    return {"campaign_details": details, "conversation_history": history, "history_cursor": history_cursor}
 
 
-@router.get("/appointments")
+@router.get("/interactions/{campaign_id}", response_model=InteractionPage)
+async def list_interactions(
+    campaign_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    latest: bool = False,
+) -> Dict[str, Any]:
+    db = await get_analytics_database()
+    repo = BaseRepository(db)
+    oid = _campaign_oid(campaign_id)
+    items, next_cursor = await _interaction_page(repo, oid, limit=limit, cursor=cursor, latest=latest)
+    return {"campaign_id": campaign_id, "interactions": items, "next_cursor": next_cursor}
+
+
+@router.get("/interactions/{campaign_id}/export", response_class=StreamingResponse)
+async def export_interactions(campaign_id: str) -> StreamingResponse:
+    db = await get_analytics_database()
+    repo = BaseRepository(db)
+    oid = _campaign_oid(campaign_id)
+
+    async def rows() -> AsyncIterator[List[Dict[str, Any]]]:
+        async for batch in repo.find_batches(
+            "interactions", {"campaign_id": oid}, sort=INTERACTION_SORT, projection=INTERACTION_FIELDS
+        ):
+            yield [_interaction_row(m) for m in batch]
+
+    return StreamingResponse(
+        ndjson_stream(rows()),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="interactions-{campaign_id}.ndjson"'},
+    )
+
+
+@router.get("/appointments", response_class=StreamingResponse)
 async def list_appointments(
     start_date: str | None = None,
     end_date: str | None = None,
-    provider_id: str | None = None,  # Placeholder: provider not modeled yet
-) -> Dict[str, Any]:
-    db = await get_database()
+    provider_id: str | None = None,
+) -> StreamingResponse:
+    db = await get_analytics_database()
     repo = BaseRepository(db)
-    start_dt = datetime.fromisoformat(start_date) if start_date else None
-    end_dt = datetime.fromisoformat(end_date) if end_date else None
-
-    results: List[Dict[str, Any]] = []
-    for appt in await repo.find_many("appointments", {}):
-        ts = appt.get("appointment_date")
-        if isinstance(ts, str):
-            try:
-                ts = datetime.fromisoformat(ts)
-            except Exception:
-                ts = None
-        if start_dt and (not ts or ts < start_dt):
-            continue
-        if end_dt and (not ts or ts > end_dt):
-            continue
-
-        patient = await repo.find_one("patients", {"_id": appt.get("patient_id")})
-        results.append(
-            {
-                "appointment_id": str(appt.get("_id", "")),
-                "patient_name": (patient or {}).get("name", "Unknown"),
-                "appointment_date": appt.get("appointment_date"),
-                "service_name": appt.get("service_name"),
-                "status": appt.get("status"),
-            }
-        )
+    try:
+        start_dt = datetime.fromisoformat(start_date) if start_date else None
+        end_dt = datetime.fromisoformat(end_date) if end_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date")
 
-    return {"appointments": results}
+    # Served by the (appointment_date, provider_id) index.
+    query: Dict[str, Any] = {}
+    date_range: Dict[str, Any] = {}
+    if start_dt:
+        date_range["$gte"] = start_dt
+    if end_dt:
+        date_range["$lte"] = end_dt
+    if date_range:
+        query["appointment_date"] = date_range
+    if provider_id:
+        query["provider_id"] = provider_id
+
+    async def rows() -> AsyncIterator[List[Dict[str, Any]]]:
+        async for batch in repo.find_batches(
+            "appointments",
+            query,
+            sort=[("appointment_date", 1)],
+            projection=AppointmentRecord.FIELDS,
+        ):
+            appointments = [AppointmentRecord.from_mongo(doc) for doc in batch]
+            names = await _patient_names(repo, [(a.patient_id, a.patient_name) for a in appointments])
+            yield [
+                {
+                    "appointment_id": str(appt.id),
+                    "patient_name": names.get(appt.patient_id, "Unknown"),
+                    "appointment_date": appt.appointment_date,
+                    "service_name": appt.service_name,
+                    "status": appt.status,
+                }
+                for appt in appointments
+            ]
+
+    return StreamingResponse(json_array_stream("appointments", rows()), media_type="application/json")
 
 
 # Milestone 6: Write operations
 
 
-@router.post("/campaigns/recovery")
-async def create_recovery_campaign(payload: RecoveryCampaignCreate) -> Dict[str, str]:
+@router.post("/campaigns/recovery", response_model=RecoveryCampaignCreated)
+async def create_recovery_campaign(payload: RecoveryCampaignCreate) -> Dict[str, Any]:
     db = await get_database()
     repo = BaseRepository(db)
     # Create patient
     patient_doc = {
         "name": payload.patient_name,
-        "email": str(payload.patient_email),
+        "email": normalize_email(str(payload.patient_email)),
         "phone": "",
         "patient_type": PatientType.COLD_LEAD.value,
         "preferred_channel": [ChannelType.email.value],
@@ -214,15 +344,39 @@ async def create_recovery_campaign(payload: RecoveryCampaignCreate) -> Dict[str,
     # Create campaign
     campaign_doc = {
         "patient_id": presult_id,
+        "patient": patient_snapshot(patient_doc),
         "campaign_type": CampaignType.RECOVERY.value,
         "status": CampaignStatus.ATTEMPTING_RECOVERY.value,
         "engagement_summary": payload.initial_inquiry,
     }
     cresult_id = await repo.insert_one("campaigns", campaign_doc)
-    return {"message": "Recovery campaign created successfully.", "campaign_id": str(cresult_id)}
+    await record_campaign_created(repo, CampaignType.RECOVERY, CampaignStatus.ATTEMPTING_RECOVERY)
+    emit_campaign_created(cresult_id, status=CampaignStatus.ATTEMPTING_RECOVERY, campaign_type=CampaignType.RECOVERY)
+    return {"message": "Recovery campaign created successfully.", "campaign_id": cresult_id}
+
+
+@router.post("/patients/import", response_model=PatientImportResponse)
+async def import_patients_upload(
+    file: UploadFile = File(...),
+    format: Optional[ImportFormat] = Query(default=None, description="csv or ndjson; defaults to the file extension"),
+) -> Dict[str, Any]:
+    fmt = format or detect_format(file.filename)
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Unknown file format; pass ?format=csv or ?format=ndjson")
+
+    async def chunks() -> AsyncIterator[bytes]:
+        while chunk := await file.read(1 << 16):
+            yield chunk
 
+    db = await get_database()
+    repo = BaseRepository(db)
+    report = await import_patients(
+        repo, iter_text_lines(chunks()), fmt=fmt, batch_size=settings.patient_import_batch_size
+    )
+    return report.as_dict()
 
-@router.post("/campaigns/{campaign_id}/respond")
+
+@router.post("/campaigns/{campaign_id}/respond", response_model=MessageResponse)
 async def respond_to_campaign(campaign_id: str, payload: CampaignRespondRequest) -> Dict[str, str]:
     db = await get_database()
     repo = BaseRepository(db)
@@ -236,86 +390,139 @@ async def respond_to_campaign(campaign_id: str, payload: CampaignRespondRequest)
         "campaign_id": oid,
         "direction": "outgoing",
         "content": payload.message,
+        "timestamp": utcnow(),
     }
     await repo.insert_one("interactions", interaction)
+    emit_interaction(interaction)
 
     # Update campaign status
-    await repo.update_one("campaigns", {"_id": oid}, {"$set": {"status": payload.new_status}})
+    previous = await repo.find_one_and_update(
+        "campaigns", {"_id": oid}, {"$set": {"status": payload.new_status}}, projection=CAMPAIGN_TRANSITION_FIELDS
+    )
+    thread_routes.update_status(oid, payload.new_status)
+    if previous:
+        await record_campaign_transition(repo, previous.get("campaign_type"), previous.get("status"), payload.new_status)
+        if previous.get("status") != payload.new_status:
+            emit_campaign_status(oid, payload.new_status, previous=previous.get("status"))
     return {"message": "Response sent successfully."}
 
 
-@router.post("/appointments")
+@router.post("/appointments", response_model=AdminAppointmentResponse)
 async def create_admin_appointment(payload: AdminAppointmentCreate) -> Dict[str, Any]:
     db = await get_database()
     repo = BaseRepository(db)
-    patient = await repo.find_one("patients", {"email": str(payload.email)})
+    patient = await repo.find_one("patients", email_filter(str(payload.email)), projection=SNAPSHOT_SOURCE_FIELDS)
     if not patient:
         # create patient
-        patient_doc = {
+        patient = {
             "name": payload.name,
-            "email": str(payload.email),
+            "email": normalize_email(str(payload.email)),
             "phone": "",
             "patient_type": PatientType.EXISTING.value,
             "preferred_channel": [payload.preferred_channel or "email"],
         }
-        patient_id = await repo.insert_one("patients", patient_doc)
+        patient_id = await repo.insert_one("patients", patient)
     else:
         patient_id = patient["_id"]
 
+    appt_id = ObjectId()
+    try:
+        provider_id = await reserve_slots(
+            repo,
+            appointment_id=appt_id,
+            start=payload.appointment_date,
+            duration_minutes=payload.duration_minutes,
+            provider_id=payload.provider_id,
+        )
+    except SlotConflict:
+        raise HTTPException(status_code=409, detail="Requested time slot is no longer available")
+    except OutsideSchedule:
+        raise HTTPException(status_code=422, detail="Requested time is outside provider working hours")
+
     appt_doc = {
+        "_id": appt_id,
         "patient_id": patient_id,
+        "patient": patient_snapshot(patient),
         "campaign_id": None,
         "appointment_date": payload.appointment_date,
         "duration_minutes": payload.duration_minutes,
         "status": AppointmentStatus.booked.value,
         "service_name": payload.service_name,
         "notes": payload.notes,
+        "provider_id": provider_id,
         "created_from": CreatedFrom.MANUAL_ADMIN.value,
     }
-    appt_id = await repo.insert_one("appointments", appt_doc)
-    appt_doc["_id"] = appt_id
-    return appt_doc
+    try:
+        await repo.insert_one("appointments", appt_doc)
+    except Exception:
+        await release_slots(repo, appt_id)
+        raise
+    availability_engine.invalidate(payload.appointment_date)
+    await record_appointment_booked(repo, payload.appointment_date)
+    return {**appt_doc, "appointment_id": appt_id}
 
 
-@router.post("/appointments/{appointment_id}/complete")
+@router.post("/appointments/{appointment_id}/complete", response_model=MessageResponse)
 async def complete_appointment(appointment_id: str, payload: CompleteAppointmentRequest) -> Dict[str, str]:
     db = await get_database()
     repo = BaseRepository(db)
     # Accept both ObjectId and string ids for tests/fakes
-    oid = None
+    query: Dict[str, Any]
     try:
-        oid = ObjectId(appointment_id)
+        query = {"_id": {"$in": [ObjectId(appointment_id), appointment_id]}}
     except Exception:
-        oid = None
-
-    appointment = None
-    if oid is not None:
-        appointment = await repo.find_one("appointments", {"_id": oid})
-    if appointment is None:
-        appointment = await repo.find_one("appointments", {"_id": appointment_id})
-    if not appointment:
-        raise HTTPException(status_code=404, detail="Appointment not found")
-
-    # Step 1: update appointment status
-    if oid is not None:
-        await repo.update_one("appointments", {"_id": oid}, {"$set": {"status": AppointmentStatus.completed.value}})
-    else:
-        await repo.update_one("appointments", {"_id": appointment_id}, {"$set": {"status": AppointmentStatus.completed.value}})
-
-    # Step 2: update campaign status to RECOVERED if campaign_id exists
-    campaign_id = appointment.get("campaign_id")
-    if campaign_id:
-        await repo.update_one("campaigns", {"_id": campaign_id}, {"$set": {"status": CampaignStatus.RECOVERED.value}})
+        query = {"_id": appointment_id}
 
-    # Step 3: handle future recall
-    if payload.next_follow_up_date is not None:
-        patient_id = appointment.get("patient_id")
-        await repo.update_one("patients", {"_id": patient_id}, {"$set": {"next_follow_up_date": payload.next_follow_up_date}})
+    async def complete(
+        session: Optional[AsyncIOMotorClientSession],
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        txn = BaseRepository(db, session=session)
+        # Step 1: update appointment status (pre-image tells whether it was still booked)
+        appointment = await txn.find_one_and_update(
+            "appointments",
+            query,
+            {"$set": {"status": AppointmentStatus.completed.value}},
+            projection=APPOINTMENT_STATE_FIELDS,
+        )
+        if not appointment:
+            raise HTTPException(status_code=404, detail="Appointment not found")
+
+        # Step 2: update campaign status to RECOVERED if campaign_id exists
+        previous = None
+        if appointment.get("campaign_id"):
+            previous = await txn.find_one_and_update(
+                "campaigns",
+                {"_id": appointment["campaign_id"]},
+                {"$set": {"status": CampaignStatus.RECOVERED.value}},
+                projection=CAMPAIGN_TRANSITION_FIELDS,
+            )
+
+        # Step 3: handle future recall
+        if payload.next_follow_up_date is not None:
+            await txn.update_one(
+                "patients",
+                {"_id": appointment.get("patient_id")},
+                {"$set": {"next_follow_up_date": payload.next_follow_up_date}},
+            )
+        return appointment, previous
+
+    appointment, previous = await run_in_transaction(db, complete)
+
+    if appointment.get("status") == AppointmentStatus.booked.value:
+        await record_appointment_booked(repo, appointment.get("appointment_date"), -1)
+    if appointment.get("campaign_id"):
+        thread_routes.update_status(appointment["campaign_id"], CampaignStatus.RECOVERED)
+    if previous:
+        await record_campaign_transition(
+            repo, previous.get("campaign_type"), previous.get("status"), CampaignStatus.RECOVERED
+        )
+        if previous.get("status") != CampaignStatus.RECOVERED.value:
+            emit_campaign_status(previous["_id"], CampaignStatus.RECOVERED, previous=previous.get("status"))
 
     return {"message": "Appointment completed."}
 
 
-@router.delete("/appointments/{appointment_id}")
+@router.delete("/appointments/{appointment_id}", response_model=MessageResponse)
 async def delete_appointment(appointment_id: str) -> Dict[str, str]:
     db = await get_database()
     repo = BaseRepository(db)
@@ -326,7 +533,12 @@ async def delete_appointment(appointment_id: str) -> Dict[str, str]:
     except Exception:
         query = {"_id": appointment_id}
 
-    await repo.delete_one("appointments", query)
+    deleted = await repo.find_one_and_delete("appointments", query, projection=APPOINTMENT_STATE_FIELDS)
+    if deleted:
+        await release_slots(repo, deleted["_id"])
+        availability_engine.invalidate(deleted.get("appointment_date"))
+    if deleted and deleted.get("status") == AppointmentStatus.booked.value:
+        await record_appointment_booked(repo, deleted.get("appointment_date"), -1)
     return {"message": "Appointment deleted."}
 
 
@@ -10,7 +10,7 @@ from backend.services.security import (
     create_access_token,
     get_current_user,
     get_user_by_email,
-    verify_password,
+    verify_password_async,
 )
 
 
@@ -20,7 +20,7 @@ router = APIRouter(tags=["auth"])
 @router.post("/auth/login", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()) -> Token:
     user = await get_user_by_email(form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
 
     access_token = create_access_token({"email": user.email})
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+
+from backend.api.streaming import dumps
+from backend.core.config import settings
+from backend.models.role import Role
+from backend.services.events import Event, event_bus
+from backend.services.security import get_current_user
+
+
+router = APIRouter(prefix="/admin/events", tags=["admin"])
+
+
+async def get_stream_user(request: Request, access_token: Optional[str] = Query(default=None)) -> Role:
+    # Browsers' EventSource cannot set headers, so the token may also come as ?access_token=.
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    token = token if scheme.lower() == "bearer" and token else access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_user(token)
+
+
+def _frame(event: Event) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event.id, event.type.encode("utf-8"), dumps(event.data))
+
+
+@router.get("/stream")
+async def stream_events(request: Request, _: Role = Depends(get_stream_user)) -> StreamingResponse:
+    """Server-Sent Events feed of campaign status changes and new interactions."""
+    subscription = event_bus.subscribe()
+
+    async def frames() -> AsyncIterator[bytes]:
+        try:
+            yield b"retry: 3000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=settings.events_heartbeat_seconds)
+                # A comment line keeps idle connections open through proxies.
+                yield _frame(event) if event is not None else b": ping\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,41 +1,64 @@
 from __future__ import annotations
 
-from datetime import datetime
+from typing import Any, Dict, List, Optional
 
+from bson import ObjectId
 from fastapi import APIRouter, HTTPException, Query
+from motor.motor_asyncio import AsyncIOMotorClientSession
 
-from backend.db.database import get_database
+from backend.db.database import get_database, run_in_transaction
 from backend.repositories.base import BaseRepository
 from backend.models.appointment import Appointment, AppointmentStatus, CreatedFrom
 from backend.models.campaign import CampaignStatus
+from backend.models.patient import PatientSnapshot, email_filter
 from backend.schemas.public import AppointmentBookingRequest, AppointmentBookingResponse
+from backend.services.availability import availability_engine
+from backend.services.events import emit_campaign_status
+from backend.services.kpi import record_appointment_booked, record_campaign_transition
+from backend.services.patient_snapshots import SNAPSHOT_SOURCE_FIELDS, patient_snapshot
+from backend.services.reservations import OutsideSchedule, SlotConflict, release_slots, reserve_slots
+from backend.services.routing import thread_routes
 
 
 router = APIRouter(tags=["public"])
 
 
-@router.get("/availability")
+@router.get("/availability", response_model=Dict[str, List[str]])
 async def get_availability(
     month: int = Query(..., ge=1, le=12),
     year: int = Query(..., ge=2000),
     service_id: str | None = None,
 ) -> dict[str, list[str]]:
-    # Simple generated schedule: Mon-Fri, 09:00-16:30 every 30 minutes
-    from calendar import monthrange
-
-    num_days = monthrange(year, month)[1]
-    slots_by_date: dict[str, list[str]] = {}
-    for day in range(1, num_days + 1):
-        dt = datetime(year, month, day)
-        # Skip weekends
-        if dt.weekday() >= 5:
-            continue
-        times: list[str] = []
-        for hour in range(9, 17):
-            for minute in (0, 30):
-                times.append(f"{hour:02d}:{minute:02d}")
-        slots_by_date[dt.date().isoformat()] = times
-    return slots_by_date
+    db = await get_database()
+    repo = BaseRepository(db)
+    return await availability_engine.month(repo, year, month, service_id)
+
+
+def _patient_with_booking_campaign(email: str, phone: str) -> List[Dict[str, Any]]:
+    """Patient matched by email OR phone, with their most recent RE_ENGAGED campaign as ``campaign``."""
+    return [
+        {"$match": {"$or": [email_filter(email), {"phone": phone}]}},
+        {"$limit": 1},
+        {"$project": {"_id": 1, **SNAPSHOT_SOURCE_FIELDS}},
+        {
+            "$lookup": {
+                "from": "campaigns",
+                "let": {"patient_id": "$_id"},
+                "pipeline": [
+                    {
+                        "$match": {
+                            "$expr": {"$eq": ["$patient_id", "$$patient_id"]},
+                            "status": CampaignStatus.RE_ENGAGED.value,
+                        }
+                    },
+                    {"$sort": {"updated_at": -1}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 1, "campaign_type": 1}},
+                ],
+                "as": "campaign",
+            }
+        },
+    ]
 
 
 @router.post("/appointments/book", response_model=AppointmentBookingResponse)
@@ -43,40 +66,67 @@ async def book_appointment(payload: AppointmentBookingRequest) -> AppointmentBoo
     db = await get_database()
     repo = BaseRepository(db)
 
-    # Step 1: Identify the patient by email OR phone
-    patient = await repo.find_one("patients", {"$or": [{"email": payload.email}, {"phone": payload.phone}]})
-    if not patient:
+    # Step 1: Identify the patient by email OR phone and their most recent RE_ENGAGED campaign
+    found = await repo.aggregate("patients", _patient_with_booking_campaign(payload.email, payload.phone))
+    if not found:
         raise HTTPException(status_code=404, detail="Patient not found")
-
-    # Step 1c: Find most recent active RE_ENGAGED campaign
-    # Use repository to emulate a sorted find_one
-    campaigns = await repo.find_many(
-        "campaigns",
-        {"patient_id": patient["_id"], "status": CampaignStatus.RE_ENGAGED.value},
-        sort=[("updated_at", -1)],
-        limit=1,
-    )
-    campaign = campaigns[0] if campaigns else None
+    patient = found[0]
+    campaign = patient["campaign"][0] if patient.get("campaign") else None
     if not campaign:
         raise HTTPException(status_code=404, detail="Active re-engaged campaign not found")
 
-    # Step 2: Create the appointment document
+    # Step 2: Reserve the time slot (single atomic write, outside the transaction so a
+    # conflict on one provider does not abort it)
+    appointment_id = ObjectId()
+    duration_minutes = payload.duration_minutes or 45
+    try:
+        provider_id = await reserve_slots(
+            repo, appointment_id=appointment_id, start=payload.appointment_date, duration_minutes=duration_minutes
+        )
+    except SlotConflict:
+        raise HTTPException(status_code=409, detail="Requested time slot is no longer available")
+    except OutsideSchedule:
+        raise HTTPException(status_code=422, detail="Requested time is outside provider working hours")
+
     appointment_doc = Appointment(
+        id=appointment_id,
         patient_id=patient["_id"],
+        patient=PatientSnapshot(**patient_snapshot(patient)),
         campaign_id=campaign["_id"],
+        provider_id=provider_id,
         appointment_date=payload.appointment_date,
-        duration_minutes=payload.duration_minutes or 45,
+        duration_minutes=duration_minutes,
         status=AppointmentStatus.booked,
         service_name=payload.service_name,
         notes=None,
         created_from=CreatedFrom.AI_AGENT_FORM,
-    ).model_dump(by_alias=True)
-
-    inserted_id = await repo.insert_one("appointments", appointment_doc)
-
-    # Step 3: Update campaign status to BOOKING_INITIATED
-    await repo.update_one("campaigns", {"_id": campaign["_id"]}, {"$set": {"status": CampaignStatus.BOOKING_INITIATED.value}})
+    ).to_mongo()
+
+    # Step 3: Move the campaign to BOOKING_INITIATED and create the appointment atomically
+    async def book(session: Optional[AsyncIOMotorClientSession]) -> ObjectId:
+        txn = BaseRepository(db, session=session)
+        claimed = await txn.find_one_and_update(
+            "campaigns",
+            {"_id": campaign["_id"], "status": CampaignStatus.RE_ENGAGED.value},
+            {"$set": {"status": CampaignStatus.BOOKING_INITIATED.value}},
+            projection={"_id": 1},
+        )
+        if claimed is None:
+            raise HTTPException(status_code=409, detail="Campaign is no longer awaiting a booking")
+        return await txn.insert_one("appointments", appointment_doc)
+
+    try:
+        inserted_id = await run_in_transaction(db, book)
+    except Exception:
+        await release_slots(repo, appointment_id)
+        raise
+
+    availability_engine.invalidate(payload.appointment_date)
+    thread_routes.update_status(campaign["_id"], CampaignStatus.BOOKING_INITIATED)
+    emit_campaign_status(campaign["_id"], CampaignStatus.BOOKING_INITIATED, previous=CampaignStatus.RE_ENGAGED)
+    await record_appointment_booked(repo, payload.appointment_date)
+    await record_campaign_transition(
+        repo, campaign.get("campaign_type"), CampaignStatus.RE_ENGAGED, CampaignStatus.BOOKING_INITIATED
+    )
 
     return AppointmentBookingResponse(message="Appointment booked successfully.", appointment_id=str(inserted_id))
-
-
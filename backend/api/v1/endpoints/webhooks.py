@@ -2,18 +2,32 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter
 
-from backend.services.email_processor import process_gmail_webhook
+from backend.db.database import get_database
+from backend.repositories.base import BaseRepository
+from backend.schemas.public import WebhookAck
+from backend.services.dedup import gmail_dedup, pubsub_message_id
+from backend.services.webhook_queue import enqueue_webhook
 
 
 router = APIRouter(tags=["webhooks"])
 
 
-@router.post("/webhooks/gmail")
-async def gmail_webhook(payload: Dict[str, Any], background_tasks: BackgroundTasks) -> dict[str, str]:
-    # Immediately return 200 and run processing in background
-    background_tasks.add_task(process_gmail_webhook, payload)
+@router.post("/webhooks/gmail", response_model=WebhookAck)
+async def gmail_webhook(payload: Dict[str, Any]) -> dict[str, str]:
+    # Persist to the outbox and return immediately; consumers process it in batches.
+    # If the write fails we return an error so Pub/Sub redelivers.
+    db = await get_database()
+    repo = BaseRepository(db)
+    # Pub/Sub redelivers; acknowledge repeats without decoding or enqueueing them again.
+    message_id = pubsub_message_id(payload)
+    if message_id and not await gmail_dedup.claim(repo, message_id):
+        return {"status": "duplicate"}
+    try:
+        await enqueue_webhook(repo, "gmail", payload)
+    except Exception:
+        if message_id:
+            await gmail_dedup.forget(repo, message_id)
+        raise
     return {"status": "accepted"}
-
-
@@ -6,6 +6,7 @@ from backend.api.v1.endpoints import auth as auth_endpoints
 from backend.api.v1.endpoints import public as public_endpoints
 from backend.api.v1.endpoints import webhooks as webhooks_endpoints
 from backend.api.v1.endpoints import admin as admin_endpoints
+from backend.api.v1.endpoints import events as events_endpoints
 
 
 api_router = APIRouter()
@@ -15,4 +16,5 @@ api_router.include_router(auth_endpoints.router)
 api_router.include_router(public_endpoints.router)
 api_router.include_router(webhooks_endpoints.router)
 api_router.include_router(admin_endpoints.router)
+api_router.include_router(events_endpoints.router)
 
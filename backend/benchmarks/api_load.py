@@ -0,0 +1,312 @@
+"""Latency and throughput of the hot API endpoints, served in-process.
+
+Seeds a synthetic dataset (``backend.benchmarks.dataset``) into a dedicated
+database, then drives the app through httpx's ASGI transport (no network, no
+server process) with ``--concurrency`` clients per scenario and reports
+p50/p95/p99 latency, req/s and status codes as JSON.
+
+By default it runs against ``MONGO_URI``, in the database given by
+``--database``, which is dropped and reseeded. ``--stand-in`` uses the
+in-memory mongomock-motor client instead (``pip install mongomock-motor``);
+it has no ``$lookup`` sub-pipelines, so ``book`` fails there, and its timings
+say nothing about MongoDB itself.
+
+    python -m backend.benchmarks.api_load --requests 500 --output run.json
+    python -m backend.benchmarks.api_load --compare run.json --output new.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import httpx
+
+from backend.benchmarks.dataset import ADMIN_EMAIL, ADMIN_PASSWORD, Dataset, DatasetSpec, seed
+from backend.core.config import settings
+from backend.db import database
+from backend.db.indexes import ensure_indexes
+from backend.repositories.base import BaseRepository
+
+
+API = "/api/v1"
+
+# (method, path, keyword arguments for httpx) for the n-th request of a scenario.
+RequestFactory = Callable[[int], tuple[str, str, Dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    build: Callable[[Dataset, Dict[str, str]], RequestFactory]
+    # Caps the request count for endpoints that are slow by design (bcrypt).
+    max_requests: Optional[int] = None
+
+
+def _dashboard(dataset: Dataset, auth: Dict[str, str]) -> RequestFactory:
+    return lambda i: ("GET", f"{API}/admin/dashboard-stats", {"headers": auth})
+
+
+def _campaigns(dataset: Dataset, auth: Dict[str, str]) -> RequestFactory:
+    # Mix the unfiltered list with the status filter operators use most.
+    filters = ["", "&status=HANDOFF_REQUIRED", "", "&status=RE_ENGAGED"]
+    return lambda i: ("GET", f"{API}/admin/campaigns?limit=25{filters[i % len(filters)]}", {"headers": auth})
+
+
+def _appointments(dataset: Dataset, auth: Dict[str, str]) -> RequestFactory:
+    year, month = dataset.month
+    start = datetime(year, month, 1)
+    weeks = [(start + timedelta(days=7 * w), start + timedelta(days=7 * w + 7)) for w in range(4)]
+
+    def build(i: int) -> tuple[str, str, Dict[str, Any]]:
+        first, last = weeks[i % len(weeks)]
+        params = {"start_date": first.isoformat(), "end_date": last.isoformat()}
+        return "GET", f"{API}/admin/appointments", {"headers": auth, "params": params}
+
+    return build
+
+
+def _availability(dataset: Dataset, auth: Dict[str, str]) -> RequestFactory:
+    year, month = dataset.month
+    # Three months and two services: repeat visits hit the cache, the rest compute.
+    months = [((year * 12 + month - 1 + k) // 12, (month - 1 + k) % 12 + 1) for k in range(3)]
+    services = [None, "teeth_whitening"]
+
+    def build(i: int) -> tuple[str, str, Dict[str, Any]]:
+        y, m = months[i % len(months)]
+        params: Dict[str, Any] = {"year": y, "month": m}
+        service = services[(i // len(months)) % len(services)]
+        if service:
+            params["service_id"] = service
+        return "GET", f"{API}/availability", {"params": params}
+
+    return build
+
+
+def _book(dataset: Dataset, auth: Dict[str, str]) -> RequestFactory:
+    # Every request books a different patient into a different free weekday slot.
+    slots = (
+        day.replace(hour=hour)
+        for day in (datetime(2031, 1, 6) + timedelta(days=d) for d in itertools.count())
+        if day.weekday() < 5
+        for hour in range(9, 17)
+    )
+    contacts = itertools.cycle(dataset.booking_contacts)
+
+    def build(i: int) -> tuple[str, str, Dict[str, Any]]:
+        email, phone = next(contacts)
+        body = {
+            "name": "Booker",
+            "email": email,
+            "phone": phone,
+            "appointment_date": next(slots).isoformat(),
+            "service_name": "Cleaning",
+            "duration_minutes": 60,
+        }
+        return "POST", f"{API}/appointments/book", {"json": body}
+
+    return build
+
+
+def _login(dataset: Dataset, auth: Dict[str, str]) -> RequestFactory:
+    form = {"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
+    return lambda i: ("POST", f"{API}/auth/login", {"data": form})
+
+
+def _gmail_webhook(dataset: Dataset, auth: Dict[str, str]) -> RequestFactory:
+    run = int(time.time())
+
+    def build(i: int) -> tuple[str, str, Dict[str, Any]]:
+        data = base64.b64encode(json.dumps({"emailAddress": "clinic@example.com", "historyId": i}).encode())
+        body = {"message": {"data": data.decode(), "messageId": f"bench-{run}-{i}"}, "subscription": "bench"}
+        return "POST", f"{API}/webhooks/gmail", {"json": body}
+
+    return build
+
+
+SCENARIOS: Sequence[Scenario] = (
+    Scenario("dashboard_stats", _dashboard),
+    Scenario("admin_campaigns", _campaigns),
+    Scenario("admin_appointments", _appointments),
+    Scenario("availability", _availability),
+    Scenario("book", _book),
+    Scenario("login", _login, max_requests=100),
+    Scenario("webhook_gmail", _gmail_webhook),
+)
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    # Nearest rank on an already sorted list.
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _drive(
+    client: httpx.AsyncClient, factory: RequestFactory, *, requests: int, concurrency: int
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Counter[int] = Counter()
+    counter = itertools.count()
+
+    async def worker() -> None:
+        while (i := next(counter)) < requests:
+            method, url, kwargs = factory(i)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(ordered, 50), 3),
+        "p95_ms": round(_percentile(ordered, 95), 3),
+        "p99_ms": round(_percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+def _use_stand_in() -> None:
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        sys.exit("--stand-in needs mongomock-motor: pip install mongomock-motor")
+    client = AsyncMongoMockClient()
+    database.get_motor_client = lambda: client  # type: ignore[assignment]
+    # The stand-in has no sessions, and no `hello` to tell it is standalone.
+    settings.mongo_transactions = False
+
+
+async def run(
+    *,
+    spec: DatasetSpec,
+    scenarios: Sequence[Scenario],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    stand_in: bool,
+) -> Dict[str, Any]:
+    # Imported here so settings changed by the caller apply to module-level singletons.
+    from backend.main import create_app
+
+    db = await database.get_database()
+    spec.booking_patients = max(spec.booking_patients, requests + warmup)
+    dataset = await seed(BaseRepository(db), spec)
+    if not stand_in:
+        await ensure_indexes(db)
+
+    app = create_app()
+    # Unhandled errors become 500s and are counted instead of aborting the run.
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    report: Dict[str, Any] = {
+        "meta": {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "backend": "stand-in" if stand_in else "mongodb",
+            "python": sys.version.split()[0],
+            "requests": requests,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "dataset": {"spec": asdict(spec), "counts": dataset.counts, "seed_s": dataset.elapsed_s},
+        },
+        "scenarios": {},
+    }
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60.0) as client:
+        login = await client.post(f"{API}/auth/login", data={"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+        login.raise_for_status()
+        auth = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        for scenario in scenarios:
+            factory = scenario.build(dataset, auth)
+            count = min(requests, scenario.max_requests or requests)
+            if warmup:
+                # Warm-up requests use their own indices so they do not reuse booking slots.
+                await _drive(client, lambda i: factory(count + i), requests=warmup, concurrency=concurrency)
+            report["scenarios"][scenario.name] = await _drive(
+                client, factory, requests=count, concurrency=concurrency
+            )
+    return report
+
+
+COMPARED = ("p50_ms", "p95_ms", "p99_ms", "rps")
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], *, threshold: float) -> Dict[str, Any]:
+    """Relative change per scenario and metric; latency up or req/s down by more than ``threshold`` is a regression."""
+    changes: Dict[str, Any] = {}
+    regressions: List[str] = []
+    for name, now in current.get("scenarios", {}).items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        row: Dict[str, Any] = {}
+        for metric in COMPARED:
+            old, new = before.get(metric) or 0.0, now.get(metric) or 0.0
+            change = (new - old) / old if old else 0.0
+            row[metric] = {"before": old, "after": new, "change_pct": round(change * 100.0, 1)}
+            worse = -change if metric == "rps" else change
+            if worse > threshold:
+                regressions.append(f"{name}.{metric}")
+        if now.get("errors", 0) > before.get("errors", 0):
+            regressions.append(f"{name}.errors")
+        changes[name] = row
+    return {"threshold_pct": round(threshold * 100.0, 1), "scenarios": changes, "regressions": regressions}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", default="mundos_ai_bench", help="dropped and reseeded; never the app database")
+    parser.add_argument("--stand-in", action="store_true", help="use in-memory mongomock-motor instead of MONGO_URI")
+    parser.add_argument("--patients", type=int, default=DatasetSpec.patients)
+    parser.add_argument("--appointments", type=int, default=DatasetSpec.appointments)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    parser.add_argument("--requests", type=int, default=200, help="per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per scenario")
+    parser.add_argument("--scenario", action="append", choices=[s.name for s in SCENARIOS], help="repeatable")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--compare", help="baseline report to diff against; exits 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    if args.database == settings.database_name:
+        sys.exit(f"--database {args.database!r} is the application database; pick a dedicated one")
+    settings.database_name = args.database
+    if args.stand_in:
+        _use_stand_in()
+
+    selected = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    result = asyncio.run(
+        run(
+            spec=DatasetSpec(patients=args.patients, appointments=args.appointments, seed=args.seed),
+            scenarios=selected,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            stand_in=args.stand_in,
+        )
+    )
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            result["comparison"] = compare(json.load(baseline_file), result, threshold=args.threshold / 100.0)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(result, output_file, indent=2)
+    print(json.dumps(result, indent=2))
+    if result.get("comparison", {}).get("regressions"):
+        sys.exit(1)
@@ -0,0 +1,67 @@
+"""Many clients booking the same time slot at once.
+
+Fires ``--clients`` concurrent ``reserve_slots`` calls for one start time against
+the configured MongoDB and reports how many got a provider and how many hit a
+conflict. With N providers scheduled, exactly N should succeed however high the
+concurrency. Claims created by the run are removed afterwards.
+
+    python -m backend.benchmarks.booking_contention --clients 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+
+from backend.db.database import get_database
+from backend.repositories.base import BaseRepository
+from backend.services.reservations import SLOT_CLAIMS_COLLECTION, SlotConflict, reserve_slots
+
+
+async def run(*, clients: int, start: datetime, duration: int, provider_id: Optional[str]) -> Dict[str, Any]:
+    repo = BaseRepository(await get_database())
+    ids = [ObjectId() for _ in range(clients)]
+
+    async def book(appointment_id: ObjectId) -> str:
+        try:
+            return await reserve_slots(
+                repo, appointment_id=appointment_id, start=start, duration_minutes=duration, provider_id=provider_id
+            )
+        except SlotConflict:
+            return "conflict"
+
+    started = time.perf_counter()
+    try:
+        outcomes = await asyncio.gather(*(book(i) for i in ids))
+    finally:
+        await repo.delete_many(SLOT_CLAIMS_COLLECTION, {"_id": {"$in": ids}})
+    elapsed = time.perf_counter() - started
+    by_provider = Counter(o for o in outcomes if o != "conflict")
+    return {
+        "clients": clients,
+        "start": start.isoformat(),
+        "duration_minutes": duration,
+        "booked": sum(by_provider.values()),
+        "conflicts": outcomes.count("conflict"),
+        "booked_by_provider": dict(by_provider),
+        "elapsed_s": round(elapsed, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--start", type=datetime.fromisoformat, default=datetime(2030, 1, 7, 10, 0))
+    parser.add_argument("--duration", type=int, default=45)
+    parser.add_argument("--provider-id")
+    args = parser.parse_args()
+    report = asyncio.run(
+        run(clients=args.clients, start=args.start, duration=args.duration, provider_id=args.provider_id)
+    )
+    print(json.dumps(report, indent=2))
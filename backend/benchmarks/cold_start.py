@@ -0,0 +1,104 @@
+"""Cold-start time of one worker process, checked against a budget.
+
+Each run is a fresh interpreter that imports ``backend.main`` and then runs the
+app's lifespan startup (pool warm-up, indexes, cache priming) and shutdown,
+the same sequence a worker goes through under ``backend.scripts.serve``.
+Reports the median of ``--runs`` as JSON and exits 1 when the median of
+import + startup is over ``--budget-ms``.
+
+Startup needs ``MONGO_URI`` to be reachable; ``--stand-in`` uses the in-memory
+mongomock-motor client instead, which leaves only imports and local work.
+
+    python -m backend.benchmarks.cold_start --runs 5 --budget-ms 1500
+    python -m backend.benchmarks.cold_start --stand-in
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+
+def _child(stand_in: bool) -> Dict[str, Any]:
+    import asyncio
+
+    if stand_in:
+        # Imported before the clock starts; it is not part of the app.
+        from mongomock_motor import AsyncMongoMockClient
+
+    started = time.perf_counter()
+    from backend.db import database
+
+    if stand_in:
+        # Cached like the real getter, since shutdown clears it.
+        database.get_motor_client = functools.lru_cache(maxsize=1)(AsyncMongoMockClient)  # type: ignore[assignment]
+    from backend.main import app
+
+    imported = time.perf_counter()
+    # Deferred to startup; any of these showing up here is an import-time regression.
+    heavy = sorted(name for name in ("passlib.context", "jose.jwt", "apscheduler.schedulers") if name in sys.modules)
+
+    async def lifecycle() -> Dict[str, float]:
+        began = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+        return {
+            "startup_ms": (ready - began) * 1000.0,
+            "shutdown_ms": (time.perf_counter() - ready) * 1000.0,
+        }
+
+    result: Dict[str, Any] = {"import_ms": (imported - started) * 1000.0}
+    result.update(asyncio.run(lifecycle()))
+    result["steps_ms"] = dict(app.state.startup_timings)
+    result["heavy_modules_at_import"] = heavy
+    return result
+
+
+def _spawn(stand_in: bool) -> Dict[str, Any]:
+    command = [sys.executable, "-m", "backend.benchmarks.cold_start", "--child"]
+    if stand_in:
+        command.append("--stand-in")
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    # The last line is ours; the app may have logged to stdout before it.
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(*, runs: int, budget_ms: float, stand_in: bool) -> Dict[str, Any]:
+    samples: List[Dict[str, Any]] = [_spawn(stand_in) for _ in range(runs)]
+
+    def median(key: str) -> float:
+        return round(statistics.median(sample[key] for sample in samples), 1)
+
+    cold_start = round(statistics.median(s["import_ms"] + s["startup_ms"] for s in samples), 1)
+    return {
+        "runs": runs,
+        "backend": "stand-in" if stand_in else "mongodb",
+        "import_ms": median("import_ms"),
+        "startup_ms": median("startup_ms"),
+        "shutdown_ms": median("shutdown_ms"),
+        "cold_start_ms": cold_start,
+        "budget_ms": budget_ms,
+        "within_budget": cold_start <= budget_ms,
+        "last_run_steps_ms": samples[-1]["steps_ms"],
+        "heavy_modules_at_import": samples[-1]["heavy_modules_at_import"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="median import + startup allowed")
+    parser.add_argument("--stand-in", action="store_true", help="use in-memory mongomock-motor instead of MONGO_URI")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(_child(args.stand_in)))
+        sys.exit(0)
+    report = run(runs=args.runs, budget_ms=args.budget_ms, stand_in=args.stand_in)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["within_budget"] else 1)
@@ -0,0 +1,247 @@
+"""Synthetic, reproducible dataset for the API benchmarks.
+
+Shapes follow production rather than uniform noise: a minority of patients own
+most campaigns, conversation lengths are heavy-tailed, most campaigns sit in a
+few statuses, and appointments cluster in weekday business hours of the
+current month. Every collection the seeder writes is dropped first, so it must
+only be pointed at a dedicated database (``backend.benchmarks.api_load`` does
+this).
+"""
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence
+
+from bson import ObjectId
+
+from backend.models.appointment import AppointmentStatus, CreatedFrom
+from backend.models.campaign import CampaignStatus, CampaignType
+from backend.models.patient import ChannelType, PatientType
+from backend.repositories.base import BaseRepository, utcnow
+from backend.services.kpi import COUNTERS_COLLECTION, reconcile_kpi_counters
+from backend.services.patient_snapshots import patient_snapshot
+from backend.services.security import get_password_hash
+
+
+ADMIN_EMAIL = "bench-admin@example.com"
+ADMIN_PASSWORD = "bench-password"
+
+COLLECTIONS = (
+    "patients",
+    "campaigns",
+    "interactions",
+    "appointments",
+    "roles",
+    "slot_claims",
+    "webhook_outbox",
+    "webhook_dedup",
+    COUNTERS_COLLECTION,
+)
+
+CAMPAIGN_STATUS_WEIGHTS = {
+    CampaignStatus.ATTEMPTING_RECOVERY: 40,
+    CampaignStatus.RE_ENGAGED: 12,
+    CampaignStatus.HANDOFF_REQUIRED: 8,
+    CampaignStatus.BOOKING_INITIATED: 5,
+    CampaignStatus.RECOVERED: 20,
+    CampaignStatus.RECOVERY_FAILED: 12,
+    CampaignStatus.RECOVERY_DECLINED: 3,
+}
+SERVICES = ("Cleaning", "Whitening", "Filling", "Consultation", "Crown")
+INSERT_BATCH = 1000
+
+
+@dataclass
+class DatasetSpec:
+    patients: int = 2000
+    # Mean campaigns per patient; the distribution is skewed (see _campaign_count).
+    campaigns_per_patient: float = 1.2
+    # Mean messages per campaign, heavy-tailed and capped at max_interactions.
+    interactions_per_campaign: float = 6.0
+    max_interactions: int = 500
+    appointments: int = 1500
+    # Patients with a RE_ENGAGED campaign reserved for booking requests.
+    booking_patients: int = 500
+    seed: int = 7
+
+
+@dataclass
+class Dataset:
+    """What was seeded, for building requests against it."""
+
+    spec: DatasetSpec
+    counts: Dict[str, int] = field(default_factory=dict)
+    # (email, phone) of patients holding a booking campaign, one per booking request.
+    booking_contacts: List[tuple[str, str]] = field(default_factory=list)
+    month: tuple[int, int] = (1, 2000)
+    elapsed_s: float = 0.0
+
+
+def _campaign_count(rng: random.Random, mean: float) -> int:
+    # Geometric with the requested mean: most patients have 0-1, a few have many.
+    if mean <= 0:
+        return 0
+    p = 1.0 / (1.0 + mean)
+    count = 0
+    while rng.random() > p:
+        count += 1
+    return count
+
+
+def _interaction_count(rng: random.Random, mean: float, cap: int) -> int:
+    # Pareto with alpha 1.5 has mean 3 * x_min.
+    return min(cap, max(1, int(rng.paretovariate(1.5) * mean / 3.0)))
+
+
+def _business_slot(rng: random.Random, year: int, month: int) -> datetime:
+    while True:
+        day = datetime(year, month, rng.randint(1, 28))
+        if day.weekday() < 5:
+            return day.replace(hour=rng.randint(9, 16), minute=rng.choice((0, 30)))
+
+
+async def _insert(repo: BaseRepository, collection: str, docs: Sequence[Dict[str, Any]]) -> None:
+    for offset in range(0, len(docs), INSERT_BATCH):
+        await repo.insert_many(collection, docs[offset : offset + INSERT_BATCH], with_timestamps=False)
+
+
+async def seed(repo: BaseRepository, spec: DatasetSpec) -> Dataset:
+    started = time.perf_counter()
+    rng = random.Random(spec.seed)
+    now = utcnow().replace(tzinfo=None, microsecond=0)
+    dataset = Dataset(spec=spec, month=(now.year, now.month))
+    for collection in COLLECTIONS:
+        await repo.db.drop_collection(collection)
+
+    patients: List[Dict[str, Any]] = []
+    for i in range(spec.patients):
+        created = now - timedelta(days=rng.randint(30, 720))
+        patients.append(
+            {
+                "_id": ObjectId(),
+                "name": f"Patient {i}",
+                "email": f"patient{i}@example.com",
+                "phone": f"+1555{i:07d}",
+                "patient_type": (PatientType.EXISTING if rng.random() < 0.7 else PatientType.COLD_LEAD).value,
+                "preferred_channel": [rng.choice(list(ChannelType)).value],
+                "treatment_history": [
+                    {"procedure_name": rng.choice(SERVICES), "procedure_date": created + timedelta(days=30 * k)}
+                    for k in range(rng.randint(0, 3))
+                ],
+                "created_at": created,
+                "updated_at": created,
+            }
+        )
+
+    campaigns: List[Dict[str, Any]] = []
+    interactions: List[Dict[str, Any]] = []
+    statuses, weights = list(CAMPAIGN_STATUS_WEIGHTS), list(CAMPAIGN_STATUS_WEIGHTS.values())
+    for patient in patients:
+        for _ in range(_campaign_count(rng, spec.campaigns_per_patient)):
+            campaign_id = ObjectId()
+            updated = now - timedelta(minutes=rng.randint(0, 90 * 24 * 60))
+            campaigns.append(
+                {
+                    "_id": campaign_id,
+                    "patient_id": patient["_id"],
+                    "patient": patient_snapshot(patient),
+                    "campaign_type": (CampaignType.RECOVERY if rng.random() < 0.7 else CampaignType.RECALL).value,
+                    "status": rng.choices(statuses, weights)[0].value,
+                    "channel": {"type": "email", "thread_id": f"thread-{campaign_id}"},
+                    "engagement_summary": "Asked about pricing and availability next week.",
+                    "follow_up_details": {"attempts_made": rng.randint(0, 3), "max_attempts": 3},
+                    "created_at": updated - timedelta(days=rng.randint(0, 30)),
+                    "updated_at": updated,
+                }
+            )
+            messages = _interaction_count(rng, spec.interactions_per_campaign, spec.max_interactions)
+            for m in range(messages):
+                interactions.append(
+                    {
+                        "campaign_id": campaign_id,
+                        "direction": "outgoing" if m % 2 == 0 else "incoming",
+                        "content": "Could we find a time on Thursday afternoon? " * rng.randint(1, 4),
+                        "timestamp": updated - timedelta(minutes=10 * (messages - m)),
+                    }
+                )
+
+    # Booking targets: one RE_ENGAGED campaign each, so every booking request can succeed.
+    for i in range(spec.booking_patients):
+        patient_id = ObjectId()
+        email, phone = f"booker{i}@example.com", f"+1666{i:07d}"
+        patients.append(
+            {
+                "_id": patient_id,
+                "name": f"Booker {i}",
+                "email": email,
+                "phone": phone,
+                "patient_type": PatientType.EXISTING.value,
+                "preferred_channel": [ChannelType.email.value],
+                "treatment_history": [],
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        campaigns.append(
+            {
+                "patient_id": patient_id,
+                "patient": patient_snapshot(patients[-1]),
+                "campaign_type": CampaignType.RECOVERY.value,
+                "status": CampaignStatus.RE_ENGAGED.value,
+                "channel": {"type": "email"},
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        dataset.booking_contacts.append((email, phone))
+
+    appointments: List[Dict[str, Any]] = []
+    for _ in range(spec.appointments):
+        patient = rng.choice(patients[: spec.patients] or patients)
+        status = rng.choices(
+            [AppointmentStatus.booked, AppointmentStatus.completed, AppointmentStatus.cancelled], [80, 15, 5]
+        )[0]
+        appointments.append(
+            {
+                "patient_id": patient["_id"],
+                "patient": patient_snapshot(patient),
+                "provider_id": "default",
+                "appointment_date": _business_slot(rng, now.year, now.month),
+                "duration_minutes": rng.choice((30, 45, 60)),
+                "status": status.value,
+                "service_name": rng.choice(SERVICES),
+                "created_from": rng.choice(list(CreatedFrom)).value,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+
+    await _insert(repo, "patients", patients)
+    await _insert(repo, "campaigns", campaigns)
+    await _insert(repo, "interactions", interactions)
+    await _insert(repo, "appointments", appointments)
+    await repo.insert_one(
+        "roles",
+        {
+            "name": "Bench Admin",
+            "email": ADMIN_EMAIL,
+            "role": "admin",
+            "hashed_password": get_password_hash(ADMIN_PASSWORD),
+        },
+    )
+
+    # The dashboard reads a counter document; build it the way a first read would.
+    await reconcile_kpi_counters(repo)
+
+    dataset.counts = {
+        "patients": len(patients),
+        "campaigns": len(campaigns),
+        "interactions": len(interactions),
+        "appointments": len(appointments),
+    }
+    dataset.elapsed_s = round(time.perf_counter() - started, 3)
+    return dataset
+
@@ -0,0 +1,91 @@
+"""Per-document cost of turning stored patient documents into Python objects.
+
+Decodes a batch of synthetic patient documents (two treatment-history items
+each) along these paths:
+
+* ``from_mongo``: ``MongoModel.from_mongo`` (validation in pydantic-core);
+* ``model_construct``: no validation, for reference only: nested items stay
+  dicts and enums plain strings, so it is not a drop-in replacement;
+* ``record``: ``PatientRecord.from_mongo``, the slotted bulk-read view;
+* ``dict``: reading the same fields off the raw document, for reference.
+
+    python -m backend.benchmarks.hydration --documents 10000 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from bson import ObjectId
+
+from backend.models import Patient
+from backend.models.records import PatientRecord
+
+
+def patients(count: int) -> List[Dict[str, Any]]:
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Patient {i}",
+            "email": f"patient{i}@example.com",
+            "phone": f"+1555{i:07d}",
+            "patient_type": "EXISTING" if i % 3 else "COLD_LEAD",
+            "preferred_channel": ["email", "sms"] if i % 2 else ["whatsapp"],
+            "treatment_history": [
+                {
+                    "procedure_name": "Cleaning",
+                    "procedure_date": start + timedelta(days=i % 365),
+                    "next_recommended_follow_up": "6 months",
+                    "next_follow_up_date": start + timedelta(days=180 + i % 365),
+                },
+                {"procedure_name": "Whitening", "procedure_date": start + timedelta(days=30 + i % 365)},
+            ],
+            "created_at": start,
+            "updated_at": start,
+        }
+        for i in range(count)
+    ]
+
+
+def _read_fields(doc: Dict[str, Any]) -> tuple:
+    return (doc["_id"], doc.get("name"), doc.get("email"), doc.get("phone"), doc.get("patient_type"))
+
+
+def _paths(docs: List[Dict[str, Any]]) -> Dict[str, Callable[[], list]]:
+    return {
+        "from_mongo": lambda: [Patient.from_mongo(doc) for doc in docs],
+        "model_construct": lambda: [Patient.model_construct(**doc) for doc in docs],
+        "record": lambda: [PatientRecord.from_mongo(doc) for doc in docs],
+        "dict": lambda: [_read_fields(doc) for doc in docs],
+    }
+
+
+def run(*, documents: int, repeat: int) -> Dict[str, Any]:
+    docs = patients(documents)
+    report: Dict[str, Any] = {"documents": documents}
+    for name, fn in _paths(docs).items():
+        fn()
+        samples: List[float] = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - started)
+        median = statistics.median(samples)
+        report[name] = {
+            "batch_ms": round(median * 1000.0, 2),
+            "per_document_us": round(median * 1e6 / documents, 3),
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(documents=args.documents, repeat=args.repeat), indent=2))
@@ -0,0 +1,174 @@
+"""Event-loop stall caused by logging during a webhook-style burst.
+
+A probe task sleeps ``--probe-ms`` in a loop and records how late it wakes up
+while ``--tasks`` coroutines each log ``--records`` structured lines (with a
+request id bound, as under the request middleware). Logging setups compared:
+
+* ``off``: no handler, records below the root level are discarded;
+* ``sync_jsonlogger``: the previous setup, python-json-logger on a
+  ``StreamHandler`` on the event loop thread;
+* ``sync_orjson``: ``configure_logging(queued=False)``, orjson on the loop thread;
+* ``queued``: ``configure_logging()``, the default: queue on the loop thread,
+  encoding and I/O on the listener thread.
+
+Output goes to a temporary file unless ``--sink`` names one (e.g. ``/dev/stderr``
+to include terminal writes). ``--write-latency-us`` adds a blocking delay to
+every write, standing in for a log pipe whose reader is behind.
+
+    python -m backend.benchmarks.logging_stall --tasks 200 --records 50
+    python -m backend.benchmarks.logging_stall --write-latency-us 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+from backend.core.logs import bind_request_id, configure_logging, dropped_records, stop_logging, unbind_request_id
+
+
+logger = logging.getLogger("backend.benchmarks.logging_stall")
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    # Nearest rank on an already sorted list.
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _setup_off(stream: TextIO) -> None:
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.setLevel(logging.WARNING)
+
+
+def _setup_jsonlogger(stream: TextIO) -> None:
+    from pythonjsonlogger import jsonlogger
+
+    _setup_off(stream)
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(jsonlogger.JsonFormatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+SETUPS: Dict[str, Callable[[TextIO], None]] = {
+    "off": _setup_off,
+    "sync_jsonlogger": _setup_jsonlogger,
+    "sync_orjson": lambda stream: configure_logging(queued=False, stream=stream),
+    "queued": lambda stream: configure_logging(queued=True, queue_size=1_000_000, stream=stream),
+}
+
+
+class _SlowStream:
+    """Blocks for ``latency`` seconds per write, releasing the GIL like a blocked pipe write."""
+
+    def __init__(self, stream: TextIO, latency: float) -> None:
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+async def _probe(interval: float, lags: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - started - interval))
+
+
+async def _webhook(index: int, records: int) -> None:
+    token = bind_request_id(f"bench-{index}")
+    try:
+        for i in range(records):
+            logger.info(
+                "webhook_item_processed",
+                extra={"source": "gmail", "message_id": f"m-{index}-{i}", "thread_id": f"t-{index}", "ms": 0.42},
+            )
+            if i % 10 == 9:
+                await asyncio.sleep(0)
+    finally:
+        unbind_request_id(token)
+
+
+async def _run_once(*, tasks: int, records: int, probe_interval: float) -> Dict[str, Any]:
+    lags: List[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(probe_interval, lags, stop))
+    await asyncio.sleep(probe_interval * 5)
+    lags.clear()
+    started = time.perf_counter()
+    await asyncio.gather(*(_webhook(t, records) for t in range(tasks)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    ordered = sorted(lags)
+    return {
+        "burst_ms": round(elapsed * 1000.0, 2),
+        "per_record_us": round(elapsed * 1e6 / (tasks * records), 3),
+        "probe_samples": len(ordered),
+        "lag_p50_ms": round(_percentile(ordered, 50) * 1000.0, 3),
+        "lag_p99_ms": round(_percentile(ordered, 99) * 1000.0, 3),
+        "lag_max_ms": round((ordered[-1] if ordered else 0.0) * 1000.0, 3),
+        "stall_total_ms": round(sum(ordered) * 1000.0, 2),
+    }
+
+
+def run(
+    *, tasks: int, records: int, probe_ms: float, sink: Optional[str], write_latency_us: float = 0.0
+) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "tasks": tasks,
+        "records_per_task": records,
+        "probe_ms": probe_ms,
+        "write_latency_us": write_latency_us,
+    }
+    for name, setup in SETUPS.items():
+        with open(sink, "a") if sink else tempfile.TemporaryFile("w") as output:
+            stream: Any = _SlowStream(output, write_latency_us / 1e6) if write_latency_us else output
+            try:
+                setup(stream)
+            except ImportError as exc:
+                report[name] = {"skipped": str(exc)}
+                continue
+            result = asyncio.run(_run_once(tasks=tasks, records=records, probe_interval=probe_ms / 1000.0))
+            drain_started = time.perf_counter()
+            dropped = dropped_records()
+            # Flush the queue so the next setup starts clean; not counted against the loop.
+            stop_logging()
+            result["drain_ms"] = round((time.perf_counter() - drain_started) * 1000.0, 2)
+            result["dropped"] = dropped
+            report[name] = result
+            _setup_off(stream)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--records", type=int, default=50, help="log lines per task")
+    parser.add_argument("--probe-ms", type=float, default=1.0)
+    parser.add_argument("--sink", help="file to write log lines to instead of a temporary file")
+    parser.add_argument("--write-latency-us", type=float, default=0.0, help="blocking delay added to every write")
+    args = parser.parse_args()
+    report = run(
+        tasks=args.tasks,
+        records=args.records,
+        probe_ms=args.probe_ms,
+        sink=args.sink,
+        write_latency_us=args.write_latency_us,
+    )
+    print(json.dumps(report, indent=2))
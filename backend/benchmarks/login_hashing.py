@@ -0,0 +1,94 @@
+"""Event-loop latency while many logins verify bcrypt passwords concurrently.
+
+Compares the old inline ``verify_password`` call in the login handler with the
+pooled ``verify_password_async``. A probe task sleeps for a fixed interval and
+records how late it wakes up; that lateness is the stall every other request on
+the worker would see.
+
+    python -m backend.benchmarks.login_hashing --logins 32 --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from backend.services.hashing import HashingPool
+from backend.services.security import get_password_hash, verify_password
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _measure(login: Callable[[], Awaitable[bool]], logins: int, interval: float) -> Dict[str, Any]:
+    lags: List[float] = []
+    done = asyncio.Event()
+
+    async def probe() -> None:
+        while not done.is_set():
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - expected) * 1000.0)
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(interval * 2)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+    assert all(results)
+    return {
+        "logins": logins,
+        "elapsed_s": round(elapsed, 3),
+        "logins_per_s": round(logins / elapsed, 2),
+        "loop_lag_ms": {
+            "p50": round(_percentile(lags, 50), 2),
+            "p99": round(_percentile(lags, 99), 2),
+            "max": round(max(lags, default=0.0), 2),
+            "mean": round(statistics.fmean(lags), 2) if lags else 0.0,
+        },
+    }
+
+
+async def run(*, logins: int, workers: int, kind: str, interval: float) -> Dict[str, Any]:
+    password = "correct horse battery staple"
+    hashed = get_password_hash(password)
+
+    async def inline_login() -> bool:
+        # Yield first so all logins are scheduled, as they would be under a burst.
+        await asyncio.sleep(0)
+        return verify_password(password, hashed)
+
+    pool = HashingPool(workers=workers, max_concurrency=workers, kind=kind)  # type: ignore[arg-type]
+
+    async def pooled_login() -> bool:
+        return await pool.run(verify_password, password, hashed)
+
+    try:
+        before = await _measure(inline_login, logins, interval)
+        after = await _measure(pooled_login, logins, interval)
+        return {"inline": before, "pooled": {**after, "pool": pool.stats()}}
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    report = asyncio.run(
+        run(logins=args.logins, workers=args.workers, kind=args.executor, interval=args.interval_ms / 1000.0)
+    )
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,122 @@
+"""Cost of turning a response payload into bytes, per serialization path.
+
+Payloads are a 100-item campaign page and a 1,000-message conversation history.
+Compared paths:
+
+* ``jsonable_encoder+json``: FastAPI's fallback for untyped handlers
+  (``jsonable_encoder`` walk, then ``json.dumps`` via ``JSONResponse``);
+* ``model+json``: response model validation/serialization, then ``JSONResponse``;
+* ``model+orjson``: the same with ``MongoJSONResponse`` (the app default);
+* ``orjson``: ``MongoJSONResponse`` on the raw dict, ObjectIds included.
+
+    python -m backend.benchmarks.serialization --repeat 200
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Type
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from backend.api.responses import MongoJSONResponse
+from backend.schemas.admin import CampaignDetailsResponse, CampaignListResponse
+
+
+def campaign_page(items: int = 100) -> Dict[str, Any]:
+    now = datetime(2025, 1, 1)
+    return {
+        "pagination": {"total_items": 5000, "total_pages": 50, "current_page": 1, "next_cursor": "x" * 40},
+        "campaigns": [
+            {
+                "campaign_id": ObjectId(),
+                "patient_name": f"Patient {i}",
+                "campaign_type": "RECOVERY",
+                "status": "ATTEMPTING_RECOVERY",
+                "last_updated": now - timedelta(minutes=i),
+            }
+            for i in range(items)
+        ],
+    }
+
+
+def conversation(messages: int = 1000) -> Dict[str, Any]:
+    start = datetime(2025, 1, 1)
+    return {
+        "campaign_details": {
+            "campaign_id": ObjectId(),
+            "patient_name": "Patient",
+            "status": "HANDOFF_REQUIRED",
+            "engagement_summary": "Asked about whitening options and pricing.",
+        },
+        "conversation_history": [
+            {
+                "interaction_id": ObjectId(),
+                "direction": "incoming" if i % 2 else "outgoing",
+                "content": "Thanks, could we move it to Thursday afternoon? " * 3,
+                "timestamp": start + timedelta(minutes=i),
+            }
+            for i in range(messages)
+        ],
+        "history_cursor": None,
+    }
+
+
+def _stringify_ids(value: Any) -> Any:
+    # Untyped handlers had to str() ids themselves; jsonable_encoder cannot.
+    if isinstance(value, dict):
+        return {k: _stringify_ids(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_stringify_ids(v) for v in value]
+    return str(value) if isinstance(value, ObjectId) else value
+
+
+def _paths(payload: Dict[str, Any], model: Type[BaseModel]) -> Dict[str, Callable[[], bytes]]:
+    adapter = TypeAdapter(model)
+    plain = _stringify_ids(payload)
+
+    def through_model() -> Any:
+        return adapter.dump_python(adapter.validate_python(payload), mode="json")
+
+    return {
+        "jsonable_encoder+json": lambda: JSONResponse(jsonable_encoder(plain)).body,
+        "model+json": lambda: JSONResponse(through_model()).body,
+        "model+orjson": lambda: MongoJSONResponse(through_model()).body,
+        "orjson": lambda: MongoJSONResponse(payload).body,
+    }
+
+
+def _time(fn: Callable[[], bytes], repeat: int) -> Dict[str, float]:
+    fn()
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return {"median_us": round(statistics.median(samples), 1), "min_us": round(min(samples), 1)}
+
+
+def run(*, repeat: int) -> Dict[str, Any]:
+    report: Dict[str, Any] = {}
+    for name, payload, model in (
+        ("campaign_page_100", campaign_page(), CampaignListResponse),
+        ("conversation_1000", conversation(), CampaignDetailsResponse),
+    ):
+        paths = _paths(payload, model)
+        report[name] = {
+            path: {**_time(fn, repeat), "bytes": len(fn())} for path, fn in paths.items()
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(repeat=args.repeat), indent=2))
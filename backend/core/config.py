@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Literal
+from typing import Dict, Literal, Optional
 
 from dotenv import load_dotenv
 from pydantic import Field
@@ -14,11 +14,109 @@ load_dotenv()
 class AppSettings(BaseSettings):
     mongo_uri: str = Field(default="mongodb://localhost:27017", alias="MONGO_URI")
     database_name: str = Field(default="mundos_ai", alias="DATABASE_NAME")
+    # Multi-document transactions need a replica set or mongos; a standalone mongod is detected
+    # and runs without them. False turns them off everywhere.
+    mongo_transactions: bool = Field(default=True, alias="MONGO_TRANSACTIONS")
+    # Connection pool (per process) and timeouts; unset values keep the driver defaults.
+    mongo_max_pool_size: int = Field(default=100, alias="MONGO_MAX_POOL_SIZE")
+    mongo_min_pool_size: int = Field(default=0, alias="MONGO_MIN_POOL_SIZE")
+    mongo_max_idle_time_ms: Optional[int] = Field(default=None, alias="MONGO_MAX_IDLE_TIME_MS")
+    # How long a request waits for a free pooled connection before failing.
+    mongo_wait_queue_timeout_ms: Optional[int] = Field(default=None, alias="MONGO_WAIT_QUEUE_TIMEOUT_MS")
+    mongo_server_selection_timeout_ms: int = Field(default=5000, alias="MONGO_SERVER_SELECTION_TIMEOUT_MS")
+    mongo_connect_timeout_ms: int = Field(default=10_000, alias="MONGO_CONNECT_TIMEOUT_MS")
+    mongo_socket_timeout_ms: Optional[int] = Field(default=None, alias="MONGO_SOCKET_TIMEOUT_MS")
+    # Comma-separated, in order of preference: "zstd,snappy,zlib" (zstd/snappy need extra packages).
+    mongo_compressors: str = Field(default="", alias="MONGO_COMPRESSORS")
+    # Dashboard and admin list reads; bookings and other writes always use the primary.
+    mongo_analytics_read_preference: Literal[
+        "primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"
+    ] = Field(default="secondaryPreferred", alias="MONGO_ANALYTICS_READ_PREFERENCE")
+    # Opened at startup so the first requests do not pay for connection setup; 0 disables.
+    mongo_warmup_connections: int = Field(default=4, alias="MONGO_WARMUP_CONNECTIONS")
 
     jwt_secret_key: str = Field(default="dev-secret", alias="JWT_SECRET_KEY")
     jwt_algorithm: str = Field(default="HS256", alias="JWT_ALGORITHM")
     access_token_expire_minutes: int = Field(default=30, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
 
+    auth_cache_ttl_seconds: float = Field(default=60.0, alias="AUTH_CACHE_TTL_SECONDS")
+    auth_cache_max_entries: int = Field(default=1024, alias="AUTH_CACHE_MAX_ENTRIES")
+
+    password_hash_executor: Literal["thread", "process"] = Field(default="thread", alias="PASSWORD_HASH_EXECUTOR")
+    password_hash_workers: int = Field(default=4, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_concurrency: int = Field(default=4, alias="PASSWORD_HASH_MAX_CONCURRENCY")
+
+    webhook_consumers: int = Field(default=2, alias="WEBHOOK_CONSUMERS")
+    webhook_batch_size: int = Field(default=100, alias="WEBHOOK_BATCH_SIZE")
+    webhook_poll_interval_seconds: float = Field(default=1.0, alias="WEBHOOK_POLL_INTERVAL_SECONDS")
+    webhook_lease_seconds: float = Field(default=60.0, alias="WEBHOOK_LEASE_SECONDS")
+    webhook_max_attempts: int = Field(default=5, alias="WEBHOOK_MAX_ATTEMPTS")
+    # Pub/Sub retains undelivered messages for at most 7 days.
+    webhook_dedup_ttl_seconds: int = Field(default=7 * 24 * 3600, alias="WEBHOOK_DEDUP_TTL_SECONDS")
+    webhook_dedup_memory_size: int = Field(default=10_000, alias="WEBHOOK_DEDUP_MEMORY_SIZE")
+
+    routing_cache_max_entries: int = Field(default=10_000, alias="ROUTING_CACHE_MAX_ENTRIES")
+    routing_cache_ttl_seconds: float = Field(default=300.0, alias="ROUTING_CACHE_TTL_SECONDS")
+    routing_cache_negative_ttl_seconds: float = Field(default=30.0, alias="ROUTING_CACHE_NEGATIVE_TTL_SECONDS")
+
+    availability_slot_minutes: int = Field(default=30, alias="AVAILABILITY_SLOT_MINUTES")
+    availability_cache_ttl_seconds: float = Field(default=60.0, alias="AVAILABILITY_CACHE_TTL_SECONDS")
+    availability_cache_max_entries: int = Field(default=256, alias="AVAILABILITY_CACHE_MAX_ENTRIES")
+    # service_id -> appointment length in minutes, e.g. SERVICE_DURATIONS='{"teeth_whitening": 60}'
+    service_durations: Dict[str, int] = Field(default_factory=dict, alias="SERVICE_DURATIONS")
+
+    patient_import_batch_size: int = Field(default=1000, alias="PATIENT_IMPORT_BATCH_SIZE")
+    # Renamed patients copied onto their campaigns/appointments per pass, and the idle poll interval.
+    patient_snapshot_batch_size: int = Field(default=500, alias="PATIENT_SNAPSHOT_BATCH_SIZE")
+    patient_snapshot_poll_interval_seconds: float = Field(default=5.0, alias="PATIENT_SNAPSHOT_POLL_INTERVAL_SECONDS")
+
+    # Due follow-ups are POSTed to the AI agent at RECALL_AGENT_URL, which writes and sends them;
+    # enabling the scheduler without it fails startup.
+    recall_scheduler_enabled: bool = Field(default=False, alias="RECALL_SCHEDULER_ENABLED")
+    recall_agent_url: Optional[str] = Field(default=None, alias="RECALL_AGENT_URL")
+    recall_agent_token: Optional[str] = Field(default=None, alias="RECALL_AGENT_TOKEN")
+    recall_agent_timeout_seconds: float = Field(default=30.0, alias="RECALL_AGENT_TIMEOUT_SECONDS")
+    recall_scan_interval_seconds: float = Field(default=30.0, alias="RECALL_SCAN_INTERVAL_SECONDS")
+    recall_batch_size: int = Field(default=100, alias="RECALL_BATCH_SIZE")
+    recall_workers: int = Field(default=4, alias="RECALL_WORKERS")
+    recall_lease_seconds: float = Field(default=300.0, alias="RECALL_LEASE_SECONDS")
+    recall_follow_up_interval_hours: float = Field(default=72.0, alias="RECALL_FOLLOW_UP_INTERVAL_HOURS")
+
+    # "local": events are published in-process by the code making the change (single
+    # replica); "change_stream": every replica tails MongoDB (needs a replica set).
+    events_source: Literal["local", "change_stream"] = Field(default="local", alias="EVENTS_SOURCE")
+    events_queue_size: int = Field(default=256, alias="EVENTS_QUEUE_SIZE")
+    events_heartbeat_seconds: float = Field(default=15.0, alias="EVENTS_HEARTBEAT_SECONDS")
+
+    ensure_indexes_on_startup: bool = Field(default=True, alias="ENSURE_INDEXES_ON_STARTUP")
+    # Startup (pool warm-up, indexes, cache priming) waits at most this long before serving;
+    # unfinished steps carry on in the background.
+    startup_timeout_seconds: float = Field(default=30.0, alias="STARTUP_TIMEOUT_SECONDS")
+    # Email thread routes of the most recently updated campaigns loaded at startup; 0 disables.
+    startup_prime_routes: int = Field(default=1000, alias="STARTUP_PRIME_ROUTES")
+
+    # backend.scripts.serve; WEB_CONCURRENCY=0 starts one worker per CPU.
+    web_concurrency: int = Field(default=0, alias="WEB_CONCURRENCY")
+    host: str = Field(default="0.0.0.0", alias="HOST")
+    port: int = Field(default=8000, alias="PORT")
+    # In-flight requests get this long to finish on shutdown; open SSE streams are then cut.
+    graceful_shutdown_seconds: int = Field(default=30, alias="GRACEFUL_SHUTDOWN_SECONDS")
+
+    log_level: str = Field(default="INFO", alias="LOG_LEVEL")
+    # Records are queued and written by a background thread; false writes on the calling thread.
+    log_queued: bool = Field(default=True, alias="LOG_QUEUED")
+    # Records beyond this many pending are dropped rather than blocking the event loop.
+    log_queue_size: int = Field(default=10_000, alias="LOG_QUEUE_SIZE")
+    # Keep one in N DEBUG records per call site; 1 keeps all.
+    log_debug_sample_every: int = Field(default=100, alias="LOG_DEBUG_SAMPLE_EVERY")
+
+    # Per-request DB/serialization timing, exposed on GET /metrics; the flags below need it on.
+    request_metrics_enabled: bool = Field(default=True, alias="REQUEST_METRICS_ENABLED")
+    server_timing_header: bool = Field(default=True, alias="SERVER_TIMING_HEADER")
+    request_log_enabled: bool = Field(default=True, alias="REQUEST_LOG_ENABLED")
+    # Warn when one request repeats a query shape more than this many times; 0 disables.
+    n_plus_one_threshold: int = Field(default=0, alias="N_PLUS_ONE_THRESHOLD")
+
     environment: Literal["development", "production", "test"] = Field(
         default="development", alias="ENVIRONMENT"
     )
@@ -0,0 +1,242 @@
+"""Structured logging off the event loop.
+
+Callers only build the record and put it on a bounded queue
+(``QueueHandler``); a ``LogWriter`` thread encodes pending records with orjson
+and writes them to stderr in one call per batch. On the calling side the
+handler also stamps the current request id and samples DEBUG records, so
+records that are dropped never reach the queue.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import sys
+import threading
+from contextvars import ContextVar, Token
+from logging.handlers import QueueHandler
+from typing import Any, Dict, List, Optional, TextIO
+
+import orjson
+
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through ``extra``.
+_RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def bind_request_id(request_id: str) -> Token:
+    return _request_id.set(request_id)
+
+
+def unbind_request_id(token: Token) -> None:
+    _request_id.reset(token)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ``asctime``, ``levelname``, ``name``, ``message`` and extras.
+
+    Same keys as the python-json-logger setup it replaces, encoded by orjson.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "asctime": self.formatTime(record),
+            "levelname": record.levelname,
+            "name": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return orjson.dumps(entry, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = _request_id.get()
+        if request_id is not None and not hasattr(record, "request_id"):
+            record.request_id = request_id
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Keep the first and then every ``every``-th DEBUG record per call site.
+
+    Kept records carry ``sample_rate`` so counts can be scaled back up.
+    """
+
+    def __init__(self, every: int) -> None:
+        super().__init__()
+        self.every = max(1, every)
+        self._seen: Dict[tuple[str, int], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        key = (record.pathname, record.lineno)
+        seen = self._seen.get(key, 0)
+        self._seen[key] = seen + 1
+        if seen % self.every:
+            return False
+        record.sample_rate = self.every
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller: past ``max_size`` pending records new ones are counted and dropped.
+
+    Uses a ``SimpleQueue`` (lock-free put, implemented in C); the bound is checked
+    with ``qsize`` and so is approximate.
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, max_size: int) -> None:
+        super().__init__(log_queue)
+        self.max_size = max_size
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render what cannot cross threads safely (mutable args, the live traceback)
+        # and leave the JSON encoding to the listener thread. The record is not
+        # copied: this is the root handler, so every other handler has already run.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+
+class LogWriter:
+    """Formats queued records and writes each batch with a single ``write``.
+
+    Batches are whatever is pending when the thread wakes up, up to ``batch_size``,
+    so a burst costs a few system calls instead of one (plus a flush) per line.
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_queue: queue.SimpleQueue, stream: TextIO, *, batch_size: int = 512) -> None:
+        self.queue = log_queue
+        self.stream = stream
+        self.batch_size = batch_size
+        self.formatter = JsonFormatter()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write everything queued so far, then end the thread."""
+        if self._thread is not None:
+            self.queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines: List[str] = []
+            stopping = False
+            for record in batch:
+                if record is self._STOP:
+                    stopping = True
+                    continue
+                try:
+                    lines.append(self.formatter.format(record))
+                except Exception:
+                    # As logging.Handler.handleError: a bad record must not take the writer down.
+                    fallback = {"levelname": "ERROR", "name": __name__, "message": "log_record_unformattable"}
+                    lines.append(orjson.dumps({**fallback, "logger": record.name}).decode())
+            if lines:
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except OSError:
+                    # Closed or broken stderr: nothing better to report it to.
+                    pass
+            if stopping:
+                return
+
+
+_listener: Optional[LogWriter] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def configure_logging(
+    *,
+    level: str = "INFO",
+    queued: bool = True,
+    queue_size: int = 10_000,
+    debug_sample_every: int = 1,
+    stream: Optional[TextIO] = None,
+) -> None:
+    """Install the JSON pipeline on the root logger, replacing existing handlers.
+
+    With ``queued=False`` records are formatted and written on the calling thread.
+    """
+    global _listener, _queue_handler
+    stop_logging()
+
+    if queued:
+        _queue_handler = DroppingQueueHandler(queue.SimpleQueue(), queue_size)
+        handler: logging.Handler = _queue_handler
+        _listener = LogWriter(_queue_handler.queue, stream or sys.stderr)
+        _listener.start()
+    else:
+        handler = logging.StreamHandler(stream or sys.stderr)
+        handler.setFormatter(JsonFormatter())
+    if debug_sample_every > 1:
+        handler.addFilter(DebugSampler(debug_sample_every))
+    handler.addFilter(RequestIdFilter())
+
+    # The JSON lines never include these; skip looking them up for every record.
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+        existing.close()
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread; safe to call more than once."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    _queue_handler = None
+
+
+atexit.register(stop_logging)
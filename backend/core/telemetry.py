@@ -0,0 +1,306 @@
+"""Per-request performance counters and their Prometheus exposition.
+
+``RequestTimingMiddleware`` binds a ``RequestStats`` to the current context for
+each HTTP request; ``BaseRepository`` reports every Mongo operation to it via
+``db_call`` and ``MongoJSONResponse`` reports rendering time via
+``record_serialize``. Outside a request (scheduler, consumers, scripts) both are
+no-ops.
+"""
+from __future__ import annotations
+
+import bisect
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_OPERATION_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestStats:
+    """What one request spent where. ``shapes`` is only kept when N+1 detection is on."""
+
+    __slots__ = ("started", "db_ops", "db_seconds", "serialize_seconds", "shapes")
+
+    def __init__(self, *, track_shapes: bool = False) -> None:
+        self.started = time.perf_counter()
+        self.db_ops = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.shapes: Optional[Counter[str]] = Counter() if track_shapes else None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: float) -> str:
+        app = max(0.0, total - self.db_seconds - self.serialize_seconds)
+        return (
+            f'db;dur={self.db_seconds * 1000.0:.2f};desc="{self.db_ops} ops", '
+            f"serialize;dur={self.serialize_seconds * 1000.0:.2f}, "
+            f"app;dur={app * 1000.0:.2f}, "
+            f"total;dur={total * 1000.0:.2f}"
+        )
+
+    def repeated_shapes(self, threshold: int) -> List[Tuple[str, int]]:
+        if not self.shapes:
+            return []
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+def bind(stats: RequestStats) -> Token:
+    return _current.set(stats)
+
+
+def unbind(token: Token) -> None:
+    _current.reset(token)
+
+
+def current() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def _shape(value: Any) -> Any:
+    # Keep field names and operators, drop values: {"a": {"$in": [..]}} -> {"a": {"$in": "?"}}.
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in sorted(value.items())}
+    if isinstance(value, (list, tuple)) and value and isinstance(value[0], dict):
+        return [_shape(item) for item in value]
+    return "?"
+
+
+def query_shape(op: str, collection: str, query: Any) -> str:
+    return f"{op} {collection} {_shape(query) if query else {}}"
+
+
+class db_call:
+    """Times one repository operation against the current request, if any.
+
+    Reusable across awaits of the same cursor: the operation is counted once,
+    the time of every block is added.
+    """
+
+    __slots__ = ("stats", "op", "collection", "query", "started", "counted")
+
+    def __init__(self, op: str, collection: str, query: Any = None) -> None:
+        self.stats = _current.get()
+        self.op = op
+        self.collection = collection
+        self.query = query
+        self.started = 0.0
+        self.counted = False
+
+    def __enter__(self) -> db_call:
+        if self.stats is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        stats = self.stats
+        if stats is None:
+            return
+        stats.db_seconds += time.perf_counter() - self.started
+        if not self.counted:
+            self.counted = True
+            stats.db_ops += 1
+            if stats.shapes is not None:
+                stats.shapes[query_shape(self.op, self.collection, self.query)] += 1
+
+
+def record_serialize(seconds: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.serialize_seconds += seconds
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: Any) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+class RequestMetrics:
+    """Per-route aggregates, rendered in the Prometheus text format.
+
+    Routes are labelled by their path template, so cardinality is bounded by the
+    number of routes. Updated from the event loop only, so no locking.
+    """
+
+    def __init__(self) -> None:
+        self.requests: Counter[Tuple[str, str, str]] = Counter()
+        self.durations: Dict[Tuple[str, str], Histogram] = {}
+        self.db_durations: Dict[Tuple[str, str], Histogram] = {}
+        self.serialize_durations: Dict[Tuple[str, str], Histogram] = {}
+        self.db_operations: Dict[Tuple[str, str], Histogram] = {}
+
+    def observe(self, method: str, route: str, status: int, stats: RequestStats, total: float) -> None:
+        key = (method, route)
+        self.requests[(method, route, str(status))] += 1
+        if key not in self.durations:
+            self.durations[key] = Histogram(DURATION_BUCKETS)
+            self.db_durations[key] = Histogram(DURATION_BUCKETS)
+            self.serialize_durations[key] = Histogram(DURATION_BUCKETS)
+            self.db_operations[key] = Histogram(DB_OPERATION_BUCKETS)
+        self.durations[key].observe(total)
+        self.db_durations[key].observe(stats.db_seconds)
+        self.serialize_durations[key].observe(stats.serialize_seconds)
+        self.db_operations[key].observe(stats.db_ops)
+
+    def render(
+        self,
+        pool: Optional[Dict[str, Any]] = None,
+        log_dropped: Optional[int] = None,
+        auth_cache: Optional[Dict[str, Dict[str, int]]] = None,
+        hashing: Optional[Dict[str, Any]] = None,
+        dedup: Optional[Dict[str, Any]] = None,
+        recall: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        lines: List[str] = [
+            "# HELP http_requests_total Requests by route template and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+        for name, help_text, series in (
+            ("http_request_duration_seconds", "Time from request start to response end.", self.durations),
+            ("http_request_db_seconds", "Time spent in Mongo operations per request.", self.db_durations),
+            ("http_request_serialize_seconds", "Time spent rendering the response body.", self.serialize_durations),
+            ("http_request_db_operations", "Mongo operations issued per request.", self.db_operations),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route), histogram in sorted(series.items()):
+                labels = _labels(method=method, route=route)
+                cumulative = 0
+                for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        if pool is not None:
+            lines.extend(_pool_lines(pool))
+        if log_dropped is not None:
+            lines.append("# HELP log_records_dropped_total Log records dropped because the log queue was full.")
+            lines.append("# TYPE log_records_dropped_total counter")
+            lines.append(f"log_records_dropped_total {log_dropped}")
+        if auth_cache is not None:
+            lines.extend(_cache_lines("auth_cache", auth_cache))
+        if hashing is not None:
+            lines.extend(_hashing_lines(hashing))
+        if dedup is not None:
+            lines.extend(_dedup_lines(dedup))
+        if recall is not None:
+            lines.extend(_recall_lines(recall))
+        return "\n".join(lines) + "\n"
+
+
+def _pool_lines(pool: Dict[str, Any]) -> List[str]:
+    lines: List[str] = []
+    for name, key, kind in (
+        ("mongo_pool_max_size", "max_pool_size", "gauge"),
+        ("mongo_pool_open_connections", "open", "gauge"),
+        ("mongo_pool_checked_out_connections", "checked_out", "gauge"),
+        ("mongo_pool_checkouts_total", "checkouts", "counter"),
+        ("mongo_pool_clears_total", "pool_clears", "counter"),
+    ):
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {pool.get(key, 0)}")
+    lines.append("# TYPE mongo_pool_checkout_failures_total counter")
+    for reason, count in sorted(pool.get("checkout_failures", {}).items()):
+        lines.append(f"mongo_pool_checkout_failures_total{{{_labels(reason=reason)}}} {count}")
+    return lines
+
+
+def _hashing_lines(hashing: Dict[str, Any]) -> List[str]:
+    """``HashingPool.stats()``: calls waiting for a slot, and time spent waiting and hashing."""
+    lines: List[str] = []
+    for name, key, kind in (
+        ("password_hash_max_concurrency", "max_concurrency", "gauge"),
+        ("password_hash_queued", "queued", "gauge"),
+        ("password_hash_running", "running", "gauge"),
+        ("password_hash_max_queued", "max_queued", "gauge"),
+        ("password_hash_completed_total", "completed", "counter"),
+        ("password_hash_wait_seconds_total", "wait_seconds_total", "counter"),
+        ("password_hash_run_seconds_total", "run_seconds_total", "counter"),
+    ):
+        value = hashing.get(key, 0)
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value:.6f}" if isinstance(value, float) else f"{name} {value}")
+    lines.append("# TYPE password_hash_max_wait_seconds gauge")
+    lines.append(f"password_hash_max_wait_seconds {hashing.get('max_wait_ms', 0.0) / 1000.0:.6f}")
+    return lines
+
+
+def _dedup_lines(dedup: Dict[str, Any]) -> List[str]:
+    """``MessageDeduplicator.stats()``: first deliveries, and redeliveries by the layer that dropped them."""
+    lines = [
+        "# HELP webhook_dedup_accepted_total Push notifications seen for the first time.",
+        "# TYPE webhook_dedup_accepted_total counter",
+        f"webhook_dedup_accepted_total {dedup.get('accepted', 0)}",
+        "# HELP webhook_dedup_dropped_total Redelivered push notifications dropped, by layer.",
+        "# TYPE webhook_dedup_dropped_total counter",
+        f"webhook_dedup_dropped_total{{{_labels(layer='memory')}}} {dedup.get('dropped_memory', 0)}",
+        f"webhook_dedup_dropped_total{{{_labels(layer='store')}}} {dedup.get('dropped_store', 0)}",
+    ]
+    lines.extend(_cache_lines("webhook_dedup_cache", {"recent": dedup.get("memory") or {}}))
+    return lines
+
+
+def _recall_lines(recall: Dict[str, Any]) -> List[str]:
+    """``RecallScheduler.stats()``: scans, outcomes of claimed follow-ups and how late they went out."""
+    lines: List[str] = []
+    for name, key, kind in (
+        ("recall_scheduler_running", "running", "gauge"),
+        ("recall_scans_total", "scans", "counter"),
+        ("recall_promoted_total", "promoted", "counter"),
+        ("recall_claimed_total", "claimed", "counter"),
+        ("recall_dispatched_total", "dispatched", "counter"),
+        ("recall_failed_total", "failed", "counter"),
+        ("recall_exhausted_total", "exhausted", "counter"),
+        ("recall_queued", "queued", "gauge"),
+    ):
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {int(recall.get(key, 0))}")
+    lines.append("# HELP recall_lag_seconds Time from next_attempt_at to dispatch (last, max, avg).")
+    lines.append("# TYPE recall_lag_seconds gauge")
+    for stat, value in sorted((recall.get("lag_seconds") or {}).items()):
+        lines.append(f"recall_lag_seconds{{{_labels(stat=stat)}}} {value}")
+    return lines
+
+
+def _cache_lines(prefix: str, caches: Dict[str, Dict[str, int]]) -> List[str]:
+    """``TTLCache.stats()`` of each named cache, labelled by ``cache``."""
+    lines: List[str] = []
+    for suffix, key, kind in (
+        ("entries", "size", "gauge"),
+        ("hits_total", "hits", "counter"),
+        ("misses_total", "misses", "counter"),
+        ("evictions_total", "evictions", "counter"),
+        ("expirations_total", "expirations", "counter"),
+    ):
+        lines.append(f"# TYPE {prefix}_{suffix} {kind}")
+        for cache, stats in sorted(caches.items()):
+            lines.append(f"{prefix}_{suffix}{{{_labels(cache=cache)}}} {stats.get(key, 0)}")
+    return lines
+
+
+request_metrics = RequestMetrics()
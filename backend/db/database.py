@@ -1,23 +1,132 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
+import weakref
 from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
 
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from pymongo import ReadPreference
+from pymongo.read_concern import ReadConcern
+from pymongo.write_concern import WriteConcern
 
 from backend.core.config import settings
+from backend.db.pool import PoolMetrics
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+pool_metrics = PoolMetrics(settings.mongo_max_pool_size)
+
+# Whether each client's deployment supports transactions; see supports_transactions.
+_transaction_support: "weakref.WeakKeyDictionary[Any, bool]" = weakref.WeakKeyDictionary()
+
+
+def client_options() -> Dict[str, Any]:
+    """Driver options from settings; options left unset keep the driver defaults."""
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        "event_listeners": [pool_metrics],
+    }
+    optional = {
+        "maxIdleTimeMS": settings.mongo_max_idle_time_ms,
+        "waitQueueTimeoutMS": settings.mongo_wait_queue_timeout_ms,
+        "socketTimeoutMS": settings.mongo_socket_timeout_ms,
+    }
+    options.update({key: value for key, value in optional.items() if value is not None})
+    compressors = [name.strip() for name in settings.mongo_compressors.split(",") if name.strip()]
+    if compressors:
+        options["compressors"] = compressors
+    return options
 
 
 @lru_cache(maxsize=1)
 def get_motor_client() -> AsyncIOMotorClient:
-    return AsyncIOMotorClient(settings.mongo_uri)
+    return AsyncIOMotorClient(settings.mongo_uri, **client_options())
 
 
 async def get_database() -> AsyncIOMotorDatabase:
+    """The application database; reads go to the primary."""
     client = get_motor_client()
     return client[settings.database_name]
 
 
+async def get_analytics_database() -> AsyncIOMotorDatabase:
+    """The application database with ``MONGO_ANALYTICS_READ_PREFERENCE`` for reads.
+
+    For dashboards and admin lists, which tolerate replication lag. Writes made
+    through it still go to the primary.
+    """
+    client = get_motor_client()
+    return client.get_database(
+        settings.database_name, read_preference=READ_PREFERENCES[settings.mongo_analytics_read_preference]
+    )
+
+
+async def warm_up_pool(connections: int) -> float:
+    """Select a server and open up to ``connections`` pooled connections; returns seconds taken."""
+    client = get_motor_client()
+    started = time.perf_counter()
+    # Concurrent pings each need a connection, so the pool grows to meet them.
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(max(1, connections))))
+    return time.perf_counter() - started
+
+
+async def supports_transactions(db: AsyncIOMotorDatabase) -> bool:
+    """Whether the deployment behind ``db`` runs multi-document transactions.
+
+    Replica set members and mongos do; a standalone mongod does not. Asked once
+    per client with ``hello``.
+    """
+    key = db.client
+    if key not in _transaction_support:
+        hello = await db.client.admin.command("hello")
+        supported = "setName" in hello or hello.get("msg") == "isdbgrid"
+        if not supported:
+            logger.warning("mongo_transactions_unavailable", extra={"reason": "standalone mongod"})
+        _transaction_support[key] = supported
+    return _transaction_support[key]
+
+
+async def run_in_transaction(
+    db: AsyncIOMotorDatabase,
+    callback: Callable[[Optional[AsyncIOMotorClientSession]], Awaitable[T]],
+) -> T:
+    """Run ``callback(session)`` in a multi-document transaction and return its result.
+
+    The driver retries the callback on transient errors, so it must only write
+    through the given session; cache and counter updates belong after this returns.
+    Against a standalone mongod, or with ``MONGO_TRANSACTIONS=false``, the
+    callback runs once with ``session=None``.
+    """
+    if not settings.mongo_transactions or not await supports_transactions(db):
+        return await callback(None)
+    async with await db.client.start_session() as session:
+        return await session.with_transaction(
+            callback,
+            read_concern=ReadConcern("snapshot"),
+            write_concern=WriteConcern("majority"),
+            read_preference=ReadPreference.PRIMARY,
+        )
+
+
 async def close_database() -> None:
+    """Close the client's pooled connections; the next ``get_database`` opens a new client."""
     client = get_motor_client()
     client.close()
-
+    get_motor_client.cache_clear()
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+from backend.core.config import settings
+from backend.models import Appointment, Campaign, Interaction, Patient, ProviderSchedule, Role
+from backend.models.base import MongoModel
+
+
+logger = logging.getLogger(__name__)
+
+MODELS: Sequence[type[MongoModel]] = (Patient, Campaign, Interaction, Role, Appointment, ProviderSchedule)
+
+# Collections owned by services rather than models.
+COLLECTION_INDEXES: Dict[str, List[IndexModel]] = {
+    "webhook_outbox": [
+        IndexModel([("status", 1), ("available_at", 1)]),
+        IndexModel([("status", 1), ("lease_until", 1)]),
+        IndexModel([("claim", 1)], sparse=True),
+    ],
+    # One document per appointment listing every grid slot it covers; the unique
+    # multikey index rejects any overlap for the same provider.
+    "slot_claims": [
+        IndexModel([("provider_id", 1), ("slots", 1)], unique=True),
+    ],
+    # Changing WEBHOOK_DEDUP_TTL_SECONDS on an existing deployment needs a collMod.
+    "webhook_dedup": [
+        IndexModel([("created_at", 1)], expireAfterSeconds=settings.webhook_dedup_ttl_seconds),
+    ],
+}
+
+
+def index_specs() -> Dict[str, List[IndexModel]]:
+    specs: Dict[str, List[IndexModel]] = {}
+    for model in MODELS:
+        if model.__collection__ and model.__indexes__:
+            specs.setdefault(model.__collection__, []).extend(model.__indexes__)
+    for collection, indexes in COLLECTION_INDEXES.items():
+        specs.setdefault(collection, []).extend(indexes)
+    return specs
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> Dict[str, List[str]]:
+    """Create every declared index. Idempotent: existing indexes are left as they are.
+
+    A failure on one collection (e.g. duplicate data blocking a unique index) is logged
+    and does not stop the others; the returned mapping only lists collections that
+    succeeded.
+    """
+    created: Dict[str, List[str]] = {}
+    for collection, indexes in index_specs().items():
+        models = []
+        for index in indexes:
+            # Ignored by MongoDB >= 4.2 (which always builds without blocking the
+            # collection) but keeps older servers from taking an exclusive lock.
+            document = {**index.document, "background": True}
+            keys = document.pop("key")
+            models.append(IndexModel(list(keys.items()), **document))
+        try:
+            created[collection] = await db[collection].create_indexes(models)
+        except OperationFailure:
+            logger.exception("index_build_failed", extra={"collection": collection})
+    return created
+
+
+async def ensure_slot_claim_index(db: AsyncIOMotorDatabase) -> None:
+    """Build the unique slot claim index and check that it is in place.
+
+    Double-booking protection depends on it entirely, so unlike ``ensure_indexes``
+    this runs before serving whatever ``ENSURE_INDEXES_ON_STARTUP`` says, and a
+    missing index raises instead of being logged.
+    """
+    (spec,) = COLLECTION_INDEXES["slot_claims"]
+    await db["slot_claims"].create_indexes([spec])
+    key = list(spec.document["key"].items())
+    for info in (await db["slot_claims"].index_information()).values():
+        if info.get("unique") and [tuple(field) for field in info["key"]] == key:
+            return
+    raise RuntimeError("unique (provider_id, slots) index on slot_claims is missing; bookings could overlap")
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """A representative query issued by the application, used for plan checks."""
+
+    name: str
+    collection: str
+    filter: Dict[str, Any]
+    sort: Dict[str, int] = field(default_factory=dict)
+    limit: Optional[int] = None
+
+
+_OID = ObjectId("000000000000000000000000")
+_DAY = datetime(2025, 1, 1)
+
+QUERY_SHAPES: Sequence[QueryShape] = (
+    QueryShape(
+        "webhook_route_by_thread",
+        "campaigns",
+        {"channel.thread_id": {"$in": ["thread"]}},
+        sort={"updated_at": -1, "_id": -1},
+    ),
+    QueryShape(
+        "webhook_outbox_claim",
+        "webhook_outbox",
+        {
+            "$or": [
+                {"status": "pending", "available_at": {"$lte": _DAY}},
+                {"status": "processing", "lease_until": {"$lte": _DAY}},
+            ]
+        },
+        sort={"available_at": 1},
+        limit=100,
+    ),
+    QueryShape("booking_patient_lookup", "patients", {"$or": [{"email": "a@b.c"}, {"phone": "0"}]}),
+    QueryShape("admin_patient_by_email", "patients", {"email": "a@b.c"}),
+    QueryShape(
+        "booking_latest_campaign",
+        "campaigns",
+        {"patient_id": _OID, "status": "RE_ENGAGED"},
+        sort={"updated_at": -1},
+        limit=1,
+    ),
+    QueryShape("campaign_list", "campaigns", {}, sort={"updated_at": -1, "_id": -1}, limit=26),
+    QueryShape(
+        "campaign_list_by_status",
+        "campaigns",
+        {"status": "HANDOFF_REQUIRED"},
+        sort={"updated_at": -1, "_id": -1},
+        limit=26,
+    ),
+    QueryShape(
+        "recall_due_campaigns",
+        "campaigns",
+        {"status": "ATTEMPTING_RECOVERY", "follow_up_details.next_attempt_at": {"$lte": _DAY}},
+        sort={"follow_up_details.next_attempt_at": 1},
+        limit=100,
+    ),
+    QueryShape(
+        "recall_due_patients",
+        "patients",
+        {"next_follow_up_date": {"$lte": _DAY}},
+        sort={"next_follow_up_date": 1},
+        limit=100,
+    ),
+    QueryShape(
+        "campaign_history",
+        "interactions",
+        {"campaign_id": _OID},
+        sort={"timestamp": 1, "_id": 1},
+        limit=51,
+    ),
+    QueryShape(
+        "campaign_history_tail",
+        "interactions",
+        {"campaign_id": _OID},
+        sort={"timestamp": -1, "_id": -1},
+        limit=51,
+    ),
+    QueryShape("patient_snapshot_pending", "patients", {"snapshot_pending": True}, limit=500),
+    QueryShape("patient_snapshot_campaigns", "campaigns", {"patient_id": _OID, "patient.rev": {"$not": {"$gte": 1}}}),
+    QueryShape(
+        "patient_snapshot_appointments", "appointments", {"patient_id": _OID, "patient.rev": {"$not": {"$gte": 1}}}
+    ),
+    QueryShape("auth_user_by_email", "roles", {"email": "a@b.c"}),
+    QueryShape(
+        "appointment_calendar",
+        "appointments",
+        {"appointment_date": {"$gte": _DAY, "$lte": _DAY}},
+        sort={"appointment_date": 1},
+    ),
+    QueryShape(
+        "appointment_calendar_by_provider",
+        "appointments",
+        {"appointment_date": {"$gte": _DAY, "$lte": _DAY}, "provider_id": "provider"},
+        sort={"appointment_date": 1},
+    ),
+)
+
+
+def _stages(plan: Any) -> Iterator[str]:
+    if isinstance(plan, dict):
+        stage = plan.get("stage")
+        if isinstance(stage, str):
+            yield stage
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+
+async def find_collscans(db: AsyncIOMotorDatabase) -> List[str]:
+    """Explain every query shape and return the names of those planned as a COLLSCAN."""
+    offenders: List[str] = []
+    for shape in QUERY_SHAPES:
+        find: Dict[str, Any] = {"find": shape.collection, "filter": shape.filter}
+        if shape.sort:
+            find["sort"] = shape.sort
+        if shape.limit:
+            find["limit"] = shape.limit
+        explain = await db.command({"explain": find, "verbosity": "queryPlanner"})
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in set(_stages(winning_plan)):
+            offenders.append(shape.name)
+    return offenders
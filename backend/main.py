@@ -1,41 +1,138 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from logging.config import dictConfig
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Dict
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from backend.api.middleware import RequestIdMiddleware, RequestTimingMiddleware
+from backend.api.responses import MongoJSONResponse
 from backend.api.v1.router import api_router
+from backend.core.config import settings
+from backend.core.logs import configure_logging, dropped_records
+from backend.core.telemetry import request_metrics
+from backend.db.database import close_database, get_database, pool_metrics, warm_up_pool
+from backend.db.indexes import ensure_indexes, ensure_slot_claim_index
+from backend.repositories.base import BaseRepository, utcnow
+from backend.services import security
+from backend.services.availability import availability_engine
+from backend.services.dedup import gmail_dedup
+from backend.services.events import change_stream_pump
+from backend.services.follow_up_agent import follow_up_agent
+from backend.services.patient_snapshots import patient_snapshot_sync
+from backend.services.recall_scheduler import recall_scheduler
+from backend.services.routing import thread_routes
+from backend.services.webhook_queue import webhook_consumers
 
 
-def configure_logging() -> None:
-    dictConfig(
-        {
-            "version": 1,
-            "formatters": {
-                "json": {
-                    "()": "pythonjsonlogger.jsonlogger.JsonFormatter",
-                    "fmt": "%(asctime)s %(levelname)s %(name)s %(message)s",
-                }
-            },
-            "handlers": {
-                "console": {
-                    "class": "logging.StreamHandler",
-                    "formatter": "json",
-                    "level": "INFO",
-                }
-            },
-            "root": {"handlers": ["console"], "level": "INFO"},
-        }
-    )
+configure_logging(
+    level=settings.log_level,
+    queued=settings.log_queued,
+    queue_size=settings.log_queue_size,
+    debug_sample_every=settings.log_debug_sample_every,
+)
+logger = logging.getLogger(__name__)
 
 
-configure_logging()
-logger = logging.getLogger(__name__)
+async def _ensure_indexes() -> None:
+    created = await ensure_indexes(await get_database())
+    logger.info("indexes_ensured", extra={"collections": sorted(created)})
+
+
+async def _prime_caches() -> None:
+    repo = BaseRepository(await get_database())
+    now = utcnow()
+    await availability_engine.month(repo, now.year, now.month)
+    if settings.startup_prime_routes > 0:
+        await thread_routes.prime(repo, settings.startup_prime_routes)
+
+
+async def _startup(app: FastAPI) -> None:
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
+
+    async def step(name: str, work: Awaitable[Any]) -> None:
+        began = time.perf_counter()
+        try:
+            await work
+        except Exception:
+            # An unreachable or slow server is logged, not fatal: requests retry on their own.
+            logger.exception("startup_step_failed", extra={"step": name})
+        timings[name] = round((time.perf_counter() - began) * 1000.0, 1)
+
+    # Bookings rely on this index to reject overlaps: build it before serving and
+    # let startup fail without it, rather than double-book.
+    began = time.perf_counter()
+    await ensure_slot_claim_index(await get_database())
+    timings["slot_claim_index"] = round((time.perf_counter() - began) * 1000.0, 1)
+    steps: Dict[str, Awaitable[Any]] = {
+        # Imports run on a thread while the other steps wait on the network.
+        "security_imports": asyncio.to_thread(security.preload),
+        "caches": _prime_caches(),
+    }
+    if settings.mongo_warmup_connections > 0:
+        steps["mongo_pool"] = warm_up_pool(settings.mongo_warmup_connections)
+    if settings.ensure_indexes_on_startup:
+        steps["indexes"] = _ensure_indexes()
+    tasks = {name: asyncio.create_task(step(name, work)) for name, work in steps.items()}
+    _, pending = await asyncio.wait(tasks.values(), timeout=settings.startup_timeout_seconds)
+    if pending:
+        # Serve anyway; what is left (typically an index build) finishes in the background.
+        logger.warning(
+            "startup_budget_exceeded",
+            extra={"pending": sorted(name for name, task in tasks.items() if task in pending)},
+        )
+    app.state.startup_tasks = pending
+
+    webhook_consumers.start()
+    patient_snapshot_sync.start()
+    if settings.recall_scheduler_enabled:
+        recall_scheduler.start()
+    if settings.events_source == "change_stream":
+        change_stream_pump.start(await get_database())
+
+    timings["total"] = round((time.perf_counter() - started) * 1000.0, 1)
+    app.state.startup_timings = timings
+    logger.info("startup_complete", extra={"ms": timings})
+
+
+async def _shutdown(app: FastAPI) -> None:
+    # The server has stopped accepting connections and let in-flight requests finish
+    # (up to its graceful shutdown timeout); drain background work, then close the pool.
+    started = time.perf_counter()
+    for task in getattr(app.state, "startup_tasks", ()):
+        task.cancel()
+    await change_stream_pump.stop()
+    await recall_scheduler.stop(drain_timeout=settings.graceful_shutdown_seconds)
+    await follow_up_agent.aclose()
+    await webhook_consumers.stop()
+    await patient_snapshot_sync.stop()
+    await asyncio.to_thread(security.password_pool.shutdown)
+    await close_database()
+    logger.info("shutdown_complete", extra={"ms": round((time.perf_counter() - started) * 1000.0, 1)})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await _startup(app)
+    try:
+        yield
+    finally:
+        await _shutdown(app)
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Mundos AI Backend", version="0.1.0")
+    app = FastAPI(
+        title="Mundos AI Backend",
+        version="0.1.0",
+        default_response_class=MongoJSONResponse,
+        lifespan=lifespan,
+    )
 
     app.add_middleware(
         CORSMiddleware,
@@ -44,6 +141,11 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.request_metrics_enabled:
+        # Wraps everything but RequestIdMiddleware, so its timing covers the other middleware.
+        app.add_middleware(RequestTimingMiddleware)
+    # Outermost, so every log line of the request, including the timing one, carries the id.
+    app.add_middleware(RequestIdMiddleware)
 
     app.include_router(api_router, prefix="/api/v1")
 
@@ -51,6 +153,23 @@ def create_app() -> FastAPI:
     async def root_health() -> dict[str, str]:
         return {"status": "ok"}
 
+    if settings.request_metrics_enabled:
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics() -> PlainTextResponse:
+            # Prometheus text format: per-route histograms plus pool, cache, hashing, dedup and recall figures.
+            return PlainTextResponse(
+                request_metrics.render(
+                    pool=pool_metrics.stats(),
+                    log_dropped=dropped_records(),
+                    auth_cache=security.auth_cache_stats(),
+                    hashing=security.password_pool.stats(),
+                    dedup=gmail_dedup.stats(),
+                    recall=recall_scheduler.stats(),
+                ),
+                media_type="text/plain; version=0.0.4",
+            )
+
     logger.info("Application initialized")
     return app
 
@@ -3,6 +3,7 @@ from .campaign import Campaign
 from .interaction import Interaction
 from .role import Role
 from .appointment import Appointment
+from .provider_schedule import ProviderSchedule
 
 __all__ = [
     "Patient",
@@ -10,5 +11,6 @@ __all__ = [
     "Interaction",
     "Role",
     "Appointment",
+    "ProviderSchedule",
 ]
 
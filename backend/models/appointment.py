@@ -5,7 +5,10 @@ from enum import Enum
 
 from typing import Optional
 
+from pymongo import IndexModel
+
 from .base import MongoModel, PyObjectId
+from .patient import PatientSnapshot
 
 
 class AppointmentStatus(str, Enum):
@@ -20,8 +23,18 @@ class CreatedFrom(str, Enum):
 
 
 class Appointment(MongoModel):
+    __collection__ = "appointments"
+    __indexes__ = [
+        # Calendar range queries, optionally narrowed to one provider.
+        IndexModel([("appointment_date", 1), ("provider_id", 1)]),
+        # Patient snapshot propagation.
+        IndexModel([("patient_id", 1)]),
+    ]
+
     patient_id: PyObjectId
+    patient: Optional[PatientSnapshot] = None
     campaign_id: Optional[PyObjectId] = None
+    provider_id: Optional[str] = None
     appointment_date: datetime
     duration_minutes: int
     status: AppointmentStatus
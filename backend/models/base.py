@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, ClassVar, Dict, List, Mapping, Optional, Type, TypeVar
 
 from bson import ObjectId
 from pydantic import BaseModel, ConfigDict, Field, GetCoreSchemaHandler
 from pydantic_core import core_schema
+from pymongo import IndexModel
 
 
 class PyObjectId(ObjectId):
@@ -13,12 +14,15 @@ class PyObjectId(ObjectId):
     def __get_pydantic_core_schema__(
         cls, source_type: Any, handler: GetCoreSchemaHandler
     ) -> core_schema.CoreSchema:
-        return core_schema.no_info_after_validator_function(
-            cls.validate,
-            core_schema.union_schema([
+        # ObjectIds read from MongoDB pass the instance check inside pydantic-core;
+        # only strings call back into Python to be parsed.
+        return core_schema.union_schema(
+            [
                 core_schema.is_instance_schema(ObjectId),
-                core_schema.str_schema(),
-            ]),
+                core_schema.no_info_after_validator_function(cls.validate, core_schema.str_schema()),
+            ],
+            custom_error_type="object_id",
+            custom_error_message="Invalid ObjectId",
         )
 
     @classmethod
@@ -38,7 +42,15 @@ class PyObjectId(ObjectId):
         return json_schema
 
 
+M = TypeVar("M", bound="MongoModel")
+
+
 class MongoModel(BaseModel):
+    # Collection backing the model and the indexes its query paths rely on;
+    # applied by backend.db.indexes.ensure_indexes.
+    __collection__: ClassVar[Optional[str]] = None
+    __indexes__: ClassVar[List[IndexModel]] = []
+
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
@@ -48,3 +60,16 @@ class MongoModel(BaseModel):
         arbitrary_types_allowed=True,
     )
 
+    @classmethod
+    def from_mongo(cls: Type[M], doc: Mapping[str, Any]) -> M:
+        """Model for a document read from MongoDB.
+
+        This validates: with pydantic-core it is faster than ``model_construct``
+        (see ``backend.benchmarks.hydration``). Bulk reads that only need a few
+        fields should use the records in ``backend.models.records`` instead.
+        """
+        return cls.model_validate(doc)
+
+    def to_mongo(self) -> Dict[str, Any]:
+        """Document to store: ``_id`` for ``id``, unset optional fields left out."""
+        return self.model_dump(by_alias=True, exclude_none=True)
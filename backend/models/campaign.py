@@ -6,8 +6,10 @@ from enum import Enum
 from typing import Optional
 
 from pydantic import BaseModel
+from pymongo import IndexModel
 
 from .base import MongoModel, PyObjectId
+from .patient import PatientSnapshot
 
 
 class CampaignType(str, Enum):
@@ -44,7 +46,22 @@ class BookingFunnel(BaseModel):
 
 
 class Campaign(MongoModel):
+    __collection__ = "campaigns"
+    __indexes__ = [
+        # Inbound email routing.
+        IndexModel([("channel.thread_id", 1)], sparse=True),
+        # Most recent campaign of a patient in a given status (booking).
+        IndexModel([("patient_id", 1), ("status", 1), ("updated_at", -1)]),
+        # Admin campaign list, with and without a status filter.
+        IndexModel([("status", 1), ("updated_at", -1), ("_id", -1)]),
+        IndexModel([("updated_at", -1), ("_id", -1)]),
+        # Recall scheduler: due follow-ups and claim read-back.
+        IndexModel([("status", 1), ("follow_up_details.next_attempt_at", 1)], sparse=True),
+        IndexModel([("follow_up_details.claim", 1)], sparse=True),
+    ]
+
     patient_id: PyObjectId
+    patient: Optional[PatientSnapshot] = None
     campaign_type: CampaignType
     status: CampaignStatus
     channel: Optional[Channel] = None
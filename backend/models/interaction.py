@@ -6,6 +6,7 @@ from enum import Enum
 from typing import Optional
 
 from pydantic import BaseModel
+from pymongo import IndexModel
 
 from .base import MongoModel, PyObjectId
 
@@ -21,9 +22,18 @@ class AIAnalysis(BaseModel):
 
 
 class Interaction(MongoModel):
+    __collection__ = "interactions"
+    __indexes__ = [
+        # Conversation history paging: keyset on (timestamp, _id) within a campaign.
+        IndexModel([("campaign_id", 1), ("timestamp", 1), ("_id", 1)]),
+        # Inbound messages are stored at most once, however often their webhook is retried.
+        IndexModel([("message_id", 1)], unique=True, sparse=True),
+    ]
+
     campaign_id: PyObjectId
     direction: Direction
     content: str
     ai_analysis: Optional[AIAnalysis] = None
     timestamp: Optional[datetime] = None
+    message_id: Optional[str] = None
 
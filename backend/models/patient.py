@@ -2,10 +2,12 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
+from pymongo import IndexModel
+
 from .base import MongoModel
 
 
@@ -20,6 +22,17 @@ class ChannelType(str, Enum):
     sms = "sms"
 
 
+def normalize_email(email: str) -> str:
+    """How patient emails are stored and matched: trimmed and lowercased."""
+    return email.strip().lower()
+
+
+def email_filter(email: str) -> Dict[str, Any]:
+    """Patient query on ``email``; also finds patients stored before emails were normalized."""
+    normalized = normalize_email(email)
+    return {"email": normalized if normalized == email else {"$in": [normalized, email]}}
+
+
 class TreatmentHistoryItem(BaseModel):
     procedure_name: str
     procedure_date: datetime
@@ -27,7 +40,31 @@ class TreatmentHistoryItem(BaseModel):
     next_follow_up_date: Optional[datetime] = None
 
 
+class PatientSnapshot(BaseModel):
+    """Copy of a patient's display fields kept on their campaigns and appointments.
+
+    ``rev`` is the patient's ``snapshot_rev`` the copy was taken at; a copy is
+    only ever replaced by one with a higher revision.
+    """
+
+    name: str
+    type: Optional[PatientType] = None
+    channel: Optional[ChannelType] = None
+    rev: int = 0
+
+
 class Patient(MongoModel):
+    __collection__ = "patients"
+    __indexes__ = [
+        # Booking identifies patients by email OR phone.
+        IndexModel([("email", 1)]),
+        IndexModel([("phone", 1)]),
+        # Recall scheduler: patients whose next_follow_up_date has passed.
+        IndexModel([("next_follow_up_date", 1)], sparse=True),
+        # Patients whose snapshot copies still need updating.
+        IndexModel([("snapshot_pending", 1)], sparse=True),
+    ]
+
     name: str
     email: str
     phone: str
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+from pydantic import BaseModel
+from pymongo import IndexModel
+
+from .base import MongoModel
+
+
+class ScheduleWindow(BaseModel):
+    start: str  # "HH:MM"
+    end: str  # "HH:MM", exclusive
+
+
+class ProviderSchedule(MongoModel):
+    __collection__ = "provider_schedules"
+    __indexes__ = [
+        IndexModel([("provider_id", 1)], unique=True),
+    ]
+
+    provider_id: str
+    # Working windows per weekday, 0 = Monday.
+    weekly: Dict[int, List[ScheduleWindow]]
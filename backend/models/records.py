@@ -0,0 +1,99 @@
+"""Slotted read-only views of stored documents for bulk read paths.
+
+Cheaper to build than the Pydantic models (no validation, no ``__dict__``) and
+typed, unlike raw dicts. Each record lists the fields it reads in ``FIELDS``;
+query with that projection and build records with ``from_mongo``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, ClassVar, Dict, Mapping, Optional
+
+
+@dataclass(slots=True)
+class CampaignRecord:
+    FIELDS: ClassVar[Dict[str, int]] = {
+        "patient_id": 1,
+        "patient.name": 1,
+        "campaign_type": 1,
+        "status": 1,
+        "updated_at": 1,
+    }
+
+    id: Any
+    patient_id: Any
+    # From the denormalized patient snapshot; None until it has been backfilled.
+    patient_name: Optional[str]
+    campaign_type: Optional[str]
+    status: Optional[str]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_mongo(cls, doc: Mapping[str, Any]) -> CampaignRecord:
+        return cls(
+            doc["_id"],
+            doc.get("patient_id"),
+            (doc.get("patient") or {}).get("name"),
+            doc.get("campaign_type"),
+            doc.get("status"),
+            doc.get("updated_at"),
+        )
+
+
+@dataclass(slots=True)
+class AppointmentRecord:
+    FIELDS: ClassVar[Dict[str, int]] = {
+        "patient_id": 1,
+        "patient.name": 1,
+        "provider_id": 1,
+        "appointment_date": 1,
+        "duration_minutes": 1,
+        "service_name": 1,
+        "status": 1,
+    }
+
+    id: Any
+    patient_id: Any
+    patient_name: Optional[str]
+    provider_id: Optional[str]
+    appointment_date: Optional[datetime]
+    duration_minutes: Optional[int]
+    service_name: Optional[str]
+    status: Optional[str]
+
+    @classmethod
+    def from_mongo(cls, doc: Mapping[str, Any]) -> AppointmentRecord:
+        return cls(
+            doc["_id"],
+            doc.get("patient_id"),
+            (doc.get("patient") or {}).get("name"),
+            doc.get("provider_id"),
+            doc.get("appointment_date"),
+            doc.get("duration_minutes"),
+            doc.get("service_name"),
+            doc.get("status"),
+        )
+
+
+@dataclass(slots=True)
+class PatientRecord:
+    FIELDS: ClassVar[Dict[str, int]] = {"name": 1, "email": 1, "phone": 1, "patient_type": 1, "preferred_channel": 1}
+
+    id: Any
+    name: str
+    email: str
+    phone: str
+    patient_type: Optional[str]
+    preferred_channel: list[str]
+
+    @classmethod
+    def from_mongo(cls, doc: Mapping[str, Any]) -> PatientRecord:
+        return cls(
+            doc["_id"],
+            doc.get("name", ""),
+            doc.get("email", ""),
+            doc.get("phone", ""),
+            doc.get("patient_type"),
+            doc.get("preferred_channel") or [],
+        )
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+from pymongo import IndexModel
+
 from .base import MongoModel
 
 
 class Role(MongoModel):
+    __collection__ = "roles"
+    __indexes__ = [
+        # Looked up on every authenticated request.
+        IndexModel([("email", 1)], unique=True),
+    ]
+
     name: str
     email: str
     role: str
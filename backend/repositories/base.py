@@ -1,10 +1,18 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
 
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCursor, AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.results import BulkWriteResult
+
+from backend.core.telemetry import db_call
+
+
+# An index name or its key pattern, as accepted by ``Cursor.hint``.
+Hint = Union[str, Sequence[tuple[str, int]]]
 
 
 def utcnow() -> datetime:
@@ -12,8 +20,17 @@ def utcnow() -> datetime:
 
 
 class BaseRepository:
-    def __init__(self, db: AsyncIOMotorDatabase) -> None:
+    """Thin async wrapper over a Motor database.
+
+    When built with a ``session`` every operation runs in that session, so a
+    repository created inside ``run_in_transaction`` takes part in the transaction.
+    Every operation is timed against the current request (``db_call``).
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, session: Optional[AsyncIOMotorClientSession] = None) -> None:
         self.db = db
+        self.session = session
+        self._opts: Dict[str, Any] = {"session": session} if session is not None else {}
 
     @staticmethod
     def _ensure_object_id(value: Any) -> ObjectId:
@@ -21,38 +38,194 @@ class BaseRepository:
             return value
         return ObjectId(str(value))
 
-    async def find_many(
+    def _find(
         self,
         collection: str,
-        query: Dict[str, Any] | None = None,
+        query: Dict[str, Any] | None,
+        projection: Optional[Dict[str, Any]],
         *,
         sort: Optional[Sequence[tuple[str, int]]] = None,
         limit: Optional[int] = None,
         skip: Optional[int] = None,
-    ) -> List[Dict[str, Any]]:
-        cursor = self.db[collection].find(query or {})
+        batch_size: Optional[int] = None,
+        hint: Optional[Hint] = None,
+        max_time_ms: Optional[int] = None,
+    ) -> AsyncIOMotorCursor:
+        options: Dict[str, Any] = {**self._opts}
         if sort:
-            cursor = cursor.sort(list(sort))
+            options["sort"] = list(sort)
         if skip:
-            cursor = cursor.skip(skip)
+            options["skip"] = skip
         if limit:
-            cursor = cursor.limit(limit)
-        return [doc async for doc in cursor]
+            options["limit"] = limit
+        if batch_size:
+            options["batch_size"] = batch_size
+        if hint is not None:
+            options["hint"] = hint
+        if max_time_ms:
+            options["max_time_ms"] = max_time_ms
+        return self.db[collection].find(query or {}, projection, **options)
+
+    async def find_many(
+        self,
+        collection: str,
+        query: Dict[str, Any] | None = None,
+        *,
+        sort: Optional[Sequence[tuple[str, int]]] = None,
+        limit: Optional[int] = None,
+        skip: Optional[int] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+        hint: Optional[Hint] = None,
+        max_time_ms: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        cursor = self._find(
+            collection,
+            query,
+            projection,
+            sort=sort,
+            limit=limit,
+            skip=skip,
+            # A limited query fits in one reply; without this the server stops at 101 docs.
+            batch_size=batch_size or limit,
+            hint=hint,
+            max_time_ms=max_time_ms,
+        )
+        with db_call("find", collection, query):
+            return [doc async for doc in cursor]
+
+    async def iter_many(
+        self,
+        collection: str,
+        query: Dict[str, Any] | None = None,
+        *,
+        sort: Optional[Sequence[tuple[str, int]]] = None,
+        limit: Optional[int] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+        hint: Optional[Hint] = None,
+        max_time_ms: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield matching documents one at a time; only the current server batch is held in memory."""
+        cursor = self._find(
+            collection,
+            query,
+            projection,
+            sort=sort,
+            limit=limit,
+            batch_size=batch_size,
+            hint=hint,
+            max_time_ms=max_time_ms,
+        )
+        # Only the cursor fetches are timed, not the caller's work between documents.
+        timer = db_call("find", collection, query)
+        while True:
+            with timer:
+                try:
+                    doc = await cursor.next()
+                except StopAsyncIteration:
+                    return
+            yield doc
+
+    async def find_batches(
+        self,
+        collection: str,
+        query: Dict[str, Any] | None = None,
+        *,
+        sort: Optional[Sequence[tuple[str, int]]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: int = 500,
+        hint: Optional[Hint] = None,
+        max_time_ms: Optional[int] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield query results in lists of at most ``batch_size`` documents."""
+        cursor = self._find(
+            collection, query, projection, sort=sort, batch_size=batch_size, hint=hint, max_time_ms=max_time_ms
+        )
+        timer = db_call("find", collection, query)
+        while True:
+            with timer:
+                batch = await cursor.to_list(length=batch_size)
+            if not batch:
+                return
+            yield batch
+
+    async def count_many(
+        self,
+        collection: str,
+        query: Dict[str, Any] | None = None,
+        *,
+        hint: Optional[Hint] = None,
+        max_time_ms: Optional[int] = None,
+    ) -> int:
+        options: Dict[str, Any] = {**self._opts}
+        if hint is not None:
+            options["hint"] = hint
+        if max_time_ms:
+            options["maxTimeMS"] = max_time_ms
+        with db_call("count", collection, query):
+            return await self.db[collection].count_documents(query or {}, **options)
 
-    async def count_many(self, collection: str, query: Dict[str, Any] | None = None) -> int:
-        return await self.db[collection].count_documents(query or {})
+    async def estimated_count(self, collection: str) -> int:
+        """Collection size from metadata; O(1) but ignores filters."""
+        with db_call("estimated_count", collection):
+            return await self.db[collection].estimated_document_count()
 
-    async def find_one(self, collection: str, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        return await self.db[collection].find_one(query)
+    async def find_one(
+        self,
+        collection: str,
+        query: Dict[str, Any],
+        *,
+        projection: Optional[Dict[str, Any]] = None,
+        sort: Optional[Sequence[tuple[str, int]]] = None,
+        hint: Optional[Hint] = None,
+        max_time_ms: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        cursor = self._find(collection, query, projection, sort=sort, hint=hint, max_time_ms=max_time_ms)
+        # A negative limit asks for a single batch and closes the cursor, as pymongo's find_one does.
+        with db_call("find_one", collection, query):
+            async for doc in cursor.limit(-1):
+                return doc
+        return None
+
+    async def aggregate(
+        self, collection: str, pipeline: Sequence[Dict[str, Any]], *, max_time_ms: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        options: Dict[str, Any] = {**self._opts}
+        if max_time_ms:
+            options["maxTimeMS"] = max_time_ms
+        with db_call("aggregate", collection, pipeline):
+            cursor = self.db[collection].aggregate(list(pipeline), **options)
+            return [doc async for doc in cursor]
 
     async def insert_one(self, collection: str, doc: Dict[str, Any], *, with_timestamps: bool = True) -> ObjectId:
         if with_timestamps:
             now = utcnow()
             doc.setdefault("created_at", now)
             doc.setdefault("updated_at", now)
-        result = await self.db[collection].insert_one(doc)
+        with db_call("insert_one", collection):
+            result = await self.db[collection].insert_one(doc, **self._opts)
         return result.inserted_id
 
+    async def insert_many(
+        self,
+        collection: str,
+        docs: Sequence[Dict[str, Any]],
+        *,
+        with_timestamps: bool = True,
+        ordered: bool = True,
+    ) -> List[ObjectId]:
+        if not docs:
+            return []
+        if with_timestamps:
+            now = utcnow()
+            for doc in docs:
+                doc.setdefault("created_at", now)
+                doc.setdefault("updated_at", now)
+        with db_call("insert_many", collection):
+            result = await self.db[collection].insert_many(list(docs), ordered=ordered, **self._opts)
+        return list(result.inserted_ids)
+
     async def update_one(
         self,
         collection: str,
@@ -60,15 +233,82 @@ class BaseRepository:
         update: Dict[str, Any],
         *,
         touch_updated_at: bool = True,
+        upsert: bool = False,
     ) -> None:
         if touch_updated_at:
-            update = {**update}
-            set_part = update.get("$set", {})
-            set_part = {**set_part, "updated_at": utcnow()}
-            update["$set"] = set_part
-        await self.db[collection].update_one(filter_query, update)
+            update = self._touch(update)
+        with db_call("update_one", collection, filter_query):
+            await self.db[collection].update_one(filter_query, update, upsert=upsert, **self._opts)
+
+    async def update_many(
+        self,
+        collection: str,
+        filter_query: Dict[str, Any],
+        update: Dict[str, Any],
+        *,
+        touch_updated_at: bool = True,
+    ) -> int:
+        if touch_updated_at:
+            update = self._touch(update)
+        with db_call("update_many", collection, filter_query):
+            result = await self.db[collection].update_many(filter_query, update, **self._opts)
+        return result.modified_count
+
+    async def bulk_write(
+        self,
+        collection: str,
+        requests: Sequence[Any],
+        *,
+        ordered: bool = True,
+    ) -> Optional[BulkWriteResult]:
+        if not requests:
+            return None
+        with db_call("bulk_write", collection):
+            return await self.db[collection].bulk_write(list(requests), ordered=ordered, **self._opts)
+
+    async def find_one_and_update(
+        self,
+        collection: str,
+        filter_query: Dict[str, Any],
+        update: Dict[str, Any],
+        *,
+        touch_updated_at: bool = True,
+        return_updated: bool = False,
+        upsert: bool = False,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Atomically update one document and return it (pre-image by default)."""
+        if touch_updated_at:
+            update = self._touch(update)
+        with db_call("find_one_and_update", collection, filter_query):
+            return await self.db[collection].find_one_and_update(
+                filter_query,
+                update,
+                projection=projection,
+                upsert=upsert,
+                return_document=ReturnDocument.AFTER if return_updated else ReturnDocument.BEFORE,
+                **self._opts,
+            )
+
+    async def find_one_and_delete(
+        self, collection: str, query: Dict[str, Any], *, projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        with db_call("find_one_and_delete", collection, query):
+            return await self.db[collection].find_one_and_delete(query, projection=projection, **self._opts)
 
     async def delete_one(self, collection: str, query: Dict[str, Any]) -> None:
-        await self.db[collection].delete_one(query)
+        with db_call("delete_one", collection, query):
+            await self.db[collection].delete_one(query, **self._opts)
+
+    async def delete_many(self, collection: str, query: Dict[str, Any]) -> int:
+        with db_call("delete_many", collection, query):
+            result = await self.db[collection].delete_many(query, **self._opts)
+        return result.deleted_count
+
+    @staticmethod
+    def _touch(update: Dict[str, Any]) -> Dict[str, Any]:
+        update = {**update}
+        update["$set"] = {**update.get("$set", {}), "updated_at": utcnow()}
+        return update
 
 
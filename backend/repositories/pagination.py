@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from typing import Any, Dict, List, Sequence
+
+import bson
+from bson.errors import BSONError
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Pack the sort-key values of the last returned row into an opaque URL-safe token."""
+    raw = bson.encode({"v": list(values)})
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = bson.decode(raw)["v"]
+    except (binascii.Error, BSONError, KeyError, ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_filter(sort: Sequence[tuple[str, int]], values: Sequence[Any]) -> Dict[str, Any]:
+    """Build the "rows strictly after ``values``" predicate for a compound sort.
+
+    For ``[(a, -1), (b, -1)]`` this yields ``{a < va} OR {a == va AND b < vb}``, which
+    an index on ``(a, b)`` answers with a bounded scan instead of a skip.
+    """
+    if len(values) != len(sort):
+        raise ValueError("Invalid cursor")
+    clauses: List[Dict[str, Any]] = []
+    for i, (field, direction) in enumerate(sort):
+        clause: Dict[str, Any] = {sort[j][0]: values[j] for j in range(i)}
+        # Missing fields sort as null, below every other value, but range operators
+        # never match null; spell those rows out explicitly.
+        if values[i] is None:
+            if direction > 0:
+                clauses.append({**clause, field: {"$ne": None}})
+        elif direction > 0:
+            clauses.append({**clause, field: {"$gt": values[i]}})
+        else:
+            clauses.append({**clause, field: {"$lt": values[i]}})
+            if field != "_id":
+                clauses.append({**clause, field: None})
+    if not clauses:
+        return {"_id": {"$in": []}}
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, EmailStr
 
+from backend.schemas.common import ObjectIdStr
+
 
 class RecoveryCampaignCreate(BaseModel):
     patient_name: str
@@ -26,9 +28,118 @@ class AdminAppointmentCreate(BaseModel):
     preferred_channel: Optional[str] = None
     service_name: str
     notes: Optional[str] = None
+    provider_id: Optional[str] = None
 
 
 class CompleteAppointmentRequest(BaseModel):
     next_follow_up_date: Optional[datetime] = None
 
 
+class DashboardKpis(BaseModel):
+    appointments_booked_month: int
+    handoffs_requiring_action: int
+    active_recovery_campaigns: int
+
+
+class ConversionRates(BaseModel):
+    recovery_rate_percent: float
+    recall_rate_percent: float
+
+
+class DashboardStatsResponse(BaseModel):
+    kpis: DashboardKpis
+    conversion_rates: ConversionRates
+
+
+class DbPoolStats(BaseModel):
+    max_pool_size: int
+    open: int
+    checked_out: int
+    max_checked_out: int
+    utilization: float
+    checkouts: int
+    checkout_failures: Dict[str, int]
+    avg_checkout_wait_ms: float
+    max_checkout_wait_ms: float
+    pool_clears: int
+
+
+class Pagination(BaseModel):
+    total_items: int
+    total_pages: int
+    current_page: int
+    next_cursor: Optional[str] = None
+
+
+class CampaignSummary(BaseModel):
+    campaign_id: ObjectIdStr
+    patient_name: str
+    campaign_type: Optional[str] = None
+    status: Optional[str] = None
+    last_updated: Optional[datetime] = None
+
+
+class CampaignListResponse(BaseModel):
+    pagination: Pagination
+    campaigns: List[CampaignSummary]
+
+
+class InteractionItem(BaseModel):
+    interaction_id: ObjectIdStr
+    direction: Optional[str] = None
+    content: Optional[str] = None
+    timestamp: Optional[datetime] = None
+
+
+class CampaignDetails(BaseModel):
+    campaign_id: ObjectIdStr
+    patient_name: str
+    status: Optional[str] = None
+    engagement_summary: Optional[str] = None
+
+
+class CampaignDetailsResponse(BaseModel):
+    campaign_details: CampaignDetails
+    conversation_history: List[InteractionItem]
+    history_cursor: Optional[str] = None
+
+
+class InteractionPage(BaseModel):
+    campaign_id: str
+    interactions: List[InteractionItem]
+    next_cursor: Optional[str] = None
+
+
+class RecoveryCampaignCreated(BaseModel):
+    message: str
+    campaign_id: ObjectIdStr
+
+
+class AdminAppointmentResponse(BaseModel):
+    appointment_id: ObjectIdStr
+    patient_id: ObjectIdStr
+    campaign_id: Optional[ObjectIdStr] = None
+    provider_id: Optional[str] = None
+    appointment_date: datetime
+    duration_minutes: int
+    status: str
+    service_name: str
+    notes: Optional[str] = None
+    created_from: str
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+
+class PatientImportResponse(BaseModel):
+    rows: int
+    patients_inserted: int
+    patients_updated: int
+    campaigns_created: int
+    campaigns_updated: int
+    failed: int
+    errors: List[ImportRowError]
+    elapsed_seconds: float
+    rows_per_second: float
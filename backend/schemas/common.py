@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import Annotated, Any
+
+from bson import ObjectId
+from pydantic import BaseModel, BeforeValidator
+
+
+def _id_to_str(value: Any) -> Any:
+    return str(value) if isinstance(value, ObjectId) else value
+
+
+# Response fields holding Mongo ids: handlers may pass the raw ObjectId.
+ObjectIdStr = Annotated[str, BeforeValidator(_id_to_str)]
+
+
+class MessageResponse(BaseModel):
+    message: str
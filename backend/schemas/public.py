@@ -19,3 +19,6 @@ class AppointmentBookingResponse(BaseModel):
     message: str
     appointment_id: str
 
+
+class WebhookAck(BaseModel):
+    status: str
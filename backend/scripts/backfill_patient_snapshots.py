@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.core.config import settings
+from backend.repositories.base import BaseRepository
+from backend.services.patient_snapshots import SNAPSHOT_SOURCE_FIELDS, propagate
+
+
+async def run(*, batch_size: int, force: bool) -> int:
+    client = AsyncIOMotorClient(settings.mongo_uri)
+    repo = BaseRepository(client[settings.database_name])
+    started = time.perf_counter()
+    patients = modified = 0
+    try:
+        async for batch in repo.find_batches(
+            "patients", {}, sort=[("_id", 1)], projection=SNAPSHOT_SOURCE_FIELDS, batch_size=batch_size
+        ):
+            patients += len(batch)
+            modified += await propagate(repo, batch, force=force)
+    finally:
+        client.close()
+    report = {
+        "patients": patients,
+        "documents_updated": modified,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Copy every patient's name, type and channel onto their campaigns and appointments."
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.patient_snapshot_batch_size)
+    parser.add_argument(
+        "--force", action="store_true", help="rewrite copies that are already at the patient's revision"
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(batch_size=args.batch_size, force=args.force)))
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timezone
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.core.config import settings
+from backend.models.appointment import AppointmentStatus
+from backend.repositories.base import BaseRepository
+from backend.services.reservations import claim_existing
+
+
+async def run(*, since: datetime, batch_size: int) -> int:
+    client = AsyncIOMotorClient(settings.mongo_uri)
+    repo = BaseRepository(client[settings.database_name])
+    started = time.perf_counter()
+    totals = {"appointments": 0, "claimed": 0, "already_claimed": 0, "skipped": 0, "conflicts": 0}
+    try:
+        # Oldest booking first, so it keeps its slots when two overlap.
+        async for batch in repo.find_batches(
+            "appointments",
+            {"status": {"$ne": AppointmentStatus.cancelled.value}, "appointment_date": {"$gte": since}},
+            sort=[("_id", 1)],
+            projection={"provider_id": 1, "appointment_date": 1, "duration_minutes": 1},
+            batch_size=batch_size,
+        ):
+            totals["appointments"] += len(batch)
+            for key, count in (await claim_existing(repo, batch)).items():
+                totals[key] += count
+    finally:
+        client.close()
+    report = {**totals, "since": since.isoformat(), "seconds": round(time.perf_counter() - started, 3)}
+    print(json.dumps(report, indent=2))
+    # Overlapping bookings need someone to move one of them.
+    return 1 if totals["conflicts"] else 0
+
+
+if __name__ == "__main__":
+    today = datetime.now(timezone.utc).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+    parser = argparse.ArgumentParser(
+        description="Claim the slots of appointments booked before slot claims existed."
+    )
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        default=today,
+        help="only appointments from this date (UTC); defaults to today",
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(since=args.since, batch_size=args.batch_size)))
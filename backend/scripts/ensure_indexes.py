@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.core.config import settings
+from backend.db.indexes import QUERY_SHAPES, ensure_indexes, find_collscans, index_specs
+
+
+async def run(*, check: bool) -> int:
+    client = AsyncIOMotorClient(settings.mongo_uri)
+    db = client[settings.database_name]
+    try:
+        created = await ensure_indexes(db)
+        for collection, names in sorted(created.items()):
+            print(f"{collection}: {', '.join(names)}")
+        failed = sorted(set(index_specs()) - set(created))
+        if failed:
+            print("Index build failed for:", ", ".join(failed), file=sys.stderr)
+            return 1
+        if check:
+            offenders = await find_collscans(db)
+            for name in offenders:
+                print(f"COLLSCAN: {name}", file=sys.stderr)
+            print(f"Checked {len(QUERY_SHAPES)} query shapes, {len(offenders)} collection scan(s).")
+            if offenders:
+                return 1
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the indexes declared on backend.models.")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="explain() every repository query shape and fail if any is planned as a COLLSCAN",
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(check=args.check)))
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from typing import AsyncIterator, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.core.config import settings
+from backend.repositories.base import BaseRepository
+from backend.services.patient_import import ImportFormat, detect_format, import_patients, iter_text_lines
+
+
+CHUNK_SIZE = 1 << 16
+
+
+async def _read_chunks(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as handle:
+        while chunk := handle.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def run(*, path: str, fmt: Optional[ImportFormat], batch_size: int) -> int:
+    fmt = fmt or detect_format(path)
+    if fmt is None:
+        print("Cannot infer the format from the file name; pass --format.", file=sys.stderr)
+        return 2
+    client = AsyncIOMotorClient(settings.mongo_uri)
+    repo = BaseRepository(client[settings.database_name])
+    try:
+        report = await import_patients(repo, iter_text_lines(_read_chunks(path)), fmt=fmt, batch_size=batch_size)
+    finally:
+        client.close()
+    print(json.dumps(report.as_dict(), indent=2, default=str))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import patients (and RECALL campaigns) from CSV or NDJSON.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=settings.patient_import_batch_size)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(path=args.path, fmt=args.format, batch_size=args.batch_size)))
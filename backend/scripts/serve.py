@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import logging
+import os
+
+import uvicorn
+
+from backend.core.config import settings
+from backend.core.logs import configure_logging
+
+
+logger = logging.getLogger("backend.serve")
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API with N uvicorn worker processes.")
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.web_concurrency or os.cpu_count() or 1,
+        help="worker processes (default: WEB_CONCURRENCY, else one per CPU)",
+    )
+    parser.add_argument("--graceful-shutdown", type=int, default=settings.graceful_shutdown_seconds)
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--limit-concurrency", type=int, default=None, help="503 above this many open connections")
+    args = parser.parse_args()
+
+    configure_logging(level=settings.log_level, queued=settings.log_queued, queue_size=settings.log_queue_size)
+    # uvloop and httptools come with uvicorn[standard]; fall back rather than fail without them.
+    loop = "uvloop" if _available("uvloop") else "asyncio"
+    http = "httptools" if _available("httptools") else "h11"
+    logger.info("serve_starting", extra={"workers": args.workers, "loop": loop, "http": http, "port": args.port})
+
+    uvicorn.run(
+        "backend.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        lifespan="on",
+        backlog=args.backlog,
+        limit_concurrency=args.limit_concurrency,
+        timeout_graceful_shutdown=args.graceful_shutdown,
+        # Requests are already logged as JSON (request_completed); leave uvicorn's own
+        # loggers unconfigured so they propagate into the same pipeline.
+        access_log=False,
+        log_config=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from calendar import monthrange
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from backend.core.config import settings
+from backend.models.appointment import AppointmentStatus
+from backend.models.provider_schedule import ProviderSchedule, ScheduleWindow
+from backend.models.records import AppointmentRecord
+from backend.repositories.base import BaseRepository
+from backend.services.cache import TTLCache
+
+
+# Used when no provider_schedules documents exist: one provider, Mon-Fri 09:00-17:00.
+DEFAULT_SCHEDULES: Sequence[ProviderSchedule] = (
+    ProviderSchedule(
+        provider_id="default",
+        weekly={day: [ScheduleWindow(start="09:00", end="17:00")] for day in range(5)},
+    ),
+)
+
+AvailabilityKey = Tuple[int, int, Optional[str]]
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class AvailabilityEngine:
+    """Computes bookable start times per day as bitmaps, one bit per grid slot.
+
+    For every provider, the weekly template is turned into an "open" mask per
+    weekday and existing appointments into a "booked" mask per day, so free time
+    is ``open & ~booked``. A service needing ``k`` consecutive slots can start at
+    slot ``i`` iff bits ``i..i+k-1`` are free, which is ``free & free>>1 & ... &
+    free>>(k-1)``. A time is offered when any provider can take it.
+
+    Results are cached per ``(year, month, service_id)`` and dropped for a month
+    whenever an appointment in it is created or removed.
+    """
+
+    def __init__(self, *, slot_minutes: int, cache_ttl: float, cache_size: int) -> None:
+        self.slot_minutes = slot_minutes
+        self.slots_per_day = (24 * 60) // slot_minutes
+        self._cache: TTLCache[AvailabilityKey, Dict[str, List[str]]] = TTLCache(cache_size, cache_ttl)
+        self._schedules: TTLCache[str, Sequence[ProviderSchedule]] = TTLCache(1, cache_ttl)
+
+    def slot_span(self, start: datetime, duration_minutes: int) -> Tuple[int, int]:
+        """Grid slots ``[first, last)`` of the day covered by an appointment."""
+        start_minute = start.hour * 60 + start.minute
+        first = start_minute // self.slot_minutes
+        last = -(-(start_minute + max(duration_minutes, 1)) // self.slot_minutes)
+        return first, min(last, self.slots_per_day)
+
+    def _window_mask(self, window: ScheduleWindow) -> int:
+        first = _minutes(window.start) // self.slot_minutes
+        last = min(_minutes(window.end) // self.slot_minutes, self.slots_per_day)
+        return ((1 << last) - (1 << first)) if last > first else 0
+
+    def weekday_masks(self, schedule: ProviderSchedule) -> List[int]:
+        masks = [0] * 7
+        for weekday, windows in schedule.weekly.items():
+            for window in windows:
+                masks[weekday % 7] |= self._window_mask(window)
+        return masks
+
+    def is_open(self, schedule: ProviderSchedule, start: datetime, duration_minutes: int) -> bool:
+        """Whether ``schedule`` has the provider working for the whole appointment."""
+        start = to_utc_naive(start)
+        first, last = self.slot_span(start, duration_minutes)
+        mask = (1 << last) - (1 << first)
+        return self.weekday_masks(schedule)[start.weekday()] & mask == mask
+
+    def slots_needed(self, service_id: Optional[str]) -> int:
+        duration = settings.service_durations.get(service_id or "", self.slot_minutes)
+        return max(1, -(-duration // self.slot_minutes))
+
+    async def schedules(self, repo: BaseRepository) -> Sequence[ProviderSchedule]:
+        cached = self._schedules.get("all")
+        if cached is not None:
+            return cached
+        docs = await repo.find_many(ProviderSchedule.__collection__, {}, sort=[("provider_id", 1)])
+        schedules = [ProviderSchedule.from_mongo(doc) for doc in docs] or DEFAULT_SCHEDULES
+        self._schedules.set("all", schedules)
+        return schedules
+
+    async def month(
+        self, repo: BaseRepository, year: int, month: int, service_id: Optional[str] = None
+    ) -> Dict[str, List[str]]:
+        key: AvailabilityKey = (year, month, service_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        result = await self._compute(repo, year, month, service_id)
+        self._cache.set(key, result)
+        return result
+
+    async def _compute(
+        self, repo: BaseRepository, year: int, month: int, service_id: Optional[str]
+    ) -> Dict[str, List[str]]:
+        schedules = await self.schedules(repo)
+        providers = [s.provider_id for s in schedules]
+        open_by_weekday = {s.provider_id: self.weekday_masks(s) for s in schedules}
+
+        num_days = monthrange(year, month)[1]
+        days = [date(year, month, day) for day in range(1, num_days + 1)]
+        open_masks = {p: [open_by_weekday[p][d.weekday()] for d in days] for p in providers}
+        booked = {p: [0] * num_days for p in providers}
+
+        month_start = datetime(year, month, 1)
+        month_end = datetime(year + (month // 12), (month % 12) + 1, 1)
+        appointments = repo.iter_many(
+            "appointments",
+            {
+                "appointment_date": {"$gte": month_start, "$lt": month_end},
+                "status": {"$ne": AppointmentStatus.cancelled.value},
+            },
+            projection=AppointmentRecord.FIELDS,
+        )
+        async for doc in appointments:
+            appt = AppointmentRecord.from_mongo(doc)
+            start = appt.appointment_date
+            if not isinstance(start, datetime):
+                continue
+            start = to_utc_naive(start)
+            first, last = self.slot_span(start, int(appt.duration_minutes or self.slot_minutes))
+            mask = (1 << last) - (1 << first)
+            index = start.day - 1
+            provider = appt.provider_id
+            if provider not in booked:
+                # Unassigned bookings take the first provider that had the time free.
+                provider = next(
+                    (p for p in providers if open_masks[p][index] & ~booked[p][index] & mask == mask),
+                    providers[0],
+                )
+            booked[provider][index] |= mask
+
+        needed = self.slots_needed(service_id)
+        slots_by_date: Dict[str, List[str]] = {}
+        for index, day in enumerate(days):
+            if not any(open_masks[p][index] for p in providers):
+                continue
+            starts = 0
+            for provider in providers:
+                free = open_masks[provider][index] & ~booked[provider][index]
+                fits = free
+                for shift in range(1, needed):
+                    fits &= free >> shift
+                starts |= fits
+            slots_by_date[day.isoformat()] = self._times(starts)
+        return slots_by_date
+
+    def _times(self, bits: int) -> List[str]:
+        times: List[str] = []
+        while bits:
+            low = bits & -bits
+            minute = (low.bit_length() - 1) * self.slot_minutes
+            times.append(f"{minute // 60:02d}:{minute % 60:02d}")
+            bits ^= low
+        return times
+
+    def invalidate(self, when: Any) -> None:
+        """Drop cached months containing ``when`` (a datetime), or everything if unknown."""
+        if not isinstance(when, datetime):
+            self._cache.clear()
+            return
+        when = to_utc_naive(when)
+        for key in self._cache.keys():
+            if key[0] == when.year and key[1] == when.month:
+                self._cache.pop(key)
+
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats()
+
+
+availability_engine = AvailabilityEngine(
+    slot_minutes=settings.availability_slot_minutes,
+    cache_ttl=settings.availability_cache_ttl_seconds,
+    cache_size=settings.availability_cache_max_entries,
+)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from backend.core.config import settings
+from backend.repositories.base import BaseRepository
+from backend.services.cache import TTLCache
+
+
+DEDUP_COLLECTION = "webhook_dedup"
+
+
+class MessageDeduplicator:
+    """Remembers delivered message ids so redeliveries can be dropped up front.
+
+    A process-local LRU answers repeats without a round trip; the authoritative
+    record is a document keyed by message id in ``webhook_dedup`` (expired by a
+    TTL index), whose unique ``_id`` makes the first-seen check a single atomic
+    insert shared by every replica.
+    """
+
+    def __init__(self, *, memory_size: int, ttl_seconds: float) -> None:
+        self._recent: TTLCache[str, bool] = TTLCache(memory_size, ttl_seconds)
+        self.accepted = 0
+        self.dropped_memory = 0
+        self.dropped_store = 0
+
+    async def claim(self, repo: BaseRepository, message_id: str) -> bool:
+        """Return True the first time ``message_id`` is seen, False for duplicates."""
+        if self._recent.get(message_id):
+            self.dropped_memory += 1
+            return False
+        try:
+            await repo.insert_one(DEDUP_COLLECTION, {"_id": message_id})
+        except DuplicateKeyError:
+            self._recent.set(message_id, True)
+            self.dropped_store += 1
+            return False
+        self._recent.set(message_id, True)
+        self.accepted += 1
+        return True
+
+    async def forget(self, repo: BaseRepository, message_id: str) -> None:
+        """Undo a claim whose message could not be accepted, so a redelivery gets through."""
+        self._recent.pop(message_id)
+        await repo.delete_one(DEDUP_COLLECTION, {"_id": message_id})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "accepted": self.accepted,
+            "dropped_memory": self.dropped_memory,
+            "dropped_store": self.dropped_store,
+            "memory": self._recent.stats(),
+        }
+
+
+def pubsub_message_id(payload: Dict[str, Any]) -> Optional[str]:
+    message = payload.get("message") or {}
+    message_id = message.get("messageId") or message.get("message_id")
+    return str(message_id) if message_id else None
+
+
+gmail_dedup = MessageDeduplicator(
+    memory_size=settings.webhook_dedup_memory_size,
+    ttl_seconds=settings.webhook_dedup_ttl_seconds,
+)
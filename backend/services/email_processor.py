@@ -2,23 +2,52 @@ from __future__ import annotations
 
 import base64
 import json
-from typing import Any, Dict
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 from backend.db.database import get_database
 from backend.repositories.base import BaseRepository, utcnow
+from backend.services.events import emit_campaign_status, emit_campaign_updated, emit_interaction
+from backend.services.kpi import record_campaign_transition
+from backend.services.dedup import pubsub_message_id
+from backend.services.routing import CampaignRoute, thread_routes
 
 
-async def process_gmail_webhook(payload: Dict[str, Any]) -> None:
+DUPLICATE_KEY = 11000
+
+
+async def _insert_interactions(repo: BaseRepository, interactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert ``interactions`` and return the ones stored now.
+
+    Messages already stored by an earlier attempt (same ``message_id``) are
+    skipped, so a retried batch does not duplicate the conversation.
+    """
+    try:
+        await repo.insert_many("interactions", interactions, ordered=False)
+    except BulkWriteError as exc:
+        errors = exc.details.get("writeErrors", [])
+        if any(err.get("code") != DUPLICATE_KEY for err in errors):
+            raise
+        skipped = {err["index"] for err in errors}
+        return [interaction for i, interaction in enumerate(interactions) if i not in skipped]
+    return interactions
+
+
+def decode_gmail_payload(payload: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """Extract ``(thread_id, content)`` from a Pub/Sub push payload, or None if unusable."""
     # 1. Decode Base64 message.data
     message = payload.get("message", {})
     data_b64: str | None = message.get("data")
     if not data_b64:
-        return
+        return None
     try:
         decoded_bytes = base64.b64decode(data_b64)
         decoded_str = decoded_bytes.decode("utf-8")
     except Exception:
-        return
+        return None
 
     # 2. Mock fetch of Gmail thread -> extract thread_id and content
     try:
@@ -26,29 +55,77 @@ async def process_gmail_webhook(payload: Dict[str, Any]) -> None:
     except json.JSONDecodeError:
         parsed = {"thread_id": "mock-thread-id", "content": decoded_str}
 
-    thread_id = parsed.get("thread_id", "mock-thread-id")
-    content = parsed.get("content", "")
+    return parsed.get("thread_id", "mock-thread-id"), parsed.get("content", "")
 
-    # 3. Find campaign by channel.thread_id
-    db = await get_database()
-    repo = BaseRepository(db)
-    campaign = await repo.find_one("campaigns", {"channel.thread_id": thread_id})
-    if not campaign:
-        return
 
-    # 4. Minimal processing: persist inbound interaction and bump status to RE_ENGAGED if appropriate
-    interaction_doc = {
-        "campaign_id": campaign["_id"],
-        "direction": "incoming",
-        "content": content,
-        "timestamp": utcnow(),
-    }
-    await repo.insert_one("interactions", interaction_doc)
+async def process_gmail_batch(repo: BaseRepository, payloads: Sequence[Dict[str, Any]]) -> int:
+    """Process many notifications with a fixed number of round trips.
+
+    Campaigns for every thread in the batch are resolved through the routing
+    cache (misses with one ``$in`` query), interactions are written with one
+    ``insert_many`` keyed on the Pub/Sub message id and status changes with one
+    ``bulk_write`` per campaign type. Returns the number of interactions stored.
+    """
+    messages_by_thread: Dict[str, List[Tuple[Optional[str], str]]] = defaultdict(list)
+    for payload in payloads:
+        decoded = decode_gmail_payload(payload)
+        if decoded:
+            thread_id, content = decoded
+            messages_by_thread[thread_id].append((pubsub_message_id(payload), content))
+    if not messages_by_thread:
+        return 0
+
+    # 3. Find campaigns by channel.thread_id
+    routes = await thread_routes.resolve(repo, messages_by_thread)
 
-    # If currently ATTEMPTING_RECOVERY, mark RE_ENGAGED
-    if campaign.get("status") == "ATTEMPTING_RECOVERY":
-        await repo.update_one("campaigns", {"_id": campaign["_id"]}, {"$set": {"status": "RE_ENGAGED"}})
+    # 4. Persist inbound interactions and bump ATTEMPTING_RECOVERY campaigns to RE_ENGAGED
+    now = utcnow()
+    interactions: List[Dict[str, Any]] = []
+    re_engaged: Dict[Any, List[CampaignRoute]] = defaultdict(list)
+    for thread_id, contents in messages_by_thread.items():
+        route = routes.get(thread_id)
+        if not route:
+            continue
+        for message_id, content in contents:
+            interaction = {
+                "campaign_id": route.campaign_id,
+                "direction": "incoming",
+                "content": content,
+                "timestamp": now,
+            }
+            if message_id:
+                interaction["message_id"] = message_id
+            interactions.append(interaction)
+        if route.status == "ATTEMPTING_RECOVERY":
+            re_engaged[route.campaign_type].append(route)
 
-    return
+    stored = await _insert_interactions(repo, interactions)
+    for interaction in stored:
+        emit_interaction(interaction)
+    for campaign_type, candidates in re_engaged.items():
+        updates = [
+            UpdateOne(
+                {"_id": route.campaign_id, "status": "ATTEMPTING_RECOVERY"},
+                {"$set": {"status": "RE_ENGAGED", "updated_at": now}},
+            )
+            for route in candidates
+        ]
+        result = await repo.bulk_write("campaigns", updates, ordered=False)
+        modified = result.modified_count if result else 0
+        for route in candidates:
+            if modified == len(candidates):
+                thread_routes.update_status(route.campaign_id, "RE_ENGAGED")
+                emit_campaign_status(route.campaign_id, "RE_ENGAGED", previous="ATTEMPTING_RECOVERY")
+            else:
+                # Some statuses changed underneath us; re-read them next time.
+                thread_routes.invalidate_campaign(route.campaign_id)
+                emit_campaign_updated(route.campaign_id)
+        if modified:
+            await record_campaign_transition(repo, campaign_type, "ATTEMPTING_RECOVERY", "RE_ENGAGED", count=modified)
+    return len(stored)
 
 
+async def process_gmail_webhook(payload: Dict[str, Any]) -> None:
+    db = await get_database()
+    repo = BaseRepository(db)
+    await process_gmail_batch(repo, [payload])
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
+
+from backend.core.config import settings
+from backend.repositories.base import utcnow
+
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_CREATED = "campaign.created"
+CAMPAIGN_STATUS = "campaign.status"
+CAMPAIGN_UPDATED = "campaign.updated"
+INTERACTION_CREATED = "interaction.created"
+# Sent to a subscriber that fell behind and lost events; it should refetch.
+RESYNC = "resync"
+
+PREVIEW_CHARS = 200
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    data: Dict[str, Any]
+
+
+@dataclass(eq=False)
+class Subscription:
+    """A subscriber's bounded mailbox.
+
+    ``EventBus.publish`` never waits on it. When the mailbox is full its contents
+    are dropped and the next read yields a single ``resync`` event instead, so a
+    slow client costs the broadcaster O(1) and can never stall it.
+    """
+
+    bus: "EventBus"
+    maxsize: int
+    queue: "asyncio.Queue[Event]" = field(init=False)
+    overflowed: bool = False
+    dropped: int = 0
+
+    def __post_init__(self) -> None:
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+
+    def offer(self, event: Event) -> None:
+        if self.overflowed:
+            self.dropped += 1
+            self.bus.dropped += 1
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            lost = self.queue.qsize() + 1
+            self.dropped += lost
+            self.bus.dropped += lost
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Next event, or None after ``timeout`` seconds without one."""
+        if self.overflowed:
+            self.overflowed = False
+            return Event(self.bus.next_id(), RESYNC, {"dropped": self.dropped})
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+    async def __aiter__(self) -> AsyncIterator[Event]:
+        while True:
+            event = await self.get()
+            if event is not None:
+                yield event
+
+
+class EventBus:
+    """In-process fan-out of campaign events to connected dashboards."""
+
+    def __init__(self, *, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.dropped = 0
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, type: str, **data: Any) -> None:
+        event = Event(self.next_id(), type, {**data, "at": utcnow()})
+        self.published += 1
+        for subscription in list(self._subscribers):
+            subscription.offer(event)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+event_bus = EventBus(queue_size=settings.events_queue_size)
+
+
+def _local() -> bool:
+    # With the change-stream source every replica learns about writes from MongoDB,
+    # so publishing locally as well would deliver them twice.
+    return settings.events_source == "local"
+
+
+def emit_campaign_created(campaign_id: Any, *, status: Any, campaign_type: Any) -> None:
+    if _local():
+        event_bus.publish(
+            CAMPAIGN_CREATED, campaign_id=campaign_id, status=_value(status), campaign_type=_value(campaign_type)
+        )
+
+
+def emit_campaign_status(campaign_id: Any, status: Any, *, previous: Any = None) -> None:
+    if _local():
+        event_bus.publish(CAMPAIGN_STATUS, campaign_id=campaign_id, status=_value(status), previous=_value(previous))
+
+
+def emit_campaign_updated(campaign_id: Any) -> None:
+    """The campaign changed in a way the emitter cannot describe; clients should refetch it."""
+    if _local():
+        event_bus.publish(CAMPAIGN_UPDATED, campaign_id=campaign_id)
+
+
+def emit_interaction(interaction: Dict[str, Any]) -> None:
+    if _local():
+        event_bus.publish(INTERACTION_CREATED, **_interaction_data(interaction))
+
+
+def _interaction_data(interaction: Dict[str, Any]) -> Dict[str, Any]:
+    content = interaction.get("content") or ""
+    return {
+        "interaction_id": interaction.get("_id"),
+        "campaign_id": interaction.get("campaign_id"),
+        "direction": interaction.get("direction"),
+        "preview": content[:PREVIEW_CHARS],
+        "timestamp": interaction.get("timestamp"),
+    }
+
+
+def _value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+class ChangeStreamPump:
+    """Feeds ``event_bus`` from a MongoDB change stream on campaigns and interactions.
+
+    Used with ``EVENTS_SOURCE=change_stream`` so that every replica sees writes made
+    by any of them. Needs a replica set; resumes from the last seen token after
+    errors.
+    """
+
+    def __init__(self, bus: EventBus, *, retry_seconds: float = 5.0) -> None:
+        self.bus = bus
+        self.retry_seconds = retry_seconds
+        self._task: Optional[asyncio.Task[None]] = None
+        self._resume_token: Optional[Dict[str, Any]] = None
+
+    def start(self, db: AsyncIOMotorDatabase) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(db), name="events-change-stream")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self, db: AsyncIOMotorDatabase) -> None:
+        pipeline = [
+            {
+                "$match": {
+                    "operationType": {"$in": ["insert", "update", "replace"]},
+                    "ns.coll": {"$in": ["campaigns", "interactions"]},
+                }
+            },
+            {
+                "$project": {
+                    "operationType": 1,
+                    "ns": 1,
+                    "documentKey": 1,
+                    "updateDescription.updatedFields.status": 1,
+                    "fullDocument._id": 1,
+                    "fullDocument.campaign_id": 1,
+                    "fullDocument.direction": 1,
+                    "fullDocument.content": 1,
+                    "fullDocument.timestamp": 1,
+                    "fullDocument.status": 1,
+                    "fullDocument.campaign_type": 1,
+                }
+            },
+        ]
+        while True:
+            try:
+                async with db.watch(pipeline, resume_after=self._resume_token) as stream:
+                    async for change in stream:
+                        self._resume_token = stream.resume_token
+                        self._publish(change)
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError:
+                logger.exception("events_change_stream_error")
+                await asyncio.sleep(self.retry_seconds)
+
+    def _publish(self, change: Dict[str, Any]) -> None:
+        collection = change.get("ns", {}).get("coll")
+        document = change.get("fullDocument") or {}
+        campaign_id = change.get("documentKey", {}).get("_id")
+        if collection == "interactions":
+            if change["operationType"] == "insert":
+                self.bus.publish(INTERACTION_CREATED, **_interaction_data(document))
+        elif change["operationType"] == "insert":
+            self.bus.publish(
+                CAMPAIGN_CREATED,
+                campaign_id=campaign_id,
+                status=document.get("status"),
+                campaign_type=document.get("campaign_type"),
+            )
+        else:
+            status = change.get("updateDescription", {}).get("updatedFields", {}).get("status")
+            if status is not None:
+                self.bus.publish(CAMPAIGN_STATUS, campaign_id=campaign_id, status=status, previous=None)
+
+
+change_stream_pump = ChangeStreamPump(event_bus)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from backend.core.config import settings
+from backend.repositories.base import BaseRepository, utcnow
+from backend.services.events import emit_interaction
+
+if TYPE_CHECKING:
+    import httpx
+
+
+logger = logging.getLogger(__name__)
+
+
+class FollowUpNotSent(Exception):
+    """The agent did not confirm that it sent the follow-up."""
+
+
+class FollowUpAgent:
+    """Hands due follow-ups to the AI agent's proactive workflow over HTTP.
+
+    For each campaign the agent writes and sends the message and answers with
+    what it sent, ``{"content": ..., "message_id": ...}``; that is stored as the
+    campaign's outgoing interaction. Anything other than a 2xx carrying
+    ``content`` raises, so the scheduler counts no attempt and retries once the
+    claim's lease runs out. Retries of one attempt reuse its ``Idempotency-Key``,
+    so the agent can recognise a message it already sent.
+    """
+
+    def __init__(self, *, url: Optional[str], token: Optional[str], timeout: float) -> None:
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.url)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            # Imported here: only processes running the scheduler talk to the agent.
+            import httpx
+
+            headers = {"Authorization": f"Bearer {self.token}"} if self.token else None
+            self._client = httpx.AsyncClient(timeout=self.timeout, headers=headers)
+        return self._client
+
+    async def send(self, repo: BaseRepository, campaign: Dict[str, Any]) -> None:
+        """``FollowUpSender`` for ``RecallScheduler``."""
+        assert self.url is not None
+        details = campaign.get("follow_up_details") or {}
+        attempt = int(details.get("attempts_made") or 0) + 1
+        body = {
+            "campaign_id": str(campaign["_id"]),
+            "patient_id": str(campaign.get("patient_id")),
+            "campaign_type": campaign.get("campaign_type"),
+            "channel": (campaign.get("channel") or {}).get("type"),
+            "attempt": attempt,
+            "max_attempts": int(details.get("max_attempts") or 3),
+        }
+        response = await self._get_client().post(
+            self.url, json=body, headers={"Idempotency-Key": f"{campaign['_id']}:{attempt}"}
+        )
+        response.raise_for_status()
+        sent = response.json()
+        content = sent.get("content") if isinstance(sent, dict) else None
+        if not content:
+            raise FollowUpNotSent(f"agent answered {response.status_code} without the message it sent")
+
+        interaction: Dict[str, Any] = {
+            "campaign_id": campaign["_id"],
+            "direction": "outgoing",
+            "content": content,
+            "timestamp": utcnow(),
+        }
+        if sent.get("message_id"):
+            interaction["message_id"] = str(sent["message_id"])
+        try:
+            await repo.insert_one("interactions", interaction)
+        except DuplicateKeyError:
+            # A retry of an attempt the agent had already sent and we had already stored.
+            return
+        emit_interaction(interaction)
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+
+follow_up_agent = FollowUpAgent(
+    url=settings.recall_agent_url,
+    token=settings.recall_agent_token,
+    timeout=settings.recall_agent_timeout_seconds,
+)
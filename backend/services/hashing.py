@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Literal, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class HashingPool:
+    """Runs CPU-bound password hashing off the event loop with bounded concurrency.
+
+    At most ``max_concurrency`` calls are handed to the executor at once; the rest
+    wait on a semaphore, which is what the queue metrics measure.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        max_concurrency: Optional[int] = None,
+        kind: Literal["thread", "process"] = "thread",
+    ) -> None:
+        self.workers = max(1, workers)
+        self.max_concurrency = max(1, max_concurrency or self.workers)
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hashing")
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        enqueued_at = time.perf_counter()
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        started_at = time.perf_counter()
+        waited = started_at - enqueued_at
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self.total_run_seconds += time.perf_counter() - started_at
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "queued": self.queued,
+            "running": self.running,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "avg_wait_ms": (self.total_wait_seconds / self.completed * 1000.0) if self.completed else 0.0,
+            "max_wait_ms": self.max_wait_seconds * 1000.0,
+            "avg_run_ms": (self.total_run_seconds / self.completed * 1000.0) if self.completed else 0.0,
+            "wait_seconds_total": self.total_wait_seconds,
+            "run_seconds_total": self.total_run_seconds,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        self._semaphore = None
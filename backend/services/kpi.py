@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from pymongo.errors import PyMongoError
+
+from backend.models.appointment import AppointmentStatus
+from backend.models.campaign import CampaignStatus, CampaignType
+from backend.repositories.base import BaseRepository, utcnow
+
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_COLLECTION = "kpi_counters"
+DASHBOARD_COUNTER_ID = "dashboard"
+# Bumped with every increment, so a rebuild can tell whether one landed meanwhile.
+VERSION = "version"
+RECONCILE_ATTEMPTS = 3
+
+_CAMPAIGN_TYPES = {t.value for t in CampaignType}
+_CAMPAIGN_STATUSES = {s.value for s in CampaignStatus}
+
+
+def _value(v: Any) -> Any:
+    return getattr(v, "value", v)
+
+
+def month_key(value: Any) -> Optional[str]:
+    """Bucket an appointment date into the ``YYYY-MM`` key used by the counter document."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def _campaign_key(campaign_type: Any, status: Any) -> Optional[str]:
+    campaign_type, status = _value(campaign_type), _value(status)
+    if campaign_type not in _CAMPAIGN_TYPES or status not in _CAMPAIGN_STATUSES:
+        return None
+    return f"campaigns.{campaign_type}.{status}"
+
+
+async def _bump(repo: BaseRepository, increments: Dict[str, int]) -> None:
+    increments = {k: v for k, v in increments.items() if v}
+    if not increments:
+        return
+    # Counters are derived data: a failed bump must not fail the write that caused it.
+    # Any drift is repaired by reconcile_kpi_counters(). No upsert: until a rebuild
+    # has created the document, the first dashboard read computes it from scratch.
+    try:
+        await repo.update_one(
+            COUNTERS_COLLECTION,
+            {"_id": DASHBOARD_COUNTER_ID},
+            {"$inc": {**increments, VERSION: 1}},
+        )
+    except PyMongoError:
+        logger.warning("kpi_counter_update_failed", extra={"increments": increments}, exc_info=True)
+
+
+async def record_campaign_created(repo: BaseRepository, campaign_type: Any, status: Any, count: int = 1) -> None:
+    key = _campaign_key(campaign_type, status)
+    if key:
+        await _bump(repo, {key: count})
+
+
+async def record_campaign_transition(
+    repo: BaseRepository, campaign_type: Any, old_status: Any, new_status: Any, count: int = 1
+) -> None:
+    if _value(old_status) == _value(new_status):
+        return
+    increments: Dict[str, int] = {}
+    old_key = _campaign_key(campaign_type, old_status)
+    new_key = _campaign_key(campaign_type, new_status)
+    if old_key:
+        increments[old_key] = -count
+    if new_key:
+        increments[new_key] = count
+    await _bump(repo, increments)
+
+
+async def record_appointment_booked(repo: BaseRepository, appointment_date: Any, delta: int = 1) -> None:
+    """Adjust the per-month count of appointments in ``booked`` status."""
+    key = month_key(appointment_date)
+    if key:
+        await _bump(repo, {f"appointments_booked.{key}": delta})
+
+
+async def compute_kpi_counters(
+    repo: BaseRepository, *, start: Optional[datetime] = None, end: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Compute the counter document from scratch with a single aggregation.
+
+    Campaigns are grouped by ``(campaign_type, status)`` and booked appointments by month
+    (optionally restricted to ``[start, end)`` server-side); both streams are merged with
+    ``$unionWith`` and split back out with ``$facet``.
+    """
+    date_filter: Dict[str, Any] = {"$type": "date"}
+    if start is not None:
+        date_filter["$gte"] = start
+    if end is not None:
+        date_filter["$lt"] = end
+
+    pipeline = [
+        {"$group": {"_id": {"campaign_type": "$campaign_type", "status": "$status"}, "count": {"$sum": 1}}},
+        {
+            "$unionWith": {
+                "coll": "appointments",
+                "pipeline": [
+                    {"$match": {"status": AppointmentStatus.booked.value, "appointment_date": date_filter}},
+                    {
+                        "$group": {
+                            "_id": {"month": {"$dateToString": {"format": "%Y-%m", "date": "$appointment_date"}}},
+                            "count": {"$sum": 1},
+                        }
+                    },
+                ],
+            }
+        },
+        {
+            "$facet": {
+                "campaigns": [{"$match": {"_id.month": {"$exists": False}}}],
+                "appointments": [{"$match": {"_id.month": {"$exists": True}}}],
+            }
+        },
+    ]
+    rows = await repo.aggregate("campaigns", pipeline)
+    facets = rows[0] if rows else {}
+
+    campaigns: Dict[str, Dict[str, int]] = {}
+    for row in facets.get("campaigns", []):
+        campaign_type = row["_id"].get("campaign_type")
+        status = row["_id"].get("status")
+        if _campaign_key(campaign_type, status):
+            campaigns.setdefault(campaign_type, {})[status] = row["count"]
+
+    appointments_booked = {row["_id"]["month"]: row["count"] for row in facets.get("appointments", [])}
+    return {"campaigns": campaigns, "appointments_booked": appointments_booked}
+
+
+async def reconcile_kpi_counters(repo: BaseRepository) -> Dict[str, Any]:
+    """Rebuild the counter document from the source collections and persist it.
+
+    The document is created first, so bumps made while the aggregation runs are
+    applied and move ``version``. The rebuilt counters are only written if the
+    version is still the one read before computing; otherwise they are computed
+    again, so no concurrent bump is overwritten. After ``RECONCILE_ATTEMPTS``
+    lost races the counters are returned without being stored.
+    """
+    counters: Dict[str, Any] = {}
+    for _ in range(RECONCILE_ATTEMPTS):
+        current = await repo.find_one_and_update(
+            COUNTERS_COLLECTION,
+            {"_id": DASHBOARD_COUNTER_ID},
+            {"$setOnInsert": {VERSION: 0}},
+            touch_updated_at=False,
+            return_updated=True,
+            upsert=True,
+            projection={VERSION: 1},
+        )
+        version = current.get(VERSION) if current else None
+        counters = await compute_kpi_counters(repo)
+        stored = await repo.find_one_and_update(
+            COUNTERS_COLLECTION,
+            {"_id": DASHBOARD_COUNTER_ID, VERSION: version},
+            {"$set": {**counters, "reconciled_at": utcnow()}},
+            projection={"_id": 1},
+        )
+        if stored is not None:
+            return counters
+    logger.warning("kpi_reconcile_contended", extra={"attempts": RECONCILE_ATTEMPTS})
+    return counters
+
+
+def build_dashboard_stats(counters: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    campaigns: Dict[str, Dict[str, int]] = counters.get("campaigns") or {}
+
+    def count(campaign_type: CampaignType, *statuses: CampaignStatus) -> int:
+        by_status = campaigns.get(campaign_type.value) or {}
+        if not statuses:
+            return sum(by_status.values())
+        return sum(by_status.get(s.value, 0) for s in statuses)
+
+    def count_status(status: CampaignStatus) -> int:
+        return sum(count(t, status) for t in CampaignType)
+
+    booked_month = (counters.get("appointments_booked") or {}).get(month_key(now), 0)
+    handoffs = count_status(CampaignStatus.HANDOFF_REQUIRED)
+    active_recovery = count(CampaignType.RECOVERY, CampaignStatus.ATTEMPTING_RECOVERY, CampaignStatus.RE_ENGAGED)
+
+    total_recovery = count(CampaignType.RECOVERY)
+    recovered = count_status(CampaignStatus.RECOVERED)
+    recovery_rate = (recovered / total_recovery * 100.0) if total_recovery else 0.0
+
+    total_recall = count(CampaignType.RECALL)
+    recall_recovered = count(CampaignType.RECALL, CampaignStatus.RECOVERED)
+    recall_rate = (recall_recovered / total_recall * 100.0) if total_recall else 0.0
+
+    return {
+        "kpis": {
+            "appointments_booked_month": booked_month,
+            "handoffs_requiring_action": handoffs,
+            "active_recovery_campaigns": active_recovery,
+        },
+        "conversion_rates": {
+            "recovery_rate_percent": round(recovery_rate, 1),
+            "recall_rate_percent": round(recall_rate, 1),
+        },
+    }
+
+
+async def get_dashboard_stats(repo: BaseRepository, *, recompute: bool = False) -> Dict[str, Any]:
+    """Serve dashboard KPIs from the counter document (one ``_id`` lookup).
+
+    The counters are rebuilt from scratch when ``recompute`` is set or when the
+    document has never been reconciled; until then it holds only the bumps made
+    since it was created.
+    """
+    counters = None if recompute else await repo.find_one(COUNTERS_COLLECTION, {"_id": DASHBOARD_COUNTER_ID})
+    if counters is None or "reconciled_at" not in counters:
+        counters = await reconcile_kpi_counters(repo)
+    return build_dashboard_stats(counters, utcnow())
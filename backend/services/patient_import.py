@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+import logging
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Literal, Optional, Tuple
+
+from bson import ObjectId
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from backend.models.campaign import CampaignStatus, CampaignType
+from backend.models.patient import ChannelType, Patient, PatientType, normalize_email
+from backend.repositories.base import BaseRepository, utcnow
+from backend.services.kpi import record_campaign_created
+from backend.services.patient_snapshots import mark_stale, patient_snapshot, patient_snapshot_sync
+
+
+logger = logging.getLogger(__name__)
+
+ImportFormat = Literal["csv", "ndjson"]
+
+# (line number, record, parse error) — exactly one of record / error is set.
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+# Only the first errors are kept so a bad file cannot grow the report without bound.
+MAX_REPORTED_ERRORS = 1000
+
+_LIST_SEPARATOR = re.compile(r"[;|]")
+
+
+class PatientImportRow(Patient):
+    """One imported patient; ``next_follow_up_date`` schedules a RECALL campaign."""
+
+    patient_type: PatientType = PatientType.EXISTING
+    email: str = ""
+    phone: str = ""
+    next_follow_up_date: Optional[datetime] = None
+
+    def key(self) -> Tuple[str, str]:
+        return ("email", self.email) if self.email else ("phone", self.phone)
+
+    def recall_date(self) -> Optional[datetime]:
+        dates = [item.next_follow_up_date for item in self.treatment_history if item.next_follow_up_date]
+        if self.next_follow_up_date:
+            dates.append(self.next_follow_up_date)
+        return min(dates) if dates else None
+
+
+@dataclass
+class RowError:
+    line: int
+    error: str
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    patients_inserted: int = 0
+    patients_updated: int = 0
+    campaigns_created: int = 0
+    campaigns_updated: int = 0
+    failed: int = 0
+    errors: List[RowError] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    def add_error(self, line: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(line, error))
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+def detect_format(filename: Optional[str]) -> Optional[ImportFormat]:
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+async def iter_text_lines(chunks: AsyncIterable[bytes], encoding: str = "utf-8-sig") -> AsyncIterator[str]:
+    """Decode a byte stream incrementally and yield it line by line (newlines kept)."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _csv_record(header: List[str], values: List[str]) -> Dict[str, Any]:
+    record: Dict[str, Any] = {}
+    for column, value in zip(header, values):
+        value = value.strip()
+        if not column or not value:
+            continue
+        if column == "preferred_channel":
+            record[column] = [part.strip() for part in _LIST_SEPARATOR.split(value) if part.strip()]
+        elif column == "treatment_history":
+            record[column] = json.loads(value)
+        else:
+            record[column] = value
+    return record
+
+
+async def iter_csv_records(lines: AsyncIterable[str]) -> AsyncIterator[ParsedRow]:
+    """Parse CSV with a header row. ``preferred_channel`` is ``;``-separated and
+    ``treatment_history`` a JSON array; quoted fields may span lines."""
+    header: Optional[List[str]] = None
+    buffer: List[str] = []
+    quotes = 0
+    line_no = record_line = 0
+    async for line in lines:
+        line_no += 1
+        if not buffer:
+            record_line = line_no
+        buffer.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue  # inside a quoted field
+        text, buffer, quotes = "".join(buffer), [], 0
+        values = next(csv.reader([text]), [])
+        if not any(value.strip() for value in values):
+            continue
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        if len(values) > len(header):
+            yield record_line, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        try:
+            record = _csv_record(header, values)
+        except ValueError as exc:
+            yield record_line, None, f"treatment_history: {exc}"
+            continue
+        yield record_line, record, None
+    if buffer:
+        yield record_line, None, "unterminated quoted field"
+
+
+async def iter_ndjson_records(lines: AsyncIterable[str]) -> AsyncIterator[ParsedRow]:
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_no, None, f"invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors())
+
+
+def _patient_fields(row: PatientImportRow) -> Dict[str, Any]:
+    return {
+        "name": row.name,
+        "email": row.email,
+        "phone": row.phone,
+        "patient_type": row.patient_type.value,
+        "preferred_channel": [channel.value for channel in row.preferred_channel],
+        "treatment_history": [item.model_dump() for item in row.treatment_history],
+    }
+
+
+def _write_outcome(result: Any, details: Optional[Dict[str, Any]]) -> Tuple[int, int, Dict[int, ObjectId]]:
+    """(inserted, matched, upserted ids by op index) from a BulkWriteResult or BulkWriteError details."""
+    if details is not None:
+        upserted = {item["index"]: item["_id"] for item in details.get("upserted", [])}
+        return details.get("nUpserted", 0), details.get("nMatched", 0), upserted
+    if result is None:
+        return 0, 0, {}
+    return result.upserted_count, result.matched_count, dict(result.upserted_ids or {})
+
+
+async def _write_batch(repo: BaseRepository, batch: List[Tuple[int, PatientImportRow]], report: ImportReport) -> None:
+    # Later rows win when a file repeats a patient within one batch.
+    latest: Dict[Tuple[str, str], Tuple[int, PatientImportRow]] = {}
+    for line, row in batch:
+        latest[row.key()] = (line, row)
+    rows = list(latest.values())
+
+    now = utcnow()
+    requests = [
+        UpdateOne(
+            {row.key()[0]: row.key()[1]},
+            # Re-imports may rename; the snapshot sync re-copies the patient onto their campaigns.
+            mark_stale({"$set": {**_patient_fields(row), "updated_at": now}, "$setOnInsert": {"created_at": now}}),
+            upsert=True,
+        )
+        for _, row in rows
+    ]
+    failed_ops: set[int] = set()
+    try:
+        result = await repo.bulk_write("patients", requests, ordered=False)
+        inserted, matched, upserted_ids = _write_outcome(result, None)
+    except BulkWriteError as exc:
+        inserted, matched, upserted_ids = _write_outcome(None, exc.details)
+        for err in exc.details.get("writeErrors", []):
+            failed_ops.add(err["index"])
+            report.add_error(rows[err["index"]][0], err.get("errmsg", "write failed"))
+    report.patients_inserted += inserted
+    report.patients_updated += matched
+    patient_snapshot_sync.notify()
+
+    recalls = [(i, line, row) for i, (line, row) in enumerate(rows) if i not in failed_ops and row.recall_date()]
+    if recalls:
+        await _upsert_recall_campaigns(repo, recalls, upserted_ids, report)
+
+
+async def _upsert_recall_campaigns(
+    repo: BaseRepository,
+    recalls: List[Tuple[int, int, PatientImportRow]],
+    upserted_ids: Dict[int, ObjectId],
+    report: ImportReport,
+) -> None:
+    """Upsert the RECALL campaign of each ``(patient op index, line, row)``; failures are reported per line."""
+    # Newly inserted patients come back with the bulk result; existing ones need one lookup.
+    ids_by_key: Dict[Tuple[str, str], ObjectId] = {
+        row.key(): upserted_ids[i] for i, _, row in recalls if i in upserted_ids
+    }
+    missing = [row for i, _, row in recalls if i not in upserted_ids]
+    if missing:
+        emails = [row.email for row in missing if row.email]
+        phones = [row.phone for row in missing if not row.email]
+        found = await repo.find_many(
+            "patients",
+            {"$or": [{"email": {"$in": emails}}, {"phone": {"$in": phones}}]},
+            projection={"email": 1, "phone": 1},
+        )
+        for doc in found:
+            if doc.get("email"):
+                ids_by_key.setdefault(("email", doc["email"]), doc["_id"])
+            if doc.get("phone"):
+                ids_by_key.setdefault(("phone", doc["phone"]), doc["_id"])
+
+    now = utcnow()
+    requests = []
+    request_lines: List[int] = []
+    for _, line, row in recalls:
+        patient_id = ids_by_key.get(row.key())
+        if patient_id is None:
+            report.add_error(line, "recall campaign: patient not found after upsert")
+            continue
+        request_lines.append(line)
+        channel = row.preferred_channel[0] if row.preferred_channel else ChannelType.email
+        requests.append(
+            UpdateOne(
+                # One open RECALL campaign per patient; re-imports move its due date.
+                {
+                    "patient_id": patient_id,
+                    "campaign_type": CampaignType.RECALL.value,
+                    "status": CampaignStatus.ATTEMPTING_RECOVERY.value,
+                },
+                {
+                    "$set": {"follow_up_details.next_attempt_at": row.recall_date(), "updated_at": now},
+                    "$setOnInsert": {
+                        # Taken before this import's revision bump; the sync brings it up to date.
+                        "patient": patient_snapshot(_patient_fields(row)),
+                        "channel": {"type": channel.value},
+                        "follow_up_details.attempts_made": 0,
+                        "follow_up_details.max_attempts": 3,
+                        "created_at": now,
+                    },
+                },
+                upsert=True,
+            )
+        )
+    try:
+        result = await repo.bulk_write("campaigns", requests, ordered=False)
+        created, matched, _ = _write_outcome(result, None)
+    except BulkWriteError as exc:
+        created, matched, _ = _write_outcome(None, exc.details)
+        errors = exc.details.get("writeErrors", [])
+        logger.warning("recall_campaign_upsert_errors", extra={"errors": len(errors)})
+        # The patient was written, but the row did not get its campaign: it still failed.
+        for err in errors:
+            report.add_error(request_lines[err["index"]], f"recall campaign: {err.get('errmsg', 'write failed')}")
+    report.campaigns_created += created
+    report.campaigns_updated += matched
+    if created:
+        await record_campaign_created(repo, CampaignType.RECALL, CampaignStatus.ATTEMPTING_RECOVERY, count=created)
+
+
+async def import_patients(
+    repo: BaseRepository,
+    lines: AsyncIterable[str],
+    *,
+    fmt: ImportFormat,
+    batch_size: int = 1000,
+) -> ImportReport:
+    """Stream patients from CSV or NDJSON lines into ``patients``.
+
+    Rows are validated one at a time and written every ``batch_size`` rows with a
+    single unordered ``bulk_write`` of upserts keyed on email (or phone when there
+    is no email), so memory stays bounded by the batch. Rows with a follow-up date
+    get an open RECALL campaign whose ``follow_up_details.next_attempt_at`` is the
+    earliest such date.
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    records = iter_csv_records(lines) if fmt == "csv" else iter_ndjson_records(lines)
+    batch: List[Tuple[int, PatientImportRow]] = []
+    async for line, record, error in records:
+        report.rows += 1
+        if record is None:
+            report.add_error(line, error or "unreadable row")
+            continue
+        try:
+            row = PatientImportRow.model_validate(record)
+        except ValidationError as exc:
+            report.add_error(line, _describe(exc))
+            continue
+        row.email = normalize_email(row.email)
+        row.phone = row.phone.strip()
+        if not row.email and not row.phone:
+            report.add_error(line, "email or phone is required")
+            continue
+        batch.append((line, row))
+        if len(batch) >= batch_size:
+            await _write_batch(repo, batch, report)
+            batch = []
+    if batch:
+        await _write_batch(repo, batch, report)
+    report.elapsed_seconds = time.perf_counter() - started
+    logger.info(
+        "patient_import_finished",
+        extra={k: v for k, v in report.as_dict().items() if k != "errors"},
+    )
+    return report
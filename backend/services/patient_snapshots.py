@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from pymongo import UpdateMany, UpdateOne
+
+from backend.core.config import settings
+from backend.db.database import get_database
+from backend.repositories.base import BaseRepository
+
+
+logger = logging.getLogger(__name__)
+
+# Collections holding a copy of the patient's display fields under ``patient``.
+SNAPSHOT_COLLECTIONS = ("campaigns", "appointments")
+# What a snapshot is taken from; read it with this projection.
+SNAPSHOT_SOURCE_FIELDS = {"name": 1, "patient_type": 1, "preferred_channel": 1, "snapshot_rev": 1}
+PENDING = "snapshot_pending"
+REV = "snapshot_rev"
+
+
+def patient_snapshot(patient: Mapping[str, Any]) -> Dict[str, Any]:
+    """The ``patient`` sub-document to store on the patient's campaigns and appointments."""
+    channels = patient.get("preferred_channel") or []
+    return {
+        "name": patient.get("name") or "Unknown",
+        "type": patient.get("patient_type"),
+        "channel": channels[0] if channels else None,
+        "rev": int(patient.get(REV) or 0),
+    }
+
+
+def mark_stale(update: Dict[str, Any]) -> Dict[str, Any]:
+    """``update`` for a patient, bumping the revision and flagging their copies for the sync.
+
+    Use it for every patient write that may change the name, type or channels.
+    """
+    return {
+        **update,
+        "$set": {**update.get("$set", {}), PENDING: True},
+        "$inc": {**update.get("$inc", {}), REV: 1},
+    }
+
+
+async def propagate(repo: BaseRepository, patients: Sequence[Mapping[str, Any]], *, force: bool = False) -> int:
+    """Copy each patient's snapshot onto their campaigns and appointments; returns documents modified.
+
+    Copies taken at the same or a later revision are left alone, so a slow writer
+    can never put back an older name; ``force`` rewrites them regardless.
+    """
+    if not patients:
+        return 0
+    requests = []
+    for patient in patients:
+        snapshot = patient_snapshot(patient)
+        query: Dict[str, Any] = {"patient_id": patient["_id"]}
+        if not force:
+            query["patient.rev"] = {"$not": {"$gte": snapshot["rev"]}}
+        requests.append(UpdateMany(query, {"$set": {"patient": snapshot}}))
+    modified = 0
+    # Not touching updated_at: a rename must not reorder the campaign list.
+    for collection in SNAPSHOT_COLLECTIONS:
+        result = await repo.bulk_write(collection, requests, ordered=False)
+        modified += result.modified_count if result is not None else 0
+    return modified
+
+
+class PatientSnapshotSync:
+    """Background task copying renamed patients onto their campaigns and appointments.
+
+    Writers that may change a patient's name, type or channels go through
+    ``mark_stale``, which bumps ``snapshot_rev`` and sets ``snapshot_pending``.
+    The sync reads pending patients in batches, propagates their current
+    snapshot and clears the marker only if ``snapshot_rev`` has not moved
+    meanwhile, so a rename racing the sync is picked up on the next pass.
+    Any number of replicas may run it: copies are guarded by revision.
+    """
+
+    def __init__(self, *, batch_size: int, poll_interval: float) -> None:
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task[None]] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self.patients = 0
+        self.copies_updated = 0
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="patient-snapshot-sync")
+
+    async def stop(self) -> None:
+        """Let the batch in flight finish, then stop; pending patients keep their marker."""
+        self._stopping = True
+        self.notify()
+        task, self._task = self._task, None
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while not self._stopping:
+            try:
+                synced = await self.sync_once()
+            except Exception:
+                logger.exception("patient_snapshot_sync_error")
+                synced = 0
+            if synced < self.batch_size and not self._stopping:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def sync_once(self, repo: Optional[BaseRepository] = None) -> int:
+        """Propagate one batch of pending patients; returns how many were read."""
+        repo = repo or BaseRepository(await get_database())
+        patients: List[Dict[str, Any]] = await repo.find_many(
+            "patients", {PENDING: True}, limit=self.batch_size, projection=SNAPSHOT_SOURCE_FIELDS
+        )
+        if not patients:
+            return 0
+        self.copies_updated += await propagate(repo, patients)
+        await repo.bulk_write(
+            "patients",
+            [
+                UpdateOne({"_id": patient["_id"], REV: patient.get(REV)}, {"$unset": {PENDING: ""}})
+                for patient in patients
+            ],
+            ordered=False,
+        )
+        self.patients += len(patients)
+        return len(patients)
+
+    def stats(self) -> Dict[str, int]:
+        return {"patients": self.patients, "copies_updated": self.copies_updated}
+
+
+patient_snapshot_sync = PatientSnapshotSync(
+    batch_size=settings.patient_snapshot_batch_size,
+    poll_interval=settings.patient_snapshot_poll_interval_seconds,
+)
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClientSession
+
+from backend.core.config import settings
+from backend.db.database import get_database, run_in_transaction
+from backend.models.campaign import CampaignStatus, CampaignType
+from backend.repositories.base import BaseRepository, utcnow
+from backend.services.availability import to_utc_naive
+from backend.services.events import emit_campaign_status
+from backend.services.follow_up_agent import follow_up_agent
+from backend.services.kpi import record_campaign_created, record_campaign_transition
+from backend.services.patient_snapshots import SNAPSHOT_SOURCE_FIELDS, patient_snapshot
+from backend.services.routing import thread_routes
+
+if TYPE_CHECKING:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+
+logger = logging.getLogger(__name__)
+
+FollowUpSender = Callable[[BaseRepository, Dict[str, Any]], Awaitable[None]]
+
+NEXT_ATTEMPT = "follow_up_details.next_attempt_at"
+CLAIM = "follow_up_details.claim"
+# What a sender gets for each claimed campaign.
+CLAIMED_FIELDS = {"patient_id": 1, "campaign_type": 1, "status": 1, "channel": 1, "follow_up_details": 1}
+
+
+def _due_campaigns(now: datetime) -> Dict[str, Any]:
+    return {"status": CampaignStatus.ATTEMPTING_RECOVERY.value, NEXT_ATTEMPT: {"$lte": now}}
+
+
+class RecallScheduler:
+    """Periodically dispatches due recall / follow-up campaigns to async workers.
+
+    Every ``interval`` seconds an APScheduler job:
+
+    * turns patients whose top-level ``next_follow_up_date`` has passed into open
+      RECALL campaigns (the date is ``$unset`` in the same transaction, so each is
+      converted once);
+    * claims up to ``batch_size`` campaigns whose ``follow_up_details.next_attempt_at``
+      is due, by moving ``next_attempt_at`` forward by ``lease_seconds`` and stamping
+      a claim token in one conditional ``update_many``. Replicas scanning at the same
+      time never claim the same campaign, and work lost to a crash becomes due
+      again when the lease runs out.
+
+    Claimed campaigns go through a bounded queue to ``workers`` tasks that call the
+    sender and then schedule the next attempt, or mark the campaign
+    RECOVERY_FAILED once ``max_attempts`` is reached.
+
+    Attempts are only counted for messages that were actually delivered, so the
+    sender must deliver and record its own outgoing interaction; ``start`` refuses
+    to run without one. The module's ``recall_scheduler`` sends through the AI
+    agent configured by ``RECALL_AGENT_URL`` (see ``FollowUpAgent``).
+    """
+
+    def __init__(
+        self,
+        *,
+        interval: float,
+        batch_size: int,
+        workers: int,
+        lease_seconds: float,
+        follow_up_interval: timedelta,
+        sender: Optional[FollowUpSender] = None,
+    ) -> None:
+        self.interval = interval
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.lease_seconds = lease_seconds
+        self.follow_up_interval = follow_up_interval
+        self.sender = sender
+        self._scheduler: Optional[AsyncIOScheduler] = None
+        self._queue: Optional[asyncio.Queue[Tuple[Dict[str, Any], Optional[datetime]]]] = None
+        self._tasks: List[asyncio.Task[None]] = []
+        self._scans_running = 0
+        self._dispatching: Set[asyncio.Task[None]] = set()
+        self._stopping = False
+        self.scans = 0
+        self.promoted = 0
+        self.claimed = 0
+        self.dispatched = 0
+        self.failed = 0
+        self.exhausted = 0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self.total_lag_seconds = 0.0
+
+    def start(self) -> None:
+        if self._scheduler is not None:
+            return
+        if self.sender is None:
+            raise RuntimeError("RECALL_SCHEDULER_ENABLED needs RECALL_AGENT_URL to deliver follow-ups")
+        self._stopping = False
+        # Imported here: APScheduler is only needed by processes that run the scheduler.
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+        self._queue = asyncio.Queue(maxsize=self.workers * 2)
+        self._tasks = [asyncio.create_task(self._work(), name=f"recall-worker-{i}") for i in range(self.workers)]
+        self._scheduler = AsyncIOScheduler()
+        self._scheduler.add_job(
+            self.scan_once,
+            "interval",
+            seconds=self.interval,
+            id="recall-scan",
+            max_instances=1,
+            coalesce=True,
+            next_run_time=datetime.now(),
+        )
+        self._scheduler.start()
+
+    async def stop(self, drain_timeout: float = 0.0) -> None:
+        """Stop scanning and the workers; claimed items left over become due after their lease.
+
+        With ``drain_timeout`` the running scan and the queued dispatches first get
+        that long to finish (shutting the scheduler down cancels a running scan).
+        Dispatches already in progress are always awaited, never cancelled, so a
+        delivered message is never left uncounted; only idle workers are cancelled.
+        """
+        if self._scheduler is not None:
+            self._scheduler.pause()
+            if drain_timeout > 0:
+                await self._drain(drain_timeout)
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+        self._stopping = True
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            if task not in self._dispatching:
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._queue = None
+
+    async def _drain(self, timeout: float) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._scans_running and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                logger.warning("recall_drain_timeout", extra={"queued": self._queue.qsize()})
+
+    async def scan_once(self, repo: Optional[BaseRepository] = None) -> int:
+        """Promote due patient recalls, claim due campaigns and enqueue them; returns the number claimed."""
+        self._scans_running += 1
+        try:
+            return await self._scan(repo or BaseRepository(await get_database()))
+        finally:
+            self._scans_running -= 1
+
+    async def _scan(self, repo: BaseRepository) -> int:
+        self.scans += 1
+        try:
+            await self._promote_patient_recalls(repo)
+            # Without a sender nothing is claimed, so no attempt is counted for an unsent message.
+            batch = await self._claim(repo) if self.sender is not None else []
+        except Exception:
+            logger.exception("recall_scan_failed")
+            return 0
+        for item in batch:
+            if self._queue is None:
+                await self._dispatch(repo, *item)
+            else:
+                await self._queue.put(item)
+        return len(batch)
+
+    async def _promote_patient_recalls(self, repo: BaseRepository) -> None:
+        now = utcnow()
+        patients = await repo.find_many(
+            "patients",
+            {"next_follow_up_date": {"$lte": now}},
+            sort=[("next_follow_up_date", 1)],
+            limit=self.batch_size,
+            projection={"next_follow_up_date": 1, **SNAPSHOT_SOURCE_FIELDS},
+        )
+        for patient in patients:
+            created = await run_in_transaction(repo.db, lambda session: self._promote(repo, session, patient))
+            if created is not None:
+                self.promoted += 1
+                if created:
+                    await record_campaign_created(repo, CampaignType.RECALL, CampaignStatus.ATTEMPTING_RECOVERY)
+
+    async def _promote(
+        self, repo: BaseRepository, session: Optional[AsyncIOMotorClientSession], patient: Dict[str, Any]
+    ) -> Optional[bool]:
+        """Move one patient's recall date onto their open RECALL campaign.
+
+        Returns None if another replica got there first, else whether a campaign was created.
+        """
+        txn = BaseRepository(repo.db, session=session)
+        due = patient["next_follow_up_date"]
+        taken = await txn.find_one_and_update(
+            "patients",
+            {"_id": patient["_id"], "next_follow_up_date": due},
+            {"$unset": {"next_follow_up_date": ""}},
+            projection={"_id": 1},
+        )
+        if taken is None:
+            return None
+        channels = patient.get("preferred_channel") or ["email"]
+        now = utcnow()
+        before = await txn.find_one_and_update(
+            "campaigns",
+            {
+                "patient_id": patient["_id"],
+                "campaign_type": CampaignType.RECALL.value,
+                "status": CampaignStatus.ATTEMPTING_RECOVERY.value,
+            },
+            {
+                "$set": {NEXT_ATTEMPT: due},
+                "$setOnInsert": {
+                    "patient": patient_snapshot(patient),
+                    "channel": {"type": channels[0]},
+                    "follow_up_details.attempts_made": 0,
+                    "follow_up_details.max_attempts": 3,
+                    "created_at": now,
+                },
+            },
+            upsert=True,
+            projection={"_id": 1},
+        )
+        return before is None
+
+    async def _claim(self, repo: BaseRepository) -> List[Tuple[Dict[str, Any], Optional[datetime]]]:
+        now = utcnow()
+        token = ObjectId()
+        candidates = await repo.find_many(
+            "campaigns",
+            _due_campaigns(now),
+            sort=[(NEXT_ATTEMPT, 1)],
+            limit=self.batch_size,
+            projection={NEXT_ATTEMPT: 1},
+        )
+        if not candidates:
+            return []
+        due_at = {c["_id"]: (c.get("follow_up_details") or {}).get("next_attempt_at") for c in candidates}
+        # Pushing next_attempt_at past the lease is what hides a claimed item from other scanners.
+        await repo.update_many(
+            "campaigns",
+            {"_id": {"$in": list(due_at)}, **_due_campaigns(now)},
+            {"$set": {CLAIM: token, NEXT_ATTEMPT: now + timedelta(seconds=self.lease_seconds)}},
+            touch_updated_at=False,
+        )
+        batch = await repo.find_many("campaigns", {CLAIM: token}, projection=CLAIMED_FIELDS)
+        self.claimed += len(batch)
+        return [(campaign, due_at.get(campaign["_id"])) for campaign in batch]
+
+    async def _work(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        repo = BaseRepository(await get_database())
+        worker = asyncio.current_task()
+        assert worker is not None
+        while not self._stopping:
+            campaign, due = await queue.get()
+            self._dispatching.add(worker)
+            try:
+                await self._dispatch(repo, campaign, due)
+            except Exception:
+                logger.exception("recall_dispatch_error", extra={"campaign_id": str(campaign.get("_id"))})
+            finally:
+                self._dispatching.discard(worker)
+                queue.task_done()
+
+    async def _dispatch(self, repo: BaseRepository, campaign: Dict[str, Any], due: Optional[datetime]) -> None:
+        details = campaign.get("follow_up_details") or {}
+        if isinstance(due, datetime):
+            lag = max(0.0, (to_utc_naive(utcnow()) - to_utc_naive(due)).total_seconds())
+            self.last_lag_seconds = lag
+            self.max_lag_seconds = max(self.max_lag_seconds, lag)
+            self.total_lag_seconds += lag
+        token = details.get("claim")
+        started = time.perf_counter()
+        assert self.sender is not None
+        try:
+            await self.sender(repo, campaign)
+        except Exception:
+            self.failed += 1
+            logger.exception("recall_send_failed", extra={"campaign_id": str(campaign["_id"])})
+            # Leave next_attempt_at at the lease expiry so the item is retried then.
+            await repo.update_one("campaigns", {"_id": campaign["_id"], CLAIM: token}, {"$unset": {CLAIM: ""}})
+            return
+        self.dispatched += 1
+
+        attempts = int(details.get("attempts_made") or 0) + 1
+        max_attempts = int(details.get("max_attempts") or 3)
+        update: Dict[str, Any] = {"$set": {"follow_up_details.attempts_made": attempts}, "$unset": {CLAIM: ""}}
+        exhausted = attempts >= max_attempts
+        if exhausted:
+            update["$set"]["status"] = CampaignStatus.RECOVERY_FAILED.value
+            update["$unset"][NEXT_ATTEMPT] = ""
+        else:
+            update["$set"][NEXT_ATTEMPT] = utcnow() + self.follow_up_interval
+        previous = await repo.find_one_and_update(
+            "campaigns",
+            {"_id": campaign["_id"], CLAIM: token, "status": campaign.get("status")},
+            update,
+            projection={"status": 1},
+        )
+        if exhausted and previous is not None:
+            self.exhausted += 1
+            thread_routes.update_status(campaign["_id"], CampaignStatus.RECOVERY_FAILED)
+            emit_campaign_status(campaign["_id"], CampaignStatus.RECOVERY_FAILED, previous=previous.get("status"))
+            await record_campaign_transition(
+                repo, campaign.get("campaign_type"), previous.get("status"), CampaignStatus.RECOVERY_FAILED
+            )
+        logger.debug(
+            "recall_dispatched",
+            extra={"campaign_id": str(campaign["_id"]), "ms": round((time.perf_counter() - started) * 1000.0, 2)},
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        dispatched = self.dispatched + self.failed
+        return {
+            "running": self._scheduler is not None,
+            "scans": self.scans,
+            "promoted": self.promoted,
+            "claimed": self.claimed,
+            "dispatched": self.dispatched,
+            "failed": self.failed,
+            "exhausted": self.exhausted,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "lag_seconds": {
+                "last": round(self.last_lag_seconds, 3),
+                "max": round(self.max_lag_seconds, 3),
+                "avg": round(self.total_lag_seconds / dispatched, 3) if dispatched else 0.0,
+            },
+        }
+
+
+recall_scheduler = RecallScheduler(
+    interval=settings.recall_scan_interval_seconds,
+    batch_size=settings.recall_batch_size,
+    workers=settings.recall_workers,
+    lease_seconds=settings.recall_lease_seconds,
+    follow_up_interval=timedelta(hours=settings.recall_follow_up_interval_hours),
+    sender=follow_up_agent.send if follow_up_agent.configured else None,
+)
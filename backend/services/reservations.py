@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from pymongo.errors import DuplicateKeyError
+
+from backend.repositories.base import BaseRepository
+from backend.services.availability import availability_engine, to_utc_naive
+
+
+logger = logging.getLogger(__name__)
+
+SLOT_CLAIMS_COLLECTION = "slot_claims"
+
+
+class SlotConflict(Exception):
+    """The requested time overlaps an existing reservation for every eligible provider."""
+
+
+class OutsideSchedule(Exception):
+    """The requested time is not within the working hours of any eligible provider."""
+
+
+def covered_slots(start: datetime, duration_minutes: int) -> List[datetime]:
+    """Start times of the availability-grid slots an appointment occupies."""
+    start = to_utc_naive(start)
+    first, last = availability_engine.slot_span(start, duration_minutes)
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    step = timedelta(minutes=availability_engine.slot_minutes)
+    return [day + step * index for index in range(first, last)]
+
+
+async def reserve_slots(
+    repo: BaseRepository,
+    *,
+    appointment_id: Any,
+    start: datetime,
+    duration_minutes: int,
+    provider_id: Optional[str] = None,
+) -> str:
+    """Claim the grid slots for an appointment and return the provider it was booked with.
+
+    A claim is one document per appointment holding every slot it covers; the
+    unique multikey index on ``(provider_id, slots)`` makes the insert fail if any
+    of those slots is already claimed for that provider. Reservation is therefore
+    a single atomic write with no read beforehand and no lock. Without an explicit
+    provider, providers are tried in schedule order. Only providers whose schedule
+    covers the whole appointment are eligible, as in the availability grid;
+    ``OutsideSchedule`` is raised when there are none.
+    """
+    slots = covered_slots(start, duration_minutes)
+    providers = [
+        schedule.provider_id
+        for schedule in await availability_engine.schedules(repo)
+        if (not provider_id or schedule.provider_id == provider_id)
+        and availability_engine.is_open(schedule, start, duration_minutes)
+    ]
+    if not providers:
+        raise OutsideSchedule()
+    for provider in providers:
+        try:
+            await repo.insert_one(
+                SLOT_CLAIMS_COLLECTION,
+                {"_id": appointment_id, "provider_id": provider, "slots": slots},
+            )
+        except DuplicateKeyError:
+            continue
+        return provider
+    raise SlotConflict()
+
+
+async def release_slots(repo: BaseRepository, appointment_id: Any) -> None:
+    await repo.delete_one(SLOT_CLAIMS_COLLECTION, {"_id": appointment_id})
+
+
+async def claim_existing(repo: BaseRepository, appointments: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+    """Claim the slots of appointments booked before slot claims existed.
+
+    Returns how many were ``claimed``, ``already_claimed``, ``skipped`` (no usable
+    date) or left as ``conflicts`` because they overlap an appointment claimed
+    first; conflicts are logged for review. Appointments without a provider get the
+    first one in schedule order with the time free, written back to the
+    appointment. Working hours are not checked: these bookings already exist.
+    """
+    outcome: Counter[str] = Counter()
+    ids = [appointment["_id"] for appointment in appointments]
+    claimed = await repo.find_many(SLOT_CLAIMS_COLLECTION, {"_id": {"$in": ids}}, projection={"_id": 1})
+    already = {doc["_id"] for doc in claimed}
+    providers = [schedule.provider_id for schedule in await availability_engine.schedules(repo)]
+    for appointment in appointments:
+        start = appointment.get("appointment_date")
+        if appointment["_id"] in already:
+            outcome["already_claimed"] += 1
+            continue
+        if not isinstance(start, datetime):
+            outcome["skipped"] += 1
+            continue
+        duration = int(appointment.get("duration_minutes") or availability_engine.slot_minutes)
+        slots = covered_slots(start, duration)
+        assigned = appointment.get("provider_id")
+        for provider in [assigned] if assigned else providers:
+            try:
+                await repo.insert_one(
+                    SLOT_CLAIMS_COLLECTION,
+                    {"_id": appointment["_id"], "provider_id": provider, "slots": slots},
+                )
+            except DuplicateKeyError as exc:
+                if "_id" in ((exc.details or {}).get("keyPattern") or {}):
+                    # Claimed meanwhile, by a concurrent run.
+                    outcome["already_claimed"] += 1
+                    break
+                continue
+            if not assigned:
+                await repo.update_one(
+                    "appointments",
+                    {"_id": appointment["_id"]},
+                    {"$set": {"provider_id": provider}},
+                    touch_updated_at=False,
+                )
+            outcome["claimed"] += 1
+            break
+        else:
+            outcome["conflicts"] += 1
+            logger.warning(
+                "slot_claim_backfill_conflict",
+                extra={"appointment_id": str(appointment["_id"]), "provider_id": assigned, "start": start.isoformat()},
+            )
+    return dict(outcome)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Sequence
+
+from backend.core.config import settings
+from backend.repositories.base import BaseRepository
+from backend.services.cache import TTLCache
+
+
+class CampaignRoute(NamedTuple):
+    campaign_id: Any
+    status: Optional[str]
+    campaign_type: Optional[str]
+
+
+_MISSING = object()
+# A thread shared by several campaigns routes to the most recently updated one,
+# whether it was cached by ``resolve`` or by ``prime``.
+_LATEST_FIRST = [("updated_at", -1), ("_id", -1)]
+_ROUTE_FIELDS = {"channel.thread_id": 1, "status": 1, "campaign_type": 1}
+
+
+def _route(campaign: Dict[str, Any]) -> CampaignRoute:
+    return CampaignRoute(campaign["_id"], campaign.get("status"), campaign.get("campaign_type"))
+
+
+class ThreadRoutingCache:
+    """Maps email ``thread_id`` to the campaign it belongs to.
+
+    Unknown threads are cached as negative entries with a shorter TTL. Status
+    changes made by this process are written through via ``update_status``; a
+    reverse ``campaign_id -> thread_id`` index makes that possible for callers
+    that only know the campaign. Changes made by other replicas are picked up
+    when the entry expires; the status transition itself is always applied with
+    a conditional update, so a stale status can only skip work, never corrupt it.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float, negative_ttl: float) -> None:
+        self.negative_ttl = negative_ttl
+        self._routes: TTLCache[str, Optional[CampaignRoute]] = TTLCache(maxsize, ttl)
+        self._threads: TTLCache[Any, str] = TTLCache(maxsize, ttl)
+
+    def remember(self, thread_id: str, route: CampaignRoute) -> None:
+        self._routes.set(thread_id, route)
+        self._threads.set(route.campaign_id, thread_id)
+
+    def remember_missing(self, thread_id: str) -> None:
+        self._routes.set(thread_id, None, ttl=self.negative_ttl)
+
+    def invalidate_thread(self, thread_id: str) -> None:
+        self._routes.pop(thread_id)
+
+    def invalidate_campaign(self, campaign_id: Any) -> None:
+        thread_id = self._threads.peek(campaign_id)
+        if thread_id is not None:
+            self._routes.pop(thread_id)
+            self._threads.pop(campaign_id)
+
+    def update_status(self, campaign_id: Any, status: Any) -> None:
+        thread_id = self._threads.peek(campaign_id)
+        if thread_id is None:
+            return
+        route = self._routes.peek(thread_id)
+        if route is not None and route.campaign_id == campaign_id:
+            self.remember(thread_id, route._replace(status=getattr(status, "value", status)))
+
+    async def resolve(self, repo: BaseRepository, thread_ids: Iterable[str]) -> Dict[str, CampaignRoute]:
+        """Route every thread; cache misses are fetched together with one ``$in`` query."""
+        routes: Dict[str, CampaignRoute] = {}
+        misses: list[str] = []
+        for thread_id in dict.fromkeys(thread_ids):
+            cached = self._routes.get(thread_id, _MISSING)  # type: ignore[arg-type]
+            if cached is _MISSING:
+                misses.append(thread_id)
+            elif cached is not None:
+                routes[thread_id] = cached  # type: ignore[assignment]
+        if not misses:
+            return routes
+
+        campaigns: Sequence[Dict[str, Any]] = await repo.find_many(
+            "campaigns",
+            {"channel.thread_id": {"$in": misses}},
+            sort=_LATEST_FIRST,
+            projection=_ROUTE_FIELDS,
+        )
+        for campaign in campaigns:
+            thread_id = campaign["channel"]["thread_id"]
+            if thread_id in routes:
+                continue
+            route = _route(campaign)
+            routes[thread_id] = route
+            self.remember(thread_id, route)
+        for thread_id in misses:
+            if thread_id not in routes:
+                self.remember_missing(thread_id)
+        return routes
+
+    async def prime(self, repo: BaseRepository, limit: int) -> int:
+        """Cache the routes of the ``limit`` most recently updated threads; returns how many."""
+        campaigns = await repo.find_many(
+            "campaigns",
+            {"channel.thread_id": {"$exists": True}},
+            sort=_LATEST_FIRST,
+            limit=limit,
+            projection=_ROUTE_FIELDS,
+        )
+        primed: set[str] = set()
+        for campaign in campaigns:
+            thread_id = campaign["channel"]["thread_id"]
+            if thread_id not in primed:
+                primed.add(thread_id)
+                self.remember(thread_id, _route(campaign))
+        return len(primed)
+
+    def stats(self) -> Dict[str, int]:
+        return self._routes.stats()
+
+
+thread_routes = ThreadRoutingCache(
+    maxsize=settings.routing_cache_max_entries,
+    ttl=settings.routing_cache_ttl_seconds,
+    negative_ttl=settings.routing_cache_negative_ttl_seconds,
+)
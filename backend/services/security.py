@@ -1,37 +1,93 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from jose.exceptions import JWTError
 from pydantic import EmailStr
 
 from backend.core.config import settings
 from backend.db.database import get_database
 from backend.repositories.base import BaseRepository
 from backend.models.role import Role
+from backend.services.cache import TTLCache
+from backend.services.hashing import HashingPool
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+# passlib and jose's cryptography backend take ~100 ms to import between them, so
+# they load on first use; the app lifespan calls preload() while Mongo warms up.
+@lru_cache(maxsize=1)
+def password_context() -> CryptContext:
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+@lru_cache(maxsize=1)
+def _jwt() -> Any:
+    from jose import jwt
+
+    return jwt
+
+
+def preload() -> None:
+    """Import the JWT and password hashing libraries and load the bcrypt backend."""
+    _jwt()
+    password_context().handler("bcrypt").get_backend()
 
 
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Verified tokens -> email (never outliving the token's own expiry) and email -> Role.
+# Role changes made through this process call invalidate_cached_user(); changes made
+# elsewhere become visible once the entry's TTL runs out.
+_token_cache: TTLCache[str, str] = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+_user_cache: TTLCache[str, Role] = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+_user_lookups: Dict[str, "asyncio.Future[Optional[Role]]"] = {}
+
+
+class _LookupAbandoned(Exception):
+    """The request leading a shared user lookup was cancelled before it finished."""
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return password_context.verify(plain_password, hashed_password)
+    return password_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return password_context.hash(password)
+    return password_context().hash(password)
+
+
+# bcrypt takes hundreds of milliseconds per call; request handlers must use the
+# *_async variants so hashing never runs on the event loop thread.
+password_pool = HashingPool(
+    workers=settings.password_hash_workers,
+    max_concurrency=settings.password_hash_max_concurrency,
+    kind=settings.password_hash_executor,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_pool.run(get_password_hash, password)
 
 
 def create_access_token(subject: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = subject.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.access_token_expire_minutes))
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    encoded_jwt = _jwt().encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
     return encoded_jwt
 
 
@@ -41,7 +97,55 @@ async def get_user_by_email(email: str) -> Optional[Role]:
     doc = await repo.find_one("roles", {"email": str(email)})
     if not doc:
         return None
-    return Role(**doc)
+    return Role.from_mongo(doc)
+
+
+async def _get_cached_user(email: str) -> Optional[Role]:
+    user = _user_cache.get(email)
+    if user is not None:
+        return user
+    # Collapse concurrent misses for the same user into one database round trip.
+    pending = _user_lookups.get(email)
+    if pending is not None:
+        try:
+            return await asyncio.shield(pending)
+        except _LookupAbandoned:
+            # The leader's client went away; that must not fail this request.
+            return await _get_cached_user(email)
+    future: "asyncio.Future[Optional[Role]]" = asyncio.get_running_loop().create_future()
+    _user_lookups[email] = future
+    try:
+        user = await get_user_by_email(email)
+        if user is not None:
+            _user_cache.set(email, user)
+        future.set_result(user)
+        return user
+    except asyncio.CancelledError:
+        # Cancelling the future would cancel every follower; let them retry instead.
+        future.set_exception(_LookupAbandoned())
+        future.exception()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        # Mark retrieved so an unawaited failure doesn't log "exception never retrieved".
+        future.exception()
+        raise
+    finally:
+        del _user_lookups[email]
+
+
+def invalidate_cached_user(email: str) -> None:
+    """Drop a cached user; call whenever the corresponding role document changes."""
+    _user_cache.pop(str(email))
+
+
+def clear_auth_cache() -> None:
+    _token_cache.clear()
+    _user_cache.clear()
+
+
+def auth_cache_stats() -> Dict[str, Dict[str, int]]:
+    return {"tokens": _token_cache.stats(), "users": _user_cache.stats()}
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> Role:
@@ -50,15 +154,20 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> Role:
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        email: str | None = payload.get("email")
-        if email is None:
+    email = _token_cache.get(token)
+    if email is None:
+        try:
+            payload = _jwt().decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+            email = payload.get("email")
+            if email is None:
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+        expires_at = payload.get("exp")
+        ttl = None if expires_at is None else float(expires_at) - time.time()
+        _token_cache.set(token, email, ttl=ttl)
 
-    user = await get_user_by_email(email)
+    user = await _get_cached_user(email)
     if user is None:
         raise credentials_exception
     return user
@@ -69,10 +178,11 @@ async def create_initial_admin_if_missing(name: str, email: EmailStr, role: str,
     repo = BaseRepository(db)
     existing = await repo.find_one("roles", {"email": str(email)})
     if existing:
-        return Role(**existing)
-    hashed = get_password_hash(password)
+        return Role.from_mongo(existing)
+    hashed = await get_password_hash_async(password)
     doc = {"name": name, "email": str(email), "role": role, "hashed_password": hashed}
     inserted_id = await repo.insert_one("roles", doc)
+    invalidate_cached_user(email)
     doc.update({"_id": inserted_id})
-    return Role(**doc)
+    return Role.from_mongo(doc)
 
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from bson import ObjectId
+
+from backend.core.config import settings
+from backend.core.logs import current_request_id
+from backend.db.database import get_database
+from backend.repositories.base import BaseRepository, utcnow
+from backend.services.email_processor import process_gmail_batch
+
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_COLLECTION = "webhook_outbox"
+
+STATUS_PENDING = "pending"
+STATUS_PROCESSING = "processing"
+STATUS_FAILED = "failed"
+
+BatchHandler = Callable[[BaseRepository, Sequence[Dict[str, Any]]], Awaitable[Any]]
+
+HANDLERS: Dict[str, BatchHandler] = {
+    "gmail": process_gmail_batch,
+}
+
+
+async def enqueue_webhook(repo: BaseRepository, source: str, payload: Dict[str, Any]) -> ObjectId:
+    """Durably record a webhook payload; consumers pick it up asynchronously."""
+    doc = {
+        "source": source,
+        "payload": payload,
+        "status": STATUS_PENDING,
+        "attempts": 0,
+        "available_at": utcnow(),
+    }
+    request_id = current_request_id()
+    if request_id is not None:
+        # Lets consumer-side log lines be traced back to the request that delivered the payload.
+        doc["request_id"] = request_id
+    inserted_id = await repo.insert_one(OUTBOX_COLLECTION, doc)
+    webhook_consumers.notify()
+    return inserted_id
+
+
+def _claimable(now: Any) -> Dict[str, Any]:
+    # Pending items that are due, plus items whose consumer died mid-batch.
+    return {
+        "$or": [
+            {"status": STATUS_PENDING, "available_at": {"$lte": now}},
+            {"status": STATUS_PROCESSING, "lease_until": {"$lte": now}},
+        ]
+    }
+
+
+class WebhookConsumerPool:
+    """Async consumers draining the Mongo-backed webhook outbox in batches.
+
+    Each consumer claims up to ``batch_size`` due items (find ids, then one
+    conditional ``update_many`` stamping a claim token so concurrent consumers in
+    any process never share an item), runs the source handler over the whole
+    batch and deletes the items on success. When a batch fails its items are
+    retried one by one, so only those that fail on their own are retried with
+    exponential backoff and parked as ``failed`` after ``max_attempts``. Items
+    whose lease expires (consumer crash or restart) become claimable again, so
+    delivery is at-least-once.
+    """
+
+    def __init__(
+        self,
+        *,
+        consumers: int,
+        batch_size: int,
+        poll_interval: float,
+        lease_seconds: float,
+        max_attempts: int,
+    ) -> None:
+        self.consumers = consumers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._tasks: List[asyncio.Task[None]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self.batches = 0
+        self.processed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"webhook-consumer-{i}") for i in range(self.consumers)
+        ]
+
+    async def stop(self) -> None:
+        """Let in-flight batches finish, then stop; unclaimed items stay in the outbox."""
+        self._stopping = True
+        self.notify()
+        tasks, self._tasks = self._tasks, []
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while not self._stopping:
+            try:
+                drained = await self.drain_once()
+            except Exception:
+                logger.exception("webhook_consumer_error")
+                drained = 0
+            if drained < self.batch_size and not self._stopping:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def drain_once(self, repo: Optional[BaseRepository] = None) -> int:
+        """Claim and process one batch; returns the number of items claimed."""
+        repo = repo or BaseRepository(await get_database())
+        batch, token = await self._claim(repo)
+        if not batch:
+            return 0
+        try:
+            await self._handle(repo, batch)
+        except Exception:
+            logger.exception(
+                "webhook_batch_failed",
+                extra={
+                    "size": len(batch),
+                    "request_ids": [item["request_id"] for item in batch if "request_id" in item],
+                },
+            )
+            # Retry item by item so one bad message only costs itself an attempt;
+            # interactions are keyed on the message id, so reprocessing the good ones is safe.
+            failed: List[Dict[str, Any]] = []
+            for item in batch:
+                try:
+                    await self._handle(repo, [item])
+                except Exception:
+                    logger.exception(
+                        "webhook_item_failed",
+                        extra={"outbox_id": str(item["_id"]), "request_id": item.get("request_id")},
+                    )
+                    failed.append(item)
+            if failed:
+                await self._release(repo, failed, token)
+            failed_ids = {item["_id"] for item in failed}
+            done = [item for item in batch if item["_id"] not in failed_ids]
+        else:
+            done = batch
+        if done:
+            await repo.delete_many(OUTBOX_COLLECTION, {"_id": {"$in": [item["_id"] for item in done]}, "claim": token})
+        self.batches += 1
+        self.processed += len(done)
+        return len(batch)
+
+    async def _handle(self, repo: BaseRepository, items: Sequence[Dict[str, Any]]) -> None:
+        by_source: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for item in items:
+            by_source[item.get("source", "")].append(item["payload"])
+        for source, payloads in by_source.items():
+            handler = HANDLERS.get(source)
+            if handler is None:
+                logger.warning("webhook_unknown_source", extra={"source": source, "count": len(payloads)})
+                continue
+            await handler(repo, payloads)
+
+    async def _claim(self, repo: BaseRepository) -> tuple[List[Dict[str, Any]], ObjectId]:
+        now = utcnow()
+        token = ObjectId()
+        candidates = await repo.find_many(
+            OUTBOX_COLLECTION,
+            _claimable(now),
+            sort=[("available_at", 1)],
+            limit=self.batch_size,
+            projection={"_id": 1},
+        )
+        if not candidates:
+            return [], token
+        await repo.update_many(
+            OUTBOX_COLLECTION,
+            {"_id": {"$in": [c["_id"] for c in candidates]}, **_claimable(now)},
+            {
+                "$set": {
+                    "status": STATUS_PROCESSING,
+                    "claim": token,
+                    "lease_until": now + timedelta(seconds=self.lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+        )
+        batch = await repo.find_many(OUTBOX_COLLECTION, {"claim": token, "status": STATUS_PROCESSING})
+        return batch, token
+
+    async def _release(self, repo: BaseRepository, batch: List[Dict[str, Any]], token: ObjectId) -> None:
+        now = utcnow()
+        exhausted = [item["_id"] for item in batch if item.get("attempts", 0) >= self.max_attempts]
+        retry = [item for item in batch if item.get("attempts", 0) < self.max_attempts]
+        if exhausted:
+            await repo.update_many(
+                OUTBOX_COLLECTION,
+                {"_id": {"$in": exhausted}, "claim": token},
+                {"$set": {"status": STATUS_FAILED}},
+            )
+            self.dead_lettered += len(exhausted)
+        if retry:
+            attempts = max(item.get("attempts", 1) for item in retry)
+            backoff = timedelta(seconds=min(300.0, self.poll_interval * 2 ** attempts))
+            await repo.update_many(
+                OUTBOX_COLLECTION,
+                {"_id": {"$in": [item["_id"] for item in retry]}, "claim": token},
+                {"$set": {"status": STATUS_PENDING, "available_at": now + backoff}, "$unset": {"lease_until": ""}},
+            )
+            self.retried += len(retry)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "consumers": len(self._tasks),
+            "batches": self.batches,
+            "processed": self.processed,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+        }
+
+
+webhook_consumers = WebhookConsumerPool(
+    consumers=settings.webhook_consumers,
+    batch_size=settings.webhook_batch_size,
+    poll_interval=settings.webhook_poll_interval_seconds,
+    lease_seconds=settings.webhook_lease_seconds,
+    max_attempts=settings.webhook_max_attempts,
+)